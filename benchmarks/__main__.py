@@ -0,0 +1,277 @@
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess as sp
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import click
+from loguru import logger  # noqa
+from rich.console import Console
+from rich.table import Table
+
+import benchmarks
+
+BENCHMARK_MODULE_PREFIX = "bench_"
+BENCHMARK_CLASS_SUFFIX = "Suite"
+BENCHMARK_METHOD_PREFIX = "time_"
+
+
+def discover_benchmarks(name_filter: str | None) -> list:
+    """
+    Find the benchmarks in the `bench_*` modules, in the style of airspeed velocity (asv).
+
+    Every `*Suite` class is a suite; its `time_*` methods are the benchmarks. A suite can define `params` (a list of
+    values, or a list of lists of values for multiple parameters) and `param_names`, and `setup` and `teardown`
+    methods, which are called with the parameters. A `setup` which raises `NotImplementedError` skips the benchmark,
+    e.g. if a tool is not available.
+
+    Parameters:
+        name_filter (str | None): Only include the benchmarks whose name contains this text.
+
+    Returns:
+        list: The name, suite class, method name and parameters per benchmark.
+    """
+
+    discovered = []
+    for module_info in sorted(
+        pkgutil.iter_modules(benchmarks.__path__), key=lambda info: info.name
+    ):
+        if not module_info.name.startswith(BENCHMARK_MODULE_PREFIX):
+            continue
+
+        module = importlib.import_module(f"benchmarks.{module_info.name}")
+        for class_name, suite in inspect.getmembers(module, inspect.isclass):
+            if (
+                not class_name.endswith(BENCHMARK_CLASS_SUFFIX)
+                or suite.__module__ != module.__name__
+            ):
+                continue
+
+            params = getattr(suite, "params", [])
+            if params and not isinstance(params[0], (list, tuple)):
+                params = [params]
+
+            for method_name, _ in inspect.getmembers(suite, inspect.isfunction):
+                if not method_name.startswith(BENCHMARK_METHOD_PREFIX):
+                    continue
+
+                for combination in itertools.product(*params):
+                    name = f"{module_info.name}.{class_name}.{method_name}"
+                    if combination:
+                        name += f"({', '.join(repr(value) for value in combination)})"
+                    if name_filter is not None and name_filter not in name:
+                        continue
+
+                    discovered.append((name, suite, method_name, combination))
+
+    return discovered
+
+
+def measure(function, repeat: int, sample_time: float) -> dict:
+    """
+    Time a function, calling it as often per sample as needed to take at least the sample time.
+
+    Parameters:
+        function (Callable): The function to time.
+        repeat (int): The amount of samples.
+        sample_time (float): The minimum duration of a sample, in seconds.
+
+    Returns:
+        dict: The duration per call (min, median, mean and standard deviation of the samples), the number of calls
+        per sample and the amount of samples.
+    """
+
+    # Warm up, and find the number of calls per sample; the calls are not part of the samples
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= sample_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(sample_time / elapsed) + 1)
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - started) / number)
+
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": len(samples),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        response = sp.run(
+            ["git", "rev-parse", "HEAD"],
+            stdout=sp.PIPE,
+            stderr=sp.PIPE,
+            cwd=Path(benchmarks.__file__).parent,
+        )
+    except OSError:
+        return None
+
+    return response.stdout.decode("utf-8").strip() or None
+
+
+def format_duration(seconds: float) -> str:
+    for unit, factor in (("s", 1), ("ms", 1e3), ("µs", 1e6)):
+        if seconds * factor >= 1:
+            return f"{seconds * factor:.3f} {unit}"
+
+    return f"{seconds * 1e9:.0f} ns"
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option(
+    "--filter",
+    "-k",
+    "name_filter",
+    required=False,
+    default=None,
+    help="Only run the benchmarks whose name contains this text",
+)
+@click.option(
+    "--repeat",
+    "-r",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=5,
+    help="Amount of samples per benchmark",
+)
+@click.option(
+    "--sample-time",
+    type=click.FloatRange(min=0),
+    show_default=True,
+    default=0.1,
+    help="Minimum duration of a sample in seconds; fast benchmarks are called multiple times per sample",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True),
+    show_default=True,
+    default="./benchmarks/results/results.json",
+    help="Path to write the JSON results to",
+)
+@click.option(
+    "--baseline",
+    "-b",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to the JSON results to compare against",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=1),
+    show_default=True,
+    default=1.1,
+    help="Ratio of the median against the baseline from which a benchmark is a regression",
+)
+def main(name_filter, repeat, sample_time, output, baseline, threshold):
+    # The benchmarks call into mkvrestyle, which logs every step
+    logger.remove()
+
+    baseline_results = {}
+    if baseline is not None:
+        with open(baseline, mode="r") as file:
+            baseline_results = json.load(file)["benchmarks"]
+
+    table = Table(show_header=True, header_style="bold cyan")
+    for column in ["Benchmark", "Median", "Min", "Baseline", "Ratio"]:
+        table.add_column(
+            column,
+            justify="left" if column == "Benchmark" else "right",
+            overflow="fold",
+        )
+
+    results = {}
+    regressions = []
+    for name, suite, method_name, params in discover_benchmarks(name_filter):
+        instance = suite()
+        try:
+            if hasattr(instance, "setup"):
+                instance.setup(*params)
+        except NotImplementedError as error:
+            table.add_row(f"{name}: {error}", "skipped", "", "", "")
+            continue
+
+        try:
+            method = getattr(instance, method_name)
+            result = measure(lambda: method(*params), repeat, sample_time)
+        finally:
+            if hasattr(instance, "teardown"):
+                instance.teardown(*params)
+
+        results[name] = result
+        baseline_result = baseline_results.get(name)
+        ratio = None
+        if baseline_result is not None:
+            ratio = result["median"] / baseline_result["median"]
+            if ratio > threshold:
+                regressions.append(name)
+
+        table.add_row(
+            name,
+            format_duration(result["median"]),
+            format_duration(result["min"]),
+            format_duration(baseline_result["median"]) if baseline_result else "",
+            (
+                f"[red]{ratio:.2f}[/red]"
+                if ratio is not None and ratio > threshold
+                else f"{ratio:.2f}" if ratio is not None else ""
+            ),
+        )
+
+    Console().print(table)
+
+    output_file = Path(output)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = output_file.with_name(f"{output_file.name}.tmp")
+    with temporary_path.open("w") as file:
+        json.dump(
+            {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "machine": {
+                    "platform": platform.platform(),
+                    "processor": platform.machine(),
+                    "cpu_count": os.cpu_count(),
+                },
+                "benchmarks": results,
+            },
+            file,
+            indent=4,
+        )
+    os.replace(temporary_path, output_file)
+    click.echo(f"Results written to `{output_file}`.")
+
+    if regressions:
+        click.echo(
+            f"{len(regressions)} benchmark(s) slower than {threshold}x the baseline: {', '.join(regressions)}",
+            err=True,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
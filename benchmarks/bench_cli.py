@@ -0,0 +1,74 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.generators import (
+    generate_ass_events,
+    generate_ass_header,
+    generate_font_directory,
+    write_mkv,
+)
+from mkvrestyle.cli import cli
+
+DEFAULT_PRESET_PATH = Path(__file__).parents[1].joinpath("preset", "default.json")
+
+REQUIRED_TOOLS = ["mkvmerge", "mkvextract", "ffprobe"]
+
+
+class CliSuite:
+    params = [[1, 5]]
+    param_names = ["files"]
+
+    def setup(self, files):
+        missing_tools = [tool for tool in REQUIRED_TOOLS if shutil.which(tool) is None]
+        if missing_tools:
+            raise NotImplementedError(f"Not available: {', '.join(missing_tools)}")
+
+        self.folder = Path(tempfile.mkdtemp())
+        fonts = generate_font_directory(
+            self.folder.joinpath("fonts"), families=5, styles=("Regular",)
+        )
+        for index in range(files):
+            write_mkv(
+                self.folder.joinpath("input", f"episode{index:02d}.mkv"),
+                generate_ass_header(styles=20, fonts=5),
+                generate_ass_events(events=2000, styles=20, fonts=5, seed=index),
+                fonts,
+            )
+
+        # The default preset, without substituting the font
+        with DEFAULT_PRESET_PATH.open("r") as file:
+            preset = json.load(file)
+        del preset["FontName"]
+        self.preset_path = self.folder.joinpath("preset.json")
+        with self.preset_path.open("w") as file:
+            json.dump(preset, file)
+
+        self.files = files
+
+    def teardown(self, files):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def time_cli(self, files):
+        output_folder = self.folder.joinpath("output")
+        shutil.rmtree(output_folder, ignore_errors=True)
+        cli(
+            [
+                "--input-path",
+                str(self.folder.joinpath("input")),
+                "--output-path",
+                str(output_folder),
+                "--preset",
+                str(self.preset_path),
+                "--scratch-path",
+                str(self.folder.joinpath("scratch")),
+                "--probe-cache",
+                str(self.folder.joinpath("probe-cache.json")),
+            ],
+            standalone_mode=False,
+        )
+
+        # Errors are logged instead of raised
+        if len(list(output_folder.glob("*.ass"))) != self.files:
+            raise RuntimeError(f"Restyling failed, see `{output_folder}`.")
@@ -0,0 +1,43 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from matplotlib import font_manager
+
+from benchmarks.generators import generate_font_directory
+from mkvrestyle.cli import find_available_fonts
+from mkvrestyle.fonts import FontFinder
+
+
+class FontFinderSuite:
+    params = [[10, 100]]
+    param_names = ["families"]
+
+    def setup(self, families):
+        self.folder = Path(tempfile.mkdtemp())
+        generate_font_directory(self.folder, families)
+
+        # Only the generated fonts, instead of the fonts of the system
+        font_paths = [str(self.folder)]
+        self.font_finder_class = type(
+            "DirectoryFontFinder",
+            (FontFinder,),
+            {
+                "_fonts_on_system": staticmethod(
+                    lambda: font_manager.findSystemFonts(fontpaths=font_paths)
+                )
+            },
+        )
+        self.fonts = self.font_finder_class().fonts
+        self.font_names = [
+            f"Bench Font {family}" for family in range(families - 1, -1, -3)
+        ]
+
+    def teardown(self, families):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def time_font_finder(self, families):
+        self.font_finder_class()
+
+    def time_find_available_fonts(self, families):
+        find_available_fonts(self.fonts, self.font_names)
@@ -0,0 +1,179 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.generators import PLAY_RES, generate_ass, generate_font_directory
+from benchmarks.standins import (
+    identify_output,
+    should_fail,
+    standins_on_path,
+    write_standins,
+)
+from mkvrestyle.cli import cli
+
+DEFAULT_PRESET_PATH = Path(__file__).parents[1].joinpath("preset", "default.json")
+
+# Placeholder input file; the stand-ins never read it
+INPUT_FILE_CONTENT = b"\x1a\x45\xdf\xa3"
+
+
+class StandinRun:
+    """
+    A directory with placeholder input files, fixtures and the stand-in tools, to run `cli()` on.
+    """
+
+    def __init__(
+        self,
+        files: int,
+        latency: float = 0.0,
+        failure_rate: dict | None = None,
+    ):
+        self.folder = Path(tempfile.mkdtemp())
+        self.input_folder = self.folder.joinpath("input")
+        self.output_folder = self.folder.joinpath("output")
+        self.log_file = self.folder.joinpath("calls.jsonl")
+
+        self.input_folder.mkdir()
+        self.input_files = []
+        for index in range(files):
+            input_file = self.input_folder.joinpath(f"episode{index:02d}.mkv")
+            input_file.write_bytes(INPUT_FILE_CONTENT)
+            self.input_files.append(input_file)
+
+        fixtures_folder = self.folder.joinpath("fixtures")
+        fixtures_folder.mkdir()
+        track_file = fixtures_folder.joinpath("track.ass")
+        track_file.write_bytes(generate_ass(events=2000, styles=20, fonts=5))
+        fonts = generate_font_directory(
+            fixtures_folder.joinpath("fonts"), families=5, styles=("Regular",)
+        )
+
+        self.config = {
+            "failure_rate": failure_rate or {},
+            "seed": 0,
+        }
+        write_standins(
+            self.folder.joinpath("bin"),
+            identify_output([("eng", "Full")], fonts, PLAY_RES),
+            {1: track_file},
+            {index + 1: font for index, font in enumerate(fonts)},
+            PLAY_RES,
+            {tool: latency for tool in ("mkvmerge", "mkvextract", "ffprobe")},
+            failure_rate,
+            log_file=self.log_file,
+        )
+
+        # The default preset, without substituting the font
+        with DEFAULT_PRESET_PATH.open("r") as file:
+            preset = json.load(file)
+        del preset["FontName"]
+        self.preset_path = self.folder.joinpath("preset.json")
+        with self.preset_path.open("w") as file:
+            json.dump(preset, file)
+
+    def expected_failures(self) -> list:
+        return [
+            input_file
+            for input_file in self.input_files
+            if any(
+                should_fail(self.config, tool, str(input_file))
+                for tool in ("mkvmerge", "mkvextract", "ffprobe")
+            )
+        ]
+
+    def calls(self) -> list:
+        if not self.log_file.is_file():
+            return []
+
+        with self.log_file.open("r") as file:
+            return [json.loads(line) for line in file]
+
+    def run(self, *arguments: str) -> None:
+        self.log_file.unlink(missing_ok=True)
+        with standins_on_path(self.folder.joinpath("bin")):
+            try:
+                cli(
+                    [
+                        "--input-path",
+                        str(self.input_folder),
+                        "--output-path",
+                        str(self.output_folder),
+                        "--preset",
+                        str(self.preset_path),
+                        "--stream",
+                        "eng",
+                        "--scratch-path",
+                        str(self.folder.joinpath("scratch")),
+                        "--probe-cache",
+                        str(self.folder.joinpath("probe-cache.json")),
+                        *arguments,
+                    ],
+                    standalone_mode=False,
+                )
+            except SystemExit:
+                # Failed files with `--keep-going`
+                pass
+
+    def outputs(self) -> list:
+        return sorted(self.output_folder.glob("*.ass"))
+
+    def remove(self) -> None:
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+class OrchestrationSuite:
+    params = [[10, 50], [0.0, 0.05]]
+    param_names = ["files", "latency"]
+
+    def setup(self, files, latency):
+        self.standin_run = StandinRun(files, latency)
+
+        # Up to date outputs for the skip benchmark
+        self.standin_run.run()
+
+    def teardown(self, files, latency):
+        self.standin_run.remove()
+
+    def time_cli(self, files, latency):
+        self.standin_run.run("--force")
+
+        # Errors are logged instead of raised
+        if len(self.standin_run.outputs()) != files:
+            raise RuntimeError(
+                f"Restyling failed, see `{self.standin_run.output_folder}`."
+            )
+
+    def time_cli_up_to_date(self, files, latency):
+        self.standin_run.run()
+
+        # Up to date files are skipped before any tool is run
+        if self.standin_run.calls():
+            raise RuntimeError("Tools were run for up to date files.")
+
+
+class FailureSuite:
+    params = [[20], [0.1, 0.5]]
+    param_names = ["files", "failure_rate"]
+
+    def setup(self, files, failure_rate):
+        self.standin_run = StandinRun(files, failure_rate={"mkvextract": failure_rate})
+        self.failure_report = self.standin_run.folder.joinpath("failures.json")
+
+    def teardown(self, files, failure_rate):
+        self.standin_run.remove()
+
+    def time_cli_keep_going(self, files, failure_rate):
+        self.standin_run.run(
+            "--force", "--keep-going", "--failure-report", str(self.failure_report)
+        )
+
+        with self.failure_report.open("r") as file:
+            failed = json.load(file)["failed"]
+        expected_failures = len(self.standin_run.expected_failures())
+        if failed != expected_failures or len(self.standin_run.outputs()) != (
+            files - expected_failures
+        ):
+            raise RuntimeError(
+                f"Expected {expected_failures} failed file(s), got {failed}."
+            )
@@ -0,0 +1,41 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.generators import generate_ass
+from mkvrestyle.cli import (
+    get_dialogue_lines,
+    get_format_lines,
+    get_style_lines,
+    parse_subtitle,
+)
+from mkvrestyle.subtitle import SubtitleDocument
+
+
+class ParseSuite:
+    params = [[1000, 20000], [10, 200]]
+    param_names = ["events", "styles"]
+
+    def setup(self, events, styles):
+        data = generate_ass(events, styles)
+        self.folder = Path(tempfile.mkdtemp())
+        self.ass_track_path = self.folder.joinpath("track.ass")
+        self.ass_track_path.write_bytes(data)
+
+        self.document = SubtitleDocument(data)
+        self.format_lines = get_format_lines(self.document.lines)
+
+    def teardown(self, events, styles):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def time_read_file(self, events, styles):
+        SubtitleDocument.from_file(self.ass_track_path)
+
+    def time_get_style_lines(self, events, styles):
+        get_style_lines(self.document.lines, self.format_lines["style"][1])
+
+    def time_get_dialogue_lines(self, events, styles):
+        get_dialogue_lines(self.document.lines, self.format_lines["dialogue"][1])
+
+    def time_parse_subtitle(self, events, styles):
+        parse_subtitle(self.ass_track_path)
@@ -0,0 +1,96 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.generators import PLAY_RES, generate_ass, generate_font_directory
+from mkvrestyle.cli import (
+    join_line_values,
+    parse_subtitle,
+    resample_mean,
+    resample_values,
+    restyle_subtitle,
+)
+from mkvrestyle.fonts import FontFinder
+from mkvrestyle.fontstore import FontStore
+from mkvrestyle.preset import compile_preset
+
+DEFAULT_PRESET_PATH = Path(__file__).parents[1].joinpath("preset", "default.json")
+
+
+class ResampleSuite:
+    params = [[1000, 20000]]
+    param_names = ["events"]
+
+    def setup(self, events):
+        self.folder = Path(tempfile.mkdtemp())
+        ass_track_path = self.folder.joinpath("track.ass")
+        ass_track_path.write_bytes(generate_ass(events, styles=50, fonts=5))
+        self.subtitle = parse_subtitle(ass_track_path)
+
+        # The default preset, without substituting the font
+        with DEFAULT_PRESET_PATH.open("r") as file:
+            preset = json.load(file)
+        del preset["FontName"]
+        self.preset = compile_preset(preset, DEFAULT_PRESET_PATH)
+
+        resolution = self.subtitle["resolution"]
+        self.video_dimensions = {"PlayResX": PLAY_RES[0], "PlayResY": PLAY_RES[1]}
+        self.ass_resample_mean = resample_mean(
+            PLAY_RES,
+            [resolution["PlayResX"][-1][0], resolution["PlayResY"][-1][0]],
+        )
+
+        # The fonts used by the styles are available on the "filesystem"
+        available_fonts = [
+            {
+                "file_path": font_file,
+                "file_name": font_file.name,
+                **FontFinder.font_info_by_file(font_file),
+            }
+            for font_file in generate_font_directory(
+                self.folder.joinpath("fonts"), families=5
+            )
+        ]
+        self.ass = ["track.ass", ass_track_path, available_fonts]
+        self.font_store = FontStore(self.folder.joinpath("store"))
+        self.folder.joinpath("output", "attachments").mkdir(parents=True)
+
+    def teardown(self, events):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def time_resample_styles(self, events):
+        for _, style in self.subtitle["style_lines_kept"]:
+            restyled = resample_values(
+                style,
+                self.preset.style_columns_for(style["Name"]),
+                self.ass_resample_mean,
+            )
+            if restyled is not None:
+                join_line_values(restyled)
+
+    def time_resample_dialogue(self, events):
+        dialogue_columns_by_style = {
+            style_name: self.preset.dialogue_columns_for(style_name.decode("utf-8"))
+            for style_name in self.subtitle["style_names_dialogue_all"]
+        }
+        for _, dialogue in self.subtitle["dialogue_lines"]:
+            resampled = resample_values(
+                dialogue,
+                dialogue_columns_by_style[dialogue["Style"]],
+                self.ass_resample_mean,
+            )
+            if resampled is not None:
+                join_line_values(resampled)
+
+    def time_restyle_subtitle(self, events):
+        restyle_subtitle(
+            self.subtitle,
+            self.preset,
+            self.video_dimensions,
+            self.ass,
+            [],
+            self.folder.joinpath("output", "track.ass"),
+            self.folder.joinpath("output", "attachments"),
+            self.font_store,
+        )
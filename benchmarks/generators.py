@@ -0,0 +1,450 @@
+# Deterministic generators for the benchmark inputs; the generated files only depend on the given sizes and seed
+import random
+import struct
+from pathlib import Path
+
+from fontTools.fontBuilder import FontBuilder  # type: ignore
+from fontTools.pens.ttGlyphPen import TTGlyphPen  # type: ignore
+
+PLAY_RES = (1920, 1080)
+
+STYLE_FORMAT = [
+    "Name",
+    "Fontname",
+    "Fontsize",
+    "PrimaryColour",
+    "SecondaryColour",
+    "OutlineColour",
+    "BackColour",
+    "Bold",
+    "Italic",
+    "Underline",
+    "StrikeOut",
+    "ScaleX",
+    "ScaleY",
+    "Spacing",
+    "Angle",
+    "BorderStyle",
+    "Outline",
+    "Shadow",
+    "Alignment",
+    "MarginL",
+    "MarginR",
+    "MarginV",
+    "Encoding",
+]
+EVENT_FORMAT = [
+    "Layer",
+    "Start",
+    "End",
+    "Style",
+    "Name",
+    "MarginL",
+    "MarginR",
+    "MarginV",
+    "Effect",
+    "Text",
+]
+
+WORDS = [
+    "the",
+    "quick",
+    "brown",
+    "fox",
+    "jumps",
+    "over",
+    "lazy",
+    "dog",
+    "subtitle",
+    "restyle",
+    "typesetting",
+    "karaoke",
+    "über",
+    "café",
+    "日本語",
+]
+
+FONT_GLYPHS = {chr(code): f"uni{code:04X}" for code in range(0x21, 0x7F)}
+
+# Matroska element IDs, including their length marker bits
+EBML = 0x1A45DFA3
+EBML_VERSION = 0x4286
+EBML_READ_VERSION = 0x42F7
+EBML_MAX_ID_LENGTH = 0x42F2
+EBML_MAX_SIZE_LENGTH = 0x42F3
+DOC_TYPE = 0x4282
+DOC_TYPE_VERSION = 0x4287
+DOC_TYPE_READ_VERSION = 0x4285
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMESTAMP_SCALE = 0x2AD7B1
+MUXING_APP = 0x4D80
+WRITING_APP = 0x5741
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_UID = 0x73C5
+TRACK_TYPE = 0x83
+FLAG_LACING = 0x9C
+LANGUAGE = 0x22B59C
+CODEC_ID = 0x86
+CODEC_PRIVATE = 0x63A2
+TRACK_NAME = 0x536E
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+CLUSTER = 0x1F43B675
+CLUSTER_TIMESTAMP = 0xE7
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+BLOCK_DURATION = 0x9B
+ATTACHMENTS = 0x1941A469
+ATTACHED_FILE = 0x61A7
+FILE_NAME = 0x466E
+FILE_MEDIA_TYPE = 0x4660
+FILE_DATA = 0x465C
+FILE_UID = 0x46AE
+
+TRACK_TYPE_VIDEO = 1
+TRACK_TYPE_SUBTITLE = 17
+
+
+def format_ass_time(milliseconds: int) -> str:
+    centiseconds = milliseconds // 10
+    return (
+        f"{centiseconds // 360000}:{centiseconds // 6000 % 60:02d}:"
+        f"{centiseconds // 100 % 60:02d}.{centiseconds % 100:02d}"
+    )
+
+
+def generate_ass_header(styles: int = 10, fonts: int = 5) -> str:
+    """
+    Generate the `[Script Info]` and `[V4+ Styles]` sections and the `[Events]` format line of an ASS subtitle.
+
+    Parameters:
+        styles (int, optional): The amount of styles. The default is 10.
+        fonts (int, optional): The amount of distinct fonts used by the styles, named `Bench Font <n>`. The default
+        is 5.
+
+    Returns:
+        str: The header.
+    """
+
+    style_lines = [
+        f"Style: Style{index},Bench Font {index % fonts},{48 + index % 24},&H00FFFFFF,&H000000FF,&H00000000,"
+        f"&H80000000,{-(index % 2)},0,0,0,100,100,0,0,1,{2 + index % 3},1,{1 + index % 9},30,30,{20 + index},1"
+        for index in range(styles)
+    ]
+
+    return "\n".join(
+        [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            "WrapStyle: 0",
+            f"PlayResX: {PLAY_RES[0] // 2}",
+            f"PlayResY: {PLAY_RES[1] // 2}",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            f"Format: {', '.join(STYLE_FORMAT)}",
+            *style_lines,
+            "",
+            "[Events]",
+            f"Format: {', '.join(EVENT_FORMAT)}",
+        ]
+    )
+
+
+def generate_ass_events(
+    events: int = 1000,
+    styles: int = 10,
+    fonts: int = 5,
+    override_density: float = 0.3,
+    seed: int = 0,
+) -> list:
+    """
+    Generate the dialogue events of an ASS subtitle.
+
+    Parameters:
+        events (int, optional): The amount of events. The default is 1000.
+        styles (int, optional): The amount of styles to pick from. The default is 10.
+        fonts (int, optional): The amount of fonts to pick from for `\\fn` overrides. The default is 5.
+        override_density (float, optional): The chance of an override block per word. The default is 0.3.
+        seed (int, optional): The seed of the generator. The default is 0.
+
+    Returns:
+        list: The events, as start and end in milliseconds, layer, style name and text.
+    """
+
+    generator = random.Random(seed)
+    overrides = [
+        lambda: f"{{\\fnBench Font {generator.randrange(fonts)}}}",
+        lambda: f"{{\\pos({generator.randrange(PLAY_RES[0] // 2)},{generator.randrange(PLAY_RES[1] // 2)})}}",
+        lambda: f"{{\\c&H{generator.randrange(0xFFFFFF):06X}&\\bord{generator.randrange(5)}}}",
+        lambda: f"{{\\k{generator.randrange(10, 100)}}}",
+        lambda: "{\\i1}",
+        lambda: "\\N",
+    ]
+
+    generated = []
+    start = 0
+    for _ in range(events):
+        start += generator.randrange(100, 3000)
+        words = []
+        for _ in range(generator.randrange(3, 15)):
+            if generator.random() < override_density:
+                words.append(generator.choice(overrides)())
+            words.append(generator.choice(WORDS))
+        generated.append(
+            (
+                start,
+                start + generator.randrange(500, 5000),
+                generator.randrange(3),
+                f"Style{generator.randrange(styles)}",
+                " ".join(words),
+            )
+        )
+
+    return generated
+
+
+def generate_ass(
+    events: int = 1000,
+    styles: int = 10,
+    fonts: int = 5,
+    override_density: float = 0.3,
+    seed: int = 0,
+) -> bytes:
+    """
+    Generate an ASS subtitle, see `generate_ass_header` and `generate_ass_events`.
+
+    Returns:
+        bytes: The UTF-8 encoded subtitle.
+    """
+
+    dialogue_lines = [
+        f"Dialogue: {layer},{format_ass_time(start)},{format_ass_time(end)},{style},,0,0,0,,{text}"
+        for start, end, layer, style, text in generate_ass_events(
+            events, styles, fonts, override_density, seed
+        )
+    ]
+
+    return (
+        "\n".join([generate_ass_header(styles, fonts), *dialogue_lines]) + "\n"
+    ).encode("utf-8")
+
+
+def generate_font(output_file: Path, family: str, style: str = "Regular") -> None:
+    """
+    Generate a TrueType font with a box glyph for every printable ASCII character.
+
+    Parameters:
+        output_file (Path): The path to write the font to.
+        family (str): The font family name.
+        style (str, optional): The font style name. The default is `Regular`.
+
+    Returns:
+        None
+    """
+
+    glyph_order = [".notdef", "space", *FONT_GLYPHS.values()]
+
+    pen = TTGlyphPen(None)
+    pen.moveTo((50, 0))
+    pen.lineTo((50, 700))
+    pen.lineTo((450, 700))
+    pen.lineTo((450, 0))
+    pen.closePath()
+    box = pen.glyph()
+    empty = TTGlyphPen(None).glyph()
+
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_order)
+    builder.setupCharacterMap(
+        {0x20: "space", **{ord(c): g for c, g in FONT_GLYPHS.items()}}
+    )
+    builder.setupGlyf(
+        {name: (empty if name == "space" else box) for name in glyph_order}
+    )
+    builder.setupHorizontalMetrics({name: (500, 50) for name in glyph_order})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable(
+        {
+            "familyName": family,
+            "styleName": style,
+            # Styles refer to the full name, which is the family name for the regular style
+            "fullName": family if style == "Regular" else f"{family} {style}",
+            "psName": f"{family}-{style}".replace(" ", ""),
+        }
+    )
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(output_file))
+
+
+def generate_font_directory(
+    output_folder: Path,
+    families: int = 10,
+    styles: tuple = ("Regular", "Bold", "Italic"),
+) -> list:
+    """
+    Generate a directory of fonts named `Bench Font <n>`, with a file per family and style.
+
+    Parameters:
+        output_folder (Path): The directory to write the fonts to.
+        families (int, optional): The amount of families. The default is 10.
+        styles (tuple, optional): The styles per family. The default is Regular, Bold and Italic.
+
+    Returns:
+        list: The paths of the generated fonts.
+    """
+
+    output_folder.mkdir(parents=True, exist_ok=True)
+    font_files = []
+    for family in range(families):
+        for style in styles:
+            font_file = output_folder.joinpath(f"BenchFont{family}-{style}.ttf")
+            generate_font(font_file, f"Bench Font {family}", style)
+            font_files.append(font_file)
+
+    return font_files
+
+
+def ebml_size(size: int) -> bytes:
+    for length in range(1, 9):
+        if size < (1 << (7 * length)) - 1:
+            return (size | (1 << (7 * length))).to_bytes(length, "big")
+
+    raise ValueError(f"Element too large: {size} bytes")
+
+
+def ebml_element(element_id: int, data: bytes) -> bytes:
+    return (
+        element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+        + ebml_size(len(data))
+        + data
+    )
+
+
+def ebml_uint(element_id: int, value: int) -> bytes:
+    return ebml_element(
+        element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big")
+    )
+
+
+def ebml_string(element_id: int, value: str) -> bytes:
+    return ebml_element(element_id, value.encode("utf-8"))
+
+
+def write_mkv(
+    output_file: Path,
+    ass_header: str,
+    events: list,
+    attachments: list,
+    pixel_dimensions: tuple = PLAY_RES,
+    language: str = "eng",
+) -> None:
+    """
+    Write a minimal Matroska file with a video track without frames, an ASS subtitle track and font attachments.
+
+    Parameters:
+        output_file (Path): The path to write the file to.
+        ass_header (str): The ASS header, stored as codec private data, see `generate_ass_header`.
+        events (list): The subtitle events, see `generate_ass_events`.
+        attachments (list): The paths of the fonts to attach.
+        pixel_dimensions (tuple, optional): The width and height of the video track. The default is 1920x1080.
+        language (str, optional): The language of the subtitle track. The default is `eng`.
+
+    Returns:
+        None
+    """
+
+    header = ebml_element(
+        EBML,
+        ebml_uint(EBML_VERSION, 1)
+        + ebml_uint(EBML_READ_VERSION, 1)
+        + ebml_uint(EBML_MAX_ID_LENGTH, 4)
+        + ebml_uint(EBML_MAX_SIZE_LENGTH, 8)
+        + ebml_string(DOC_TYPE, "matroska")
+        + ebml_uint(DOC_TYPE_VERSION, 4)
+        + ebml_uint(DOC_TYPE_READ_VERSION, 2),
+    )
+
+    duration = max((end for _, end, *_ in events), default=0)
+    info = ebml_element(
+        INFO,
+        ebml_uint(TIMESTAMP_SCALE, 1000000)
+        + ebml_string(MUXING_APP, "mkvrestyle-benchmarks")
+        + ebml_string(WRITING_APP, "mkvrestyle-benchmarks")
+        + ebml_element(DURATION, struct.pack(">d", float(duration))),
+    )
+
+    tracks = ebml_element(
+        TRACKS,
+        ebml_element(
+            TRACK_ENTRY,
+            ebml_uint(TRACK_NUMBER, 1)
+            + ebml_uint(TRACK_UID, 1)
+            + ebml_uint(TRACK_TYPE, TRACK_TYPE_VIDEO)
+            + ebml_uint(FLAG_LACING, 0)
+            + ebml_string(CODEC_ID, "V_MPEG1")
+            + ebml_element(
+                VIDEO,
+                ebml_uint(PIXEL_WIDTH, pixel_dimensions[0])
+                + ebml_uint(PIXEL_HEIGHT, pixel_dimensions[1]),
+            ),
+        )
+        + ebml_element(
+            TRACK_ENTRY,
+            ebml_uint(TRACK_NUMBER, 2)
+            + ebml_uint(TRACK_UID, 2)
+            + ebml_uint(TRACK_TYPE, TRACK_TYPE_SUBTITLE)
+            + ebml_uint(FLAG_LACING, 0)
+            + ebml_string(LANGUAGE, language)
+            + ebml_string(TRACK_NAME, "Full")
+            + ebml_string(CODEC_ID, "S_TEXT/ASS")
+            + ebml_element(CODEC_PRIVATE, (ass_header + "\n").encode("utf-8")),
+        ),
+    )
+
+    # A cluster per event, so the block timestamps are always 0 relative to the cluster
+    clusters = b"".join(
+        ebml_element(
+            CLUSTER,
+            ebml_uint(CLUSTER_TIMESTAMP, start)
+            + ebml_element(
+                BLOCK_GROUP,
+                ebml_element(
+                    BLOCK,
+                    # Track number, timestamp relative to the cluster and flags
+                    ebml_size(2)
+                    + struct.pack(">hB", 0, 0)
+                    + f"{read_order},{layer},{style},,0,0,0,,{text}".encode("utf-8"),
+                )
+                + ebml_uint(BLOCK_DURATION, end - start),
+            ),
+        )
+        for read_order, (start, end, layer, style, text) in enumerate(
+            sorted(events, key=lambda event: event[0])
+        )
+    )
+
+    attached_files = ebml_element(
+        ATTACHMENTS,
+        b"".join(
+            ebml_element(
+                ATTACHED_FILE,
+                ebml_string(FILE_NAME, Path(attachment).name)
+                + ebml_string(FILE_MEDIA_TYPE, "font/ttf")
+                + ebml_element(FILE_DATA, Path(attachment).read_bytes())
+                + ebml_uint(FILE_UID, index + 1),
+            )
+            for index, attachment in enumerate(attachments)
+        ),
+    )
+
+    segment = ebml_element(SEGMENT, info + tracks + attached_files + clusters)
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_bytes(header + segment)
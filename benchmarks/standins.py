@@ -0,0 +1,277 @@
+# Stand-ins for `mkvmerge`, `mkvextract` and `ffprobe`, which replay fixtures instead of reading media, so the
+# orchestration around the tools can be measured on any Linux machine
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+STANDIN_TOOLS = ["mkvmerge", "mkvextract", "ffprobe"]
+STANDIN_CONFIG_FILE_NAME = "standins.json"
+
+# MKVmerge options without a value
+MKVMERGE_FLAGS = {"--identify", "--no-attachments"}
+
+STANDIN_SCRIPT = """#!{executable}
+import sys
+
+sys.path.insert(0, {root!r})
+from benchmarks.standins import main
+
+sys.exit(main({config!r}))
+"""
+
+
+def identify_output(tracks: list, attachments: list, dimensions: tuple) -> dict:
+    """
+    Build the MKVmerge identification output of a file with a video track, subtitle tracks and font attachments.
+
+    Parameters:
+        tracks (list): The language and track name per ASS subtitle track; the track IDs start at 1.
+        attachments (list): The paths of the fonts; the attachment IDs start at 1.
+        dimensions (tuple): The width and height of the video track.
+
+    Returns:
+        dict: The identification output, see `mkvmerge --identify --identification-format json`.
+    """
+
+    return {
+        "attachments": [
+            {
+                "id": index + 1,
+                "file_name": Path(attachment).name,
+                "content_type": "font/ttf",
+                "size": Path(attachment).stat().st_size,
+            }
+            for index, attachment in enumerate(attachments)
+        ],
+        "tracks": [
+            {
+                "id": 0,
+                "type": "video",
+                "codec": "MPEG-1/2",
+                "properties": {
+                    "codec_id": "V_MPEG1",
+                    "language": "und",
+                    "pixel_dimensions": f"{dimensions[0]}x{dimensions[1]}",
+                },
+            },
+            *[
+                {
+                    "id": index + 1,
+                    "type": "subtitles",
+                    "codec": "SubStationAlpha",
+                    "properties": {
+                        "codec_id": "S_TEXT/ASS",
+                        "language": language,
+                        "track_name": track_name,
+                    },
+                }
+                for index, (language, track_name) in enumerate(tracks)
+            ],
+        ],
+    }
+
+
+def should_fail(config: dict, tool: str, input_file: str) -> bool:
+    """
+    Decide whether a tool fails for an input file; the same input always fails with the same seed and rate.
+
+    Parameters:
+        config (dict): The stand-in configuration, see `write_standins`.
+        tool (str): The tool, e.g. `mkvextract`.
+        input_file (str): The input file.
+
+    Returns:
+        bool: Whether the tool fails.
+    """
+
+    failure_rate = config.get("failure_rate", {}).get(tool, 0.0)
+    if failure_rate <= 0:
+        return False
+
+    value = hashlib.sha256(
+        f"{config.get('seed', 0)}:{tool}:{Path(input_file).name}".encode("utf-8")
+    ).digest()
+
+    return int.from_bytes(value[:8], "big") / 2**64 < failure_rate
+
+
+def input_file_argument(tool: str, arguments: list) -> str:
+    if tool == "mkvextract":
+        return arguments[1]
+    if tool == "ffprobe" or "--identify" in arguments:
+        return arguments[-1]
+
+    # The first file of an MKVmerge command is the input file
+    index = 0
+    while arguments[index].startswith("-"):
+        index += 1 if arguments[index] in MKVMERGE_FLAGS else 2
+
+    return arguments[index]
+
+
+def run_mkvmerge(config: dict, arguments: list) -> int:
+    if "--identify" in arguments:
+        print(json.dumps(config["identify"]))
+        return 0
+
+    # Remux; the output only needs to exist
+    output_file = Path(arguments[arguments.index("--output") + 1])
+    shutil.copyfile(input_file_argument("mkvmerge", arguments), output_file)
+
+    return 0
+
+
+def run_mkvextract(config: dict, arguments: list) -> int:
+    mode = arguments[0]
+    fixtures = config["tracks"] if mode == "tracks" else config["attachments"]
+    for specification in arguments[2:]:
+        identifier, destination = specification.split(":", 1)
+        if identifier not in fixtures:
+            print(f"Error: no {mode} with the ID {identifier}.", file=sys.stderr)
+            return 2
+
+        shutil.copyfile(fixtures[identifier], destination)
+
+    return 0
+
+
+def run_ffprobe(config: dict, arguments: list) -> int:
+    width, height = config["dimensions"]
+    print(json.dumps({"streams": [{"width": width, "height": height}]}))
+
+    return 0
+
+
+def main(config_path: str) -> int:
+    """
+    Run a stand-in; the tool is the name of the executable.
+
+    Parameters:
+        config_path (str): The path to the stand-in configuration.
+
+    Returns:
+        int: The exit code.
+    """
+
+    started = time.perf_counter()
+    tool = Path(sys.argv[0]).name
+    arguments = sys.argv[1:]
+    with open(config_path, mode="r") as file:
+        config = json.load(file)
+
+    time.sleep(config.get("latency", {}).get(tool, 0.0))
+
+    input_file = input_file_argument(tool, arguments)
+    if should_fail(config, tool, input_file):
+        print(f"Error: injected failure for `{input_file}`.", file=sys.stderr)
+        exit_code = 2
+    else:
+        exit_code = {
+            "mkvmerge": run_mkvmerge,
+            "mkvextract": run_mkvextract,
+            "ffprobe": run_ffprobe,
+        }[tool](config, arguments)
+
+    if config.get("log") is not None:
+        with open(config["log"], mode="a") as file:
+            file.write(
+                json.dumps(
+                    {
+                        "tool": tool,
+                        "arguments": arguments,
+                        "exit_code": exit_code,
+                        "duration": time.perf_counter() - started,
+                    }
+                )
+                + "\n"
+            )
+
+    return exit_code
+
+
+def write_standins(
+    bin_folder: Path,
+    identify: dict,
+    tracks: dict,
+    attachments: dict,
+    dimensions: tuple,
+    latency: dict | None = None,
+    failure_rate: dict | None = None,
+    seed: int = 0,
+    log_file: Path | None = None,
+) -> Path:
+    """
+    Write the stand-in executables and their configuration.
+
+    Parameters:
+        bin_folder (Path): The directory to write the executables to, to put on `PATH`.
+        identify (dict): The MKVmerge identification output for every input file, see `identify_output`.
+        tracks (dict): The fixture subtitle file per track ID.
+        attachments (dict): The fixture font file per attachment ID.
+        dimensions (tuple): The width and height reported by FFprobe.
+        latency (dict | None, optional): The delay per call per tool, in seconds. The default is None.
+        failure_rate (dict | None, optional): The share of input files for which a tool fails, per tool. The default
+        is None.
+        seed (int, optional): The seed which decides which input files fail. The default is 0.
+        log_file (Path | None, optional): The file to log every call to, as JSON lines. The default is None.
+
+    Returns:
+        Path: The path to the configuration, which can be changed between runs.
+    """
+
+    bin_folder.mkdir(parents=True, exist_ok=True)
+    config_path = bin_folder.joinpath(STANDIN_CONFIG_FILE_NAME)
+    with config_path.open("w") as file:
+        json.dump(
+            {
+                "identify": identify,
+                "tracks": {str(key): str(value) for key, value in tracks.items()},
+                "attachments": {
+                    str(key): str(value) for key, value in attachments.items()
+                },
+                "dimensions": list(dimensions),
+                "latency": latency or {},
+                "failure_rate": failure_rate or {},
+                "seed": seed,
+                "log": str(log_file) if log_file is not None else None,
+            },
+            file,
+        )
+
+    for tool in STANDIN_TOOLS:
+        script_path = bin_folder.joinpath(tool)
+        script_path.write_text(
+            STANDIN_SCRIPT.format(
+                executable=sys.executable,
+                root=str(Path(__file__).parents[1]),
+                config=str(config_path),
+            )
+        )
+        script_path.chmod(0o755)
+
+    return config_path
+
+
+@contextlib.contextmanager
+def standins_on_path(bin_folder: Path):
+    """
+    Put the stand-ins first on `PATH`, restoring it afterwards.
+
+    Parameters:
+        bin_folder (Path): The directory with the stand-in executables, see `write_standins`.
+
+    Returns:
+        Generator: The context.
+    """
+
+    path = os.environ.get("PATH", "")
+    os.environ["PATH"] = os.pathsep.join([str(bin_folder), path])
+    try:
+        yield
+    finally:
+        os.environ["PATH"] = path
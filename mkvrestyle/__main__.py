@@ -1,4 +1,4 @@
-from mkvrestyle.cli import cli
+from mkvrestyle.cli import main
 
 if __name__ == "__main__":
     """
@@ -7,4 +7,4 @@ if __name__ == "__main__":
     Documentation: https://github.com/ToshY/mkvrestyle
     """
 
-    cli()
+    main()
@@ -1,10 +1,39 @@
+import itertools
+
 import click
 from pathlib import Path
-from mkvrestyle.helper import (
-    files_in_dir,
-    read_json,
-    replace_conflicting_characters_in_filename,
-)
+from mkvrestyle.helper import iterate_files_in_dir
+from mkvrestyle.preset import load_preset
+from mkvrestyle.selection import load_stream_policy
+
+
+# Output directories, which the lazy discovery of input files does not descend into
+EXCLUDED_FOLDERS_KEY = "mkvrestyle.excluded_folders"
+
+
+def get_excluded_folders(ctx) -> set:
+    """
+    Get the output directories of the run, shared between the input and output path options.
+
+    The input files are discovered while the outputs are written, so output directories inside an input directory are
+    skipped to not process the outputs of the run (or of previous runs) again.
+    """
+
+    return ctx.meta.setdefault(EXCLUDED_FOLDERS_KEY, set())
+
+
+def get_amount_of_input_values(ctx) -> int:
+    """
+    Get the amount of input values, without scanning the input paths again.
+
+    The input path option is eager, so it is normally already processed; otherwise its default is a single path.
+    """
+
+    input_path = ctx.params.get("input_path")
+    if input_path is None:
+        return 1
+
+    return len(input_path)
 
 
 class InputPathChecker:
@@ -20,27 +49,30 @@ class InputPathChecker:
                 if p.is_file():
                     current_batch = {
                         **current_batch,
-                        "input": {
-                            "given": path,
-                            "resolved": [replace_conflicting_characters_in_filename(p)],
-                        },
+                        "input": {"given": path, "resolved": [p]},
                     }
                 elif p.is_dir():
-                    files = files_in_dir(p)
-                    amount_of_files_in_directory = len(files)
-                    if amount_of_files_in_directory == 0:
+                    # Files are discovered lazily while processing; only the first one is looked up front
+                    excluded_folders = get_excluded_folders(ctx)
+                    files = iterate_files_in_dir(p, excluded_folders=excluded_folders)
+                    first_file = next(files, None)
+                    if first_file is None:
                         raise click.BadParameter("No files found in directory")
 
-                    for current_file_index, current_file_path in enumerate(files):
-                        files[current_file_index] = (
-                            replace_conflicting_characters_in_filename(
-                                current_file_path
-                            )
+                    # The output directories are only known once the output path option is processed
+                    first_files = (
+                        file
+                        for file in [first_file]
+                        if not any(
+                            file.is_relative_to(folder) for folder in excluded_folders
                         )
-
+                    )
                     current_batch = {
                         **current_batch,
-                        "input": {"given": path, "resolved": files},
+                        "input": {
+                            "given": path,
+                            "resolved": itertools.chain(first_files, files),
+                        },
                     }
                 else:
                     raise click.BadParameter("Not a file or directory")
@@ -51,18 +83,32 @@ class InputPathChecker:
         return results
 
 
+def check_remux_inputs(input_batch: dict, output_folder: Path) -> None:
+    """
+    Refuse input files inside the output directory when remuxing, as the output file would overwrite the input file.
+
+    The files of input directories are not checked, as the output directories are never descended into.
+    """
+
+    input_files = input_batch["input"]["resolved"]
+    if not isinstance(input_files, list):
+        return
+
+    for input_file in input_files:
+        if input_file.is_relative_to(output_folder):
+            raise click.BadParameter(
+                f"The input file `{input_file}` is inside the output directory `{output_folder}`, so the remuxed "
+                f"output would overwrite it."
+            )
+
+
 class OutputPathChecker:
     def __call__(self, ctx, param, value):
         if value is None:
             raise click.BadParameter("No path provided")
 
         amount_of_current_param_values = len(value)
-        input_path = ctx.params.get("input_path")
-        if input_path is None:
-            input_path_checker = InputPathChecker()
-            input_path = input_path_checker(ctx, param, ["./input"])
-
-        amount_of_input_values = len(input_path)
+        amount_of_input_values = get_amount_of_input_values(ctx)
 
         if amount_of_input_values != amount_of_current_param_values:
             raise click.BadParameter(
@@ -71,9 +117,14 @@ class OutputPathChecker:
             )
 
         results = []
+        excluded_folders = get_excluded_folders(ctx)
+        input_batches = ctx.params.get("input_path") or []
         for batch_number, path in enumerate(value):
             current_batch = {"batch": batch_number + 1}
             p = Path(path)
+            excluded_folders.add(p.with_suffix(""))
+            if ctx.params.get("remux") and batch_number < len(input_batches):
+                check_remux_inputs(input_batches[batch_number], p.with_suffix(""))
             if p.suffix:
                 if not p.parent.is_dir():
                     raise FileNotFoundError(
@@ -103,16 +154,13 @@ class PresetPathChecker:
             raise click.BadParameter("No path provided")
 
         amount_of_current_param_values = len(value)
-        input_path = ctx.params.get("input_path")
-        if input_path is None:
-            input_path_checker = InputPathChecker()
-            input_path = input_path_checker(ctx, param, ["./input"])
-
-        amount_of_input_values = len(input_path)
+        amount_of_input_values = get_amount_of_input_values(ctx)
+        fan_out = ctx.params.get("fan_out", False)
 
-        # Either give 1 value or same exact amount as input values.
+        # Either give 1 value or same exact amount as input values, unless every preset is applied to every input.
         if (
-            amount_of_input_values != amount_of_current_param_values
+            not fan_out
+            and amount_of_input_values != amount_of_current_param_values
             and amount_of_current_param_values != 1
         ):
             raise click.BadParameter(
@@ -120,24 +168,41 @@ class PresetPathChecker:
                 f"equal amount of preset values ({amount_of_current_param_values})."
             )
 
-        to_be_enumerated = value
-        if amount_of_input_values != amount_of_current_param_values:
-            to_be_enumerated = value * amount_of_input_values
-
-        results = []
-        for batch_number, path in enumerate(to_be_enumerated):
-            current_batch: dict = {"batch": batch_number + 1}
+        # Each distinct preset is read and compiled only once
+        compiled_presets: dict = {}
+        for path in value:
             p = Path(path)
             if p.exists():
                 if p.is_file():
-                    current_batch = {**current_batch, "preset": read_json(p)}
+                    preset_key = p.resolve()
+                    if preset_key not in compiled_presets:
+                        compiled_presets[preset_key] = load_preset(p)
                 else:
                     raise click.BadParameter("Not a file")
             else:
                 raise click.BadParameter("Path does not exist")
-            results.append(current_batch)
 
-        return results
+        presets = [compiled_presets[Path(path).resolve()] for path in value]
+
+        if fan_out:
+            preset_names = [preset.path.stem for preset in compiled_presets.values()]
+            if len(set(preset_names)) != len(preset_names):
+                raise click.BadParameter(
+                    "Presets must have unique file names when applying every preset to every input."
+                )
+
+            return [
+                {"batch": batch_number + 1, "preset": list(compiled_presets.values())}
+                for batch_number in range(amount_of_input_values)
+            ]
+
+        if amount_of_input_values != amount_of_current_param_values:
+            presets = presets * amount_of_input_values
+
+        return [
+            {"batch": batch_number + 1, "preset": [current_preset]}
+            for batch_number, current_preset in enumerate(presets)
+        ]
 
 
 class OptionalValueChecker:
@@ -146,12 +211,7 @@ class OptionalValueChecker:
             raise click.BadParameter("No path provided")
 
         amount_of_current_param_values = len(value)
-        input_path = ctx.params.get("input_path")
-        if input_path is None:
-            input_path_checker = InputPathChecker()
-            input_path = input_path_checker(ctx, param, ["./input"])
-
-        amount_of_input_values = len(input_path)
+        amount_of_input_values = get_amount_of_input_values(ctx)
 
         # Either give 1 value or same exact amount as input values.
         if (
@@ -176,6 +236,18 @@ class OptionalValueChecker:
         return results
 
 
+class StreamPolicyPathChecker:
+    def __call__(self, ctx, param, value):
+        if value is None:
+            return None
+
+        p = Path(value)
+        if not p.is_file():
+            raise click.BadParameter("Not a file")
+
+        return load_stream_policy(p)
+
+
 class ClickUnionType(click.ParamType):
     name = "int|string"
 
@@ -1,10 +1,15 @@
-import itertools
+import contextlib
+import functools
+import hashlib
 import json
 import os
 import re
 import shutil
+import sys
+import time
 from collections import Counter
 from pathlib import Path
+from typing import Callable
 
 import click
 from loguru import logger  # noqa
@@ -16,51 +21,121 @@ from mkvrestyle.args import (
     PresetPathChecker,
     OptionalValueChecker,
     ClickUnionType,
+    StreamPolicyPathChecker,
 )
 from mkvrestyle.exception import (
     FontNotFoundError,
-    InvalidFontNameError,
     InvalidSubtitleFormatLines,
+    SubtitleCodecError,
     SubtitleNotFoundError,
-    InvalidFontSubstituteOptionError,
+    SubtitleStreamNotFoundError,
 )
-from mkvrestyle.fonts import FontFinder
+from mkvrestyle.fontindex import FontIndex, write_font_index
+from mkvrestyle.fonts import FontFinder, font_coverage, uncovered_codepoints
+from mkvrestyle.fontstore import FONT_STORE_FOLDER_NAME, FontStore, publish_file
 from mkvrestyle.helper import (
-    read_file,
+    atomic_write,
     combine_arguments_by_batch,
+    get_cache_folder,
     get_subtitle_extension_from_codec_id,
+    get_scratch_folder,
+    get_tool_version,
+    replace_conflicting_characters_in_filename,
+)
+from mkvrestyle.journal import (
+    STAGE_COMPLETED,
+    STAGE_EXTRACTED,
+    STAGE_RESTYLED,
+    STAGE_RESUMED,
+    Journal,
+)
+from mkvrestyle.manifest import Manifest, fingerprint_file, options_digest
+from mkvrestyle.memprofile import MemoryProfiler
+from mkvrestyle.metrics import Metrics
+from mkvrestyle.preset import FontRule, PresetPlan
+from mkvrestyle.probecache import (
+    PROBE_CACHE_FILE_NAME,
+    PROBE_CACHE_MAX_ENTRIES,
+    PROBE_DIMENSIONS,
+    PROBE_IDENTIFY,
+    ProbeCache,
 )
 from mkvrestyle.process import ProcessCommand
-from mkvrestyle.table import table_print_stream_options
+from mkvrestyle.profiling import add_recorder, enable_profiling, span
+from mkvrestyle.report import (
+    FAILURE_REPORT_FILE_NAME,
+    OUTCOME_NO_SUBTITLES,
+    OUTCOME_PROCESSED,
+    OUTCOME_UP_TO_DATE,
+    STAGE_EXTRACT,
+    STAGE_FINALIZE,
+    STAGE_PUBLISH,
+    STAGE_REMUX,
+    FailureReport,
+    StageTracker,
+)
+from mkvrestyle.selection import FALLBACK_ERROR, StreamPolicy
+from mkvrestyle.stylecache import StyleCache, style_section_digest
+from mkvrestyle.subset import FontSubsetter
+from mkvrestyle.subtitle import SubtitleDocument
+from mkvrestyle.table import (
+    table_print_memory_profile,
+    table_print_profile,
+    table_print_stream_options,
+)
+
+
+STREAM_SELECT_ALL = "all"
+ASS_CODEC_IDS = ["S_TEXT/ASS", "S_TEXT/SSA"]
+
+# Track flags kept when remuxing, as identify property and MKVmerge option
+REMUX_TRACK_FLAGS = {
+    "default_track": "--default-track-flag",
+    "forced_track": "--forced-display-flag",
+    "enabled_track": "--track-enabled-flag",
+    "flag_hearing_impaired": "--hearing-impaired-flag",
+    "flag_visual_impaired": "--visual-impaired-flag",
+    "flag_text_descriptions": "--text-descriptions-flag",
+    "flag_original": "--original-flag",
+    "flag_commentary": "--commentary-flag",
+}
+
+ASS_OVERRIDE_BLOCK_REGEX = re.compile(r"\{[^}]*\}")
+ASS_FONT_OVERRIDE_TAG = b"\\fn"
+ASS_FONT_OVERRIDE_TERMINATORS = (b"\\", b"}")
+ASS_TEXT_ESCAPE_REGEX = re.compile(r"\\[Nnh]")
 
+# Amount of uncovered characters listed per font
+UNCOVERED_CHARACTERS_LIMIT = 20
 
-def get_lines_per_type(my_lines, split_at=["Format: "]):
+
+def get_lines_per_type(my_lines, split_at=[b"Format: "]):
     return [
-        (i, [x for x in re.split("|".join(split_at) + "|,[\s]?", s) if x])
+        (i, [x for x in re.split(b"|".join(split_at) + rb"|,[\s]?", s) if x])
         for i, s in enumerate(my_lines)
-        if any(s.startswith(xs) for xs in split_at)
+        if s.startswith(tuple(split_at))
     ]
 
 
 def get_format_lines(my_lines):
     rgx_style = (
-        r"^([Format]+):\s(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),"
-        r"[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),"
-        r"[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+)$"
+        rb"^([Format]+):\s(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),"
+        rb"[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),"
+        rb"[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+)$"
     )
     rgx_dialogue = (
-        r"^([Format]+):\s(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),"
-        r"[\s]?(\w+),[\s]?(\w+),[\s]?(\w+)$"
+        rb"^([Format]+):\s(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),[\s]?(\w+),"
+        rb"[\s]?(\w+),[\s]?(\w+),[\s]?(\w+)$"
     )
     format_line_style = [
-        (i, list(re.findall(rgx_style, x)[0]))
+        (i, [key.decode("ascii") for key in re.findall(rgx_style, x)[0]])
         for i, x in enumerate(my_lines)
-        if any(x.startswith(xs) for xs in ["Format: Name"])
+        if x.startswith(b"Format: Name")
     ]
     format_line_dialogue = [
-        (i, list(re.findall(rgx_dialogue, x)[0]))
+        (i, [key.decode("ascii") for key in re.findall(rgx_dialogue, x)[0]])
         for i, x in enumerate(my_lines)
-        if any(x.startswith(xs) for xs in ["Format: Layer"])
+        if x.startswith(b"Format: Layer")
     ]
     format_lines = format_line_style + format_line_dialogue
     if len(format_lines) > 2:
@@ -70,32 +145,58 @@ def get_format_lines(my_lines):
 
 
 def get_dialogue_lines(my_lines, keys):
-    rgx = (
-        r"^^([Dialogue]+|[Comment]+):\s(\d{1,}),(\d{1}:\d{2}:\d{2}.\d{2}),(\d{1}:\d{2}:\d{2}.\d{2}),(.*?),(.*?),"
-        r"([0-9.]{1,4}),([0-9.]{1,4}),([0-9.]{1,4}),([$^,]?|[^,]+?)?,(.*?)$"
+    """
+    Parse the `Dialogue`/`Comment` lines; values are kept as bytes, so the `Text` is only decoded when needed.
+    """
+
+    rgx = re.compile(
+        rb"^^([Dialogue]+|[Comment]+):\s(\d{1,}),(\d{1}:\d{2}:\d{2}.\d{2}),(\d{1}:\d{2}:\d{2}.\d{2}),(.*?),(.*?),"
+        rb"([0-9.]{1,4}),([0-9.]{1,4}),([0-9.]{1,4}),([$^,]?|[^,]+?)?,(.*?)$"
     )
     dialogue_lines = [
-        (i, dict(zip(keys, list(re.findall(rgx, x)[0]))))
+        (i, dict(zip(keys, rgx.findall(x)[0])))
         for i, x in enumerate(my_lines)
-        if any(x.startswith(xs) for xs in ["Dialogue", "Comment"])
+        if x.startswith((b"Dialogue", b"Comment"))
     ]
     return dialogue_lines
 
 
-def get_style_lines(my_lines, keys):
+def get_style_lines(my_lines, keys, encoding="utf-8"):
+    """
+    Parse the `Style` lines; values are decoded with the given encoding, as names may contain non-ASCII characters.
+    """
+
     rgx = (
-        r"^([Style]+):\s(.*?),(.*?),([0-9.]{1,}),(&H[a-fA-F0-9]{8}),(&H[a-fA-F0-9]{8}),(&H[a-fA-F0-9]{8}),"
-        r"(&H[a-fA-F0-9]{8}),(0|-1),(0|-1),(0|-1),(0|-1),([0-9.]{1,}),([0-9.]{1,}),([0-9.]{1,}),([0-9.]{1,}),"
-        r"(1|3),([0-9.]{1,}),([0-9.]{1,}),([1-9]),([0-9.]{1,4}),([0-9.]{1,4}),([0-9.]{1,4}),(\d{1,3})$"
+        rb"^([Style]+):\s(.*?),(.*?),([0-9.]{1,}),(&H[a-fA-F0-9]{8}),(&H[a-fA-F0-9]{8}),(&H[a-fA-F0-9]{8}),"
+        rb"(&H[a-fA-F0-9]{8}),(0|-1),(0|-1),(0|-1),(0|-1),([0-9.]{1,}),([0-9.]{1,}),([0-9.]{1,}),([0-9.]{1,}),"
+        rb"(1|3),([0-9.]{1,}),([0-9.]{1,}),([1-9]),([0-9.]{1,4}),([0-9.]{1,4}),([0-9.]{1,4}),(\d{1,3})$"
     )
     style_lines = [
-        (i, dict(zip(keys, list(re.findall(rgx, x)[0]))))
+        (
+            i,
+            dict(
+                zip(keys, [value.decode(encoding) for value in re.findall(rgx, x)[0]])
+            ),
+        )
         for i, x in enumerate(my_lines)
-        if any(x.startswith(xs) for xs in ["Style"])
+        if x.startswith(b"Style")
     ]
     return style_lines
 
 
+def join_line_values(line_values: dict, encoding="utf-8") -> bytes:
+    """
+    Rebuild an ASS line from its parsed values, e.g. `Style: Default,Arial,...`.
+    """
+
+    format_type, *format_values = [
+        value if isinstance(value, bytes) else str(value).encode(encoding)
+        for value in line_values.values()
+    ]
+
+    return format_type + b": " + b",".join(format_values)
+
+
 def prepare_track_info(file, index, codec, lang):
     return (
         file.stem
@@ -107,31 +208,29 @@ def prepare_track_info(file, index, codec, lang):
     )
 
 
-def extract_subtitles_and_fonts(
-    input_file, attachments_folder, stream_select: str | int | None = None
-):
+def mkvmerge_identify(input_file, probe_cache: ProbeCache | None = None) -> dict:
     """
-    Extracts subtitles and fonts from the input file.
+    Identify the tracks and attachments of the input file with MKVmerge.
 
     Parameters:
-        input_file (Path): The input file from which to extract subtitles and fonts.
-        attachments_folder (Path): The folder where the attachments are stored.
-        stream_select (str | int | None, optional): Optional parameter to select a specific stream for subtitles. The
-        default is None.
+        input_file (Path): The input file.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
 
     Returns:
-        list: A list containing the extracted subtitle file, the path to the associated attachments, and available
-        fonts.
+        dict: The MKVmerge identification output.
     """
 
-    input_file_string = str(input_file)
+    if probe_cache is not None:
+        cached_identify = probe_cache.get(input_file, PROBE_IDENTIFY)
+        if cached_identify is not None:
+            return cached_identify
 
     mkvmerge_identify_command = [
         "mkvmerge",
         "--identify",
         "--identification-format",
         "json",
-        input_file_string,
+        str(input_file),
     ]
 
     # MKV identify
@@ -139,7 +238,34 @@ def extract_subtitles_and_fonts(
     result = process.run("MKVmerge identify", mkvmerge_identify_command)
 
     # Json output
-    mkvmerge_identify_command_output = json.loads(result.stdout)
+    identify = json.loads(result.stdout)
+    if probe_cache is not None:
+        probe_cache.put(input_file, PROBE_IDENTIFY, identify)
+
+    return identify
+
+
+def identify_subtitle_tracks(
+    input_file, probe_cache: ProbeCache | None = None
+) -> tuple[list, list]:
+    """
+    Identify the subtitle tracks and attachments of the input file.
+
+    Parameters:
+        input_file (Path): The input file.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+
+    Returns:
+        tuple: A list of the subtitle tracks, with keys `index`, `codec`, `language`, `title` and `save_file`, and a
+        list of the attachments.
+
+    Raises:
+        SubtitleNotFoundError: If the input file has no subtitle tracks.
+    """
+
+    input_file_string = str(input_file)
+
+    mkvmerge_identify_command_output = mkvmerge_identify(input_file, probe_cache)
 
     # Get attachments
     attachments = mkvmerge_identify_command_output["attachments"]
@@ -171,58 +297,139 @@ def extract_subtitles_and_fonts(
     if not subtitle:
         raise SubtitleNotFoundError(input_file_string)
 
-    # No user input provided, so identify streams and ask for input
-    if stream_select is None:
-        selected_subs = subtitle[0]["index"]
-        # Request user input for stream type
-        if len(subtitle) > 1:
-            logger.info("Multiple `subtitle` streams detected")
+    return subtitle, attachments
 
-            table_print_stream_options(subtitle)
-            allowed = [str(sub["index"]) for sub in subtitle]
 
-            # Request user input
-            selected_subs = IntPrompt.ask(
-                "# Please specify the subtitle index to use: ",
-                choices=allowed,
-                default=selected_subs,
-                show_choices=True,
-                show_default=True,
-            )
-            logger.info(f"Selected subtitle stream index: {selected_subs}")
-    else:
-        if (isinstance(stream_select, int)) or stream_select.isnumeric():
-            selected_subs = stream_select
-        else:
-            selected_subs = next(
-                sub["index"] for sub in subtitle if sub["language"] == stream_select
-            )
+def select_restyle_tracks(
+    input_file,
+    stream_select: str | int | None,
+    stream_policy: StreamPolicy | None,
+    probe_cache: ProbeCache | None = None,
+) -> tuple[list, list]:
+    """
+    Identify the input file and select the subtitle tracks to restyle, without extracting anything.
 
-    selected_subs = next(
-        sub for sub in subtitle if int(sub["index"]) == int(selected_subs)
-    )
-    ass_track_path = Path(
-        os.path.join(attachments_folder.parent, selected_subs["save_file"])
+    Parameters:
+        input_file (Path): The input file.
+        stream_select (str | int | None): The subtitle stream selection, see `select_subtitle_tracks`.
+        stream_policy (StreamPolicy | None): The stream selection policy.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+
+    Returns:
+        tuple: A list of the selected subtitle tracks (empty if the file should be skipped), and a list of the
+        attachments.
+
+    Raises:
+        SubtitleNotFoundError: If the input file has no subtitle tracks.
+        SubtitleStreamNotFoundError: If no track matches and the file can not be skipped.
+        SubtitleCodecError: If a selected track is not an ASS track.
+    """
+
+    subtitle, attachments = identify_subtitle_tracks(input_file, probe_cache)
+
+    selected_subs = select_subtitle_tracks(
+        subtitle, stream_select, stream_policy, str(input_file)
     )
+    for selected_sub in selected_subs:
+        if selected_sub["codec"] not in ASS_CODEC_IDS:
+            raise SubtitleCodecError(selected_sub["codec"])
+
+    return selected_subs, attachments
+
+
+def extract_subtitle_tracks(
+    input_file, selected_subs: list, output_folder: Path
+) -> list:
+    """
+    Extract every selected subtitle track in a single pass.
+
+    Parameters:
+        input_file (Path): The input file.
+        selected_subs (list): The selected subtitle tracks, see `select_restyle_tracks`.
+        output_folder (Path): The folder to extract the tracks to.
+
+    Returns:
+        list: The paths of the extracted subtitle files.
+    """
+
+    ass_track_paths = [
+        Path(os.path.join(output_folder, selected_sub["save_file"]))
+        for selected_sub in selected_subs
+    ]
 
     mkvextract_subtitles_command = [
         "mkvextract",
         "tracks",
-        input_file_string,
-        f'{selected_subs["index"]}:{ass_track_path}',
+        str(input_file),
+    ] + [
+        f'{selected_sub["index"]}:{ass_track_path}'
+        for selected_sub, ass_track_path in zip(selected_subs, ass_track_paths)
     ]
 
     process = ProcessCommand(logger)
     process.run("MKVextract subtitle", mkvextract_subtitles_command)
 
-    font_finder = FontFinder()
+    return ass_track_paths
+
+
+def extract_subtitles_and_fonts(
+    input_file,
+    attachments_folder,
+    stream_select: str | int | None = None,
+    font_finder: FontFinder | None = None,
+    stream_policy: StreamPolicy | None = None,
+    probe_cache: ProbeCache | None = None,
+):
+    """
+    Extracts subtitles and fonts from the input file.
+
+    Parameters:
+        input_file (Path): The input file from which to extract subtitles and fonts.
+        attachments_folder (Path): The folder where the attachments are stored.
+        stream_select (str | int | None, optional): Optional parameter to select specific streams for subtitles, see
+        `select_subtitle_tracks`. The default is None.
+        font_finder (FontFinder | None, optional): The font finder to share between files. The default is None, which
+        creates a new one.
+        stream_policy (StreamPolicy | None, optional): The stream selection policy. The default is None.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+
+    Returns:
+        tuple: A list containing per selected track the extracted subtitle file name, the path to the extracted
+        subtitle file and the available fonts, and a list of the extracted fonts. Both are empty if no track was
+        selected.
+    """
+
+    input_file_string = str(input_file)
+
+    # Select the tracks before extracting anything
+    selected_subs, attachments = select_restyle_tracks(
+        input_file, stream_select, stream_policy, probe_cache
+    )
+    if not selected_subs:
+        return [], []
+
+    ass_track_paths = extract_subtitle_tracks(
+        input_file, selected_subs, attachments_folder.parent
+    )
+
+    if font_finder is None:
+        font_finder = FontFinder()
     available_fonts = font_finder.fonts
 
+    subtitles = [
+        [selected_sub["save_file"], ass_track_path, available_fonts]
+        for selected_sub, ass_track_path in zip(selected_subs, ass_track_paths)
+    ]
+
     if attachments:
         font_files, font_files_extract = export_fonts_list(
             attachments, attachments_folder
         )
 
+        # Attachments of a previous file may be hardlinks into the font store, which must not be overwritten in place
+        for font_file in font_files:
+            Path(font_file).unlink(missing_ok=True)
+
         mkvextract_attachments_cmd = [
             "mkvextract",
             "attachments",
@@ -233,20 +440,150 @@ def extract_subtitles_and_fonts(
         process.run("MKVextract attachments", mkvextract_attachments_cmd)
 
         # Get current fonts
-        font_info = [
-            {**{"file_path": Path(element)}, **font_finder.font_info_by_file(element)}
-            for element in font_files
-        ]
+        with span("font info"):
+            font_info = [
+                {
+                    **{"file_path": Path(element)},
+                    **font_finder.font_info_by_file(element),
+                }
+                for element in font_files
+            ]
+
+        return subtitles, font_info
+
+    return subtitles, []
+
+
+def select_subtitle_tracks(
+    subtitle: list,
+    stream_select: str | int | None,
+    stream_policy: StreamPolicy | None = None,
+    input_file: str = "",
+) -> list:
+    """
+    Select the subtitle tracks to restyle.
+
+    Parameters:
+        subtitle (list): The subtitle tracks of the input file.
+        stream_select (str | int | None): The stream ID, ISO 639-3 language code, a comma-separated list of those or
+        `all` for every ASS track. If None, the stream policy selects the track.
+        stream_policy (StreamPolicy | None, optional): The stream selection policy. The default is None, which asks
+        the user to select a stream if there are multiple and the input is interactive, or selects the first stream.
+        input_file (str, optional): The input file, used for messages. The default is an empty string.
+
+    Returns:
+        list: The selected subtitle tracks; empty if the file should be skipped.
+
+    Raises:
+        SubtitleStreamNotFoundError: If no track matches and the file can not be skipped.
+    """
+
+    # No user input provided, so identify streams and ask for input when interactive
+    if stream_select is None:
+        if stream_policy is None and len(subtitle) > 1 and sys.stdin.isatty():
+            logger.info("Multiple `subtitle` streams detected")
+
+            table_print_stream_options(subtitle)
+            allowed = [str(sub["index"]) for sub in subtitle]
+
+            # Request user input
+            selected_index = IntPrompt.ask(
+                "# Please specify the subtitle index to use: ",
+                choices=allowed,
+                default=subtitle[0]["index"],
+                show_choices=True,
+                show_default=True,
+            )
+            logger.info(f"Selected subtitle stream index: {selected_index}")
+
+            return [sub for sub in subtitle if int(sub["index"]) == int(selected_index)]
 
-        return (
-            [selected_subs["save_file"], ass_track_path, available_fonts],
-            font_info,
+        if stream_policy is None:
+            stream_policy = StreamPolicy()
+
+        selected_sub = stream_policy.select(subtitle)
+        if selected_sub is None:
+            selected_sub = fallback_subtitle_track(
+                subtitle, "stream policy", stream_policy, input_file
+            )
+
+        return [selected_sub] if selected_sub is not None else []
+
+    if isinstance(stream_select, int):
+        stream_select = str(stream_select)
+
+    if stream_select.lower() == STREAM_SELECT_ALL:
+        return [sub for sub in subtitle if sub["codec"] in ASS_CODEC_IDS]
+
+    selected_subs: list = []
+    for current_select in [
+        current_select.strip() for current_select in stream_select.split(",")
+    ]:
+        if current_select.isnumeric():
+            selected_sub = next(
+                (sub for sub in subtitle if int(sub["index"]) == int(current_select)),
+                None,
+            )
+        else:
+            selected_sub = next(
+                (sub for sub in subtitle if sub["language"] == current_select), None
+            )
+
+        if selected_sub is None:
+            selected_sub = fallback_subtitle_track(
+                subtitle, current_select, stream_policy, input_file
+            )
+
+        if selected_sub is not None and selected_sub not in selected_subs:
+            selected_subs.append(selected_sub)
+
+    return selected_subs
+
+
+def fallback_subtitle_track(
+    subtitle: list,
+    stream_select: str,
+    stream_policy: StreamPolicy | None,
+    input_file: str,
+) -> dict | None:
+    """
+    Get the subtitle track to use if no track matches the stream selection, according to the policy fallback action.
+
+    Parameters:
+        subtitle (list): The subtitle tracks of the input file.
+        stream_select (str): The stream selection which did not match.
+        stream_policy (StreamPolicy | None): The stream selection policy.
+        input_file (str): The input file, used for messages.
+
+    Returns:
+        dict | None: The fallback track, or None if the selection should be skipped.
+
+    Raises:
+        SubtitleStreamNotFoundError: If there is no policy or the policy fallback action is `error`.
+    """
+
+    if stream_policy is None or stream_policy.fallback == FALLBACK_ERROR:
+        raise SubtitleStreamNotFoundError(stream_select, input_file)
+
+    fallback_sub = stream_policy.fallback_track(subtitle)
+    if fallback_sub is None:
+        logger.warning(
+            f"No subtitle stream matching `{stream_select}` was found for input file `{input_file}`; skipping."
         )
+        return None
 
-    return [selected_subs["save_file"], ass_track_path, available_fonts], []
+    logger.info(
+        f"No subtitle stream matching `{stream_select}` was found for input file `{input_file}`; falling back to "
+        f"stream index {fallback_sub['index']}."
+    )
+
+    return fallback_sub
 
 
-def find_available_fonts(fonts_list: dict, font_names_list: list) -> dict:
+def find_available_fonts(fonts_list: list | FontIndex, font_names_list: list) -> dict:
+    if isinstance(fonts_list, FontIndex):
+        return {font: fonts_list.find(font) or False for font in font_names_list}
+
     fonts_available = {}
     for font in font_names_list:
         fonts_available[font] = next(
@@ -257,8 +594,14 @@ def find_available_fonts(fonts_list: dict, font_names_list: list) -> dict:
     return fonts_available
 
 
-def get_fonts(ass, font_names_kept, fonts) -> list:
-    fonts_filesystem = find_available_fonts(ass[2], font_names_kept)
+def get_fonts(
+    ass, font_names_kept, fonts, style_cache: StyleCache | None = None
+) -> list:
+    fonts_filesystem = (
+        find_available_fonts(ass[2], font_names_kept)
+        if style_cache is None
+        else style_cache.find_fonts(ass[2], font_names_kept)
+    )
     fonts_embed = find_available_fonts(fonts, font_names_kept)
     main_fonts_ass = []
     for (font_name, filesystem_font), (_, embed_font) in zip(
@@ -272,6 +615,49 @@ def get_fonts(ass, font_names_kept, fonts) -> list:
     return main_fonts_ass
 
 
+def get_inline_fonts(
+    ass, inline_fonts: dict, fonts, style_cache: StyleCache | None = None
+) -> list:
+    """
+    Resolve the fonts of the `\\fn` override tags, preferring the embedded fonts like the style fonts.
+
+    A font which is not available is reported instead of raised, as renderers fall back to another font for it.
+
+    Parameters:
+        ass (list): The extracted subtitle info and available fonts, see `extract_subtitles_and_fonts`.
+        inline_fonts (dict): The names of the styles using the font per font name, see `inline_font_references`.
+        fonts (list): The fonts in the attachments folder.
+        style_cache (StyleCache | None, optional): The font lookups of previous subtitles. The default is None.
+
+    Returns:
+        list: The available fonts.
+    """
+
+    font_names = list(inline_fonts)
+    fonts_filesystem = (
+        find_available_fonts(ass[2], font_names)
+        if style_cache is None
+        else style_cache.find_fonts(ass[2], font_names)
+    )
+    fonts_embed = find_available_fonts(fonts, font_names)
+
+    inline_fonts_ass = []
+    for font_name in font_names:
+        if fonts_filesystem[font_name] is False and fonts_embed[font_name] is False:
+            logger.warning(
+                f"The font `{font_name}` of the `\\fn` override tags in style(s) "
+                f"{', '.join(f'`{style_name}`' for style_name in sorted(inline_fonts[font_name]))} was not found on "
+                f"the filesystem or in the attachments."
+            )
+            continue
+
+        inline_fonts_ass.append(
+            check_available_fonts(fonts_filesystem, fonts_embed, font_name)
+        )
+
+    return inline_fonts_ass
+
+
 def check_available_fonts(filesystem_fonts: dict, embedded_fonts: dict, key: str):
     if (filesystem_fonts[key] is False) & (embedded_fonts[key] is False):
         raise FontNotFoundError(key)
@@ -296,398 +682,1916 @@ def export_fonts_list(attachments, save_loc):
     return font_files, font_files_extract
 
 
-def resample_mean(dimensions_list_one, dimensions_list_two):
-    mean_factor = (
-        (int(dimensions_list_one[0]) / int(dimensions_list_two[0]))
-        + (int(dimensions_list_one[1]) / int(dimensions_list_two[1]))
-    ) / 2
-
-    return mean_factor
-
-
-@logger.catch
-@click.command(
-    context_settings={"help_option_names": ["-h", "--help"]},
-    epilog="Repository: https://github.com/ToshY/mkvrestyle",
-)
-@click.option(
-    "--input-path",
-    "-i",
-    type=click.Path(exists=True, dir_okay=True, file_okay=True, resolve_path=True),
-    required=False,
-    multiple=True,
-    callback=InputPathChecker(),
-    show_default=True,
-    default=["./input"],
-    help="Path to input file or directory",
-)
-@click.option(
-    "--output-path",
-    "-o",
-    type=click.Path(dir_okay=True, file_okay=True, resolve_path=True),
-    required=False,
-    multiple=True,
-    callback=OutputPathChecker(),
-    show_default=True,
-    default=["./output"],
-    help="Path to output file or directory",
-)
-@click.option(
-    "--preset",
-    "-p",
-    type=click.Path(exists=True, dir_okay=False, file_okay=True, resolve_path=True),
-    required=False,
-    multiple=True,
-    callback=PresetPathChecker(),
-    show_default=True,
-    default=["./preset/default.json"],
-    help="Path to JSON file with ASS video preset options",
-)
-@click.option(
-    "--stream",
-    "-s",
-    type=ClickUnionType([click.INT, click.STRING]),
-    required=False,
-    multiple=True,
-    callback=OptionalValueChecker(),
-    show_default=True,
-    default=[None],
-    help="Stream ID or ISO 639-3 language code of the subtitle track",
-)
-def cli(input_path, output_path, preset, stream):
-    combined_result = combine_arguments_by_batch(
-        input_path, output_path, preset, stream
-    )
-
-    for item in combined_result:
-        current_stream = item.get("stream")
-        current_preset = item.get("preset")
-        current_output = item.get("output").get("resolved")
-        current_input_files = item.get("input").get("resolved")
+def resample_values(values: dict, columns, ass_resample_mean) -> dict | None:
+    """
+    Apply compiled preset column rules to the values of a parsed style or dialogue line.
 
-        for current_file_path_index, current_file_path in enumerate(
-            current_input_files
-        ):
-            file_attachments_output_folder_for_current_file_path = (
-                current_output.with_suffix("").joinpath("attachments")
-            )
-            file_attachments_output_folder_for_current_file_path.mkdir(
-                parents=True, exist_ok=True
-            )
+    The parsed values are left untouched (copy-on-write), so they can be shared between presets.
 
-            # Extract subtitles and fonts
-            ass, fonts = extract_subtitles_and_fonts(
-                current_file_path,
-                file_attachments_output_folder_for_current_file_path,
-                current_stream,
-            )
+    Parameters:
+        values (dict): The parsed line values.
+        columns (tuple[ColumnRule, ...]): The compiled column rules of the preset.
+        ass_resample_mean (float): The resample factor between the video and subtitle dimensions.
 
-            # Read subtitle file contents
-            read_file_content = read_file(ass[1], True)
-            lines = read_file_content["content"]
+    Returns:
+        dict | None: A copy of the values with the resampled columns, or None if no value changed.
+    """
 
-            # Get Resolution/Format/Styles/Dialogues indices
-            ass_resolution = {
-                "PlayResX": get_lines_per_type(lines, ["PlayResX: "])[0],
-                "PlayResY": get_lines_per_type(lines, ["PlayResY: "])[0],
-            }
-            format_lines = get_format_lines(lines)
-            style_lines = get_style_lines(lines, format_lines["style"][1])
-            dialogue_lines = get_dialogue_lines(lines, format_lines["dialogue"][1])
+    resampled_values = None
+    for column in columns:
+        value = values[column.key]
+        resampled_value = column.apply(value, ass_resample_mean)
+        if resampled_value is value:
+            continue
 
-            # Style names from dialogue
-            style_names_dialogue_all = [el[-1]["Style"] for el in dialogue_lines]
-            style_names_dialogue = list(set(style_names_dialogue_all))
+        if resampled_values is None:
+            resampled_values = dict(values)
+        resampled_values[column.key] = resampled_value
 
-            # Find the dialogue styles which exist and which are not in Styles
-            style_lines_kept = [
-                el for el in style_lines if el[-1]["Name"] in style_names_dialogue
-            ]
-            style_lines_remove = [
-                el for el in style_lines if el[-1]["Name"] not in style_names_dialogue
-            ]
+    return resampled_values
 
-            ffprobe_select_streams_command = [
-                "ffprobe",
-                "-v",
-                "error",
-                "-select_streams",
-                "v",
-                "-show_entries",
-                "stream={}".format(",".join(["width", "height"])),
-                "-of",
-                "json",
-                str(current_file_path),
-            ]
 
-            process = ProcessCommand(logger)
-            ffprobe_select_streams_output = process.run(
-                "FFprobe", ffprobe_select_streams_command
-            )
+def restyle_style_line(
+    style: dict,
+    columns,
+    ass_resample_mean: float,
+    font_name: str | None,
+    encoding: str,
+) -> bytes | None:
+    """
+    Resample a style line and substitute its font.
 
-            ffprobe_stream_output = json.loads(ffprobe_select_streams_output.stdout)[
-                "streams"
-            ][0]
-            ffprobe_stream_output["PlayResX"] = ffprobe_stream_output.pop("width")
-            ffprobe_stream_output["PlayResY"] = ffprobe_stream_output.pop("height")
+    Parameters:
+        style (dict): The parsed style values.
+        columns (tuple[ColumnRule, ...]): The compiled column rules of the preset for the style.
+        ass_resample_mean (float): The resample factor between the video and subtitle dimensions.
+        font_name (str | None): The substitute font, if any.
+        encoding (str): The encoding of the subtitle lines.
 
-            # Calculate resample mean between video dimensions and preset
-            ass_resample_mean = resample_mean(
-                [ffprobe_stream_output["PlayResX"], ffprobe_stream_output["PlayResY"]],
-                [ass_resolution["PlayResX"][-1][0], ass_resolution["PlayResY"][-1][0]],
-            )
+    Returns:
+        bytes | None: The restyled style line, or None if no value changed.
+    """
 
-            # Resample ASS to video dimensions and user preset
-            for ids, (line, style) in enumerate(style_lines_kept):
-                for key in style:
-                    if key in [
-                        "Fontsize",
-                        "ScaleX",
-                        "ScaleY",
-                        "Spacing",
-                        "Outline",
-                        "Shadow",
-                        "MarginL",
-                        "MarginR",
-                        "MarginV",
-                    ]:
-                        if int(style[key]) != 0:
-                            if key not in ["ScaleX", "ScaleY"]:
-                                style[key] = round(
-                                    float(style[key]) * ass_resample_mean, 2
-                                )
-                            preset_key_dict = current_preset[key]
-                            if preset_key_dict:
-                                resampled_value = round(
-                                    float(style[key])
-                                    * float(preset_key_dict["factor"]),
-                                    preset_key_dict["round"],
-                                )
-                                if preset_key_dict["round"] == 0:
-                                    resampled_value = int(resampled_value)
-                                style[key] = str(resampled_value)
-
-                # Change original line to resampled line
-                format_type = dict(itertools.islice(style.items(), 1))["Format"]
-                format_values = list(
-                    dict(itertools.islice(style.items(), 1, None)).values()
-                )
-                lines[line] = "{}: {}".format(format_type, ",".join(format_values))
-
-            # Resample dialogue margins
-            for idd, (line, dialogue) in enumerate(dialogue_lines):
-                for key in dialogue:
-                    if key in ["MarginL", "MarginR", "MarginV"]:
-                        if int(dialogue[key]) != 0:
-                            dialogue[key] = round(
-                                float(dialogue[key]) * ass_resample_mean, 2
-                            )
-                            preset_key_dict = current_preset[key]
-                            if preset_key_dict:
-                                resampled_value = round(
-                                    float(dialogue[key])
-                                    * float(preset_key_dict["factor"]),
-                                    preset_key_dict["round"],
-                                )
-                                if preset_key_dict["round"] == 0:
-                                    resampled_value = int(resampled_value)
-                                dialogue[key] = str(resampled_value)
-
-                # Change original line to resampled line
-                format_type = dict(itertools.islice(dialogue.items(), 1))["Format"]
-                format_values = list(
-                    dict(itertools.islice(dialogue.items(), 1, None)).values()
-                )
-                lines[line] = "{}: {}".format(format_type, ",".join(format_values))
+    restyled = resample_values(style, columns, ass_resample_mean)
+    if font_name is not None:
+        restyled = {**(restyled or style), "Fontname": font_name}
 
-            # Style font replacement (from ASS styles)
-            font_names_kept = [*{*[el[-1]["Fontname"] for el in style_lines_kept]}]
+    if restyled is None:
+        return None
 
-            # Check font preset options
-            font_settings = current_preset.get("FontName", None)
-            font_option = font_settings
-            if font_option is not None:
-                font_option = font_settings.get("substitute", None)
+    return join_line_values(restyled, encoding)
 
-                if font_option is None or font_option not in ["all", "custom"]:
-                    raise InvalidFontSubstituteOptionError(font_option)
 
-                font_name = font_settings.get("name", None)
-                if not isinstance(font_name, str) or (
-                    not (font_name and font_name.strip())
-                ):
-                    raise InvalidFontNameError(font_name)
+def resample_mean(dimensions_list_one, dimensions_list_two):
+    mean_factor = (
+        (int(dimensions_list_one[0]) / int(dimensions_list_two[0]))
+        + (int(dimensions_list_one[1]) / int(dimensions_list_two[1]))
+    ) / 2
 
-            main_fonts_ass = []
-            main_font_preset = None
-            if font_option == "all":
-                # Preset font availability
-                fonts_filesystem = find_available_fonts(ass[2], [font_name])
-                fonts_embed = find_available_fonts(fonts, [font_name])
+    return mean_factor
 
-                main_font_preset = check_available_fonts(
-                    fonts_filesystem, fonts_embed, font_name
-                )
 
-                # Replacement of every existing style
-                style_lines = get_style_lines(lines, format_lines["style"][1])
-                for line, style in style_lines:
-                    for key in style:
-                        if key == "Fontname":
-                            style[key] = main_font_preset["font_name"]
-
-                    # Change original line to resampled line
-                    format_type = dict(itertools.islice(style.items(), 1))["Format"]
-                    format_values = list(
-                        dict(itertools.islice(style.items(), 1, None)).values()
-                    )
-                    lines[line] = "{}: {}".format(format_type, ",".join(format_values))
-            elif font_option == "custom":
-                # Preset font availability
-                fonts_filesystem = find_available_fonts(ass[2], [font_name])
-                fonts_embed = find_available_fonts(fonts, [font_name])
-
-                main_font_preset = check_available_fonts(
-                    fonts_filesystem, fonts_embed, font_name
-                )
+def inline_font_names(text: bytes) -> list:
+    """
+    Find the font names of the `\\fn` override tags in a dialogue text, with a fixed-string search.
 
-                main_fonts_ass = get_fonts(ass, font_names_kept, fonts)
-
-                max_occurring_font_collection = {}
-                max_occurring_style_collection = font_settings.get("style", [])
-                print(style_lines_kept)
-                if max_occurring_style_collection:
-                    for user_style in max_occurring_style_collection:
-                        found_style = next(
-                            (
-                                item
-                                for item in style_lines_kept
-                                if item[1]["Name"] == user_style
-                            ),
-                            False,
-                        )
-                        max_occurring_font_collection[user_style] = found_style[1][
-                            "Fontname"
-                        ]
-                else:
-                    # Get most occurring style name
-                    style_occurrence = Counter(style_names_dialogue_all)
-                    max_occurring_style_name = max(
-                        style_occurrence, key=style_occurrence.get
-                    )
+    Parameters:
+        text (bytes): The dialogue text.
 
-                    # Get corresponding font for style to replace
-                    max_occurring_style_collection = next(
-                        (
-                            item
-                            for item in style_lines_kept
-                            if item[1]["Name"] == max_occurring_style_name
-                        ),
-                        False,
-                    )
-                    max_occurring_font_collection[max_occurring_style_name] = (
-                        max_occurring_style_collection[1]["Fontname"]
-                    )
+    Returns:
+        list: The font names, without the empty names which reset the font to the style font.
+    """
 
-                # Replacement of most occurring font (e.g. in main/top/italic) by preset font
-                style_lines = get_style_lines(lines, format_lines["style"][1])
-                for line, style in style_lines:
-                    for key in style:
-                        if key != "Name":
-                            continue
+    font_names = []
+    start = text.find(ASS_FONT_OVERRIDE_TAG)
+    while start != -1:
+        start += len(ASS_FONT_OVERRIDE_TAG)
 
-                        if style[key] not in max_occurring_font_collection:
-                            continue
+        # The font name ends at the next tag or the end of the override block
+        end = len(text)
+        for terminator in ASS_FONT_OVERRIDE_TERMINATORS:
+            terminator_index = text.find(terminator, start, end)
+            if terminator_index != -1:
+                end = terminator_index
 
-                        style["Fontname"] = main_font_preset["font_name"]
+        font_name = text[start:end].strip()
+        if font_name:
+            font_names.append(font_name)
+        start = text.find(ASS_FONT_OVERRIDE_TAG, end)
 
-                    # Change original line to resampled line
-                    format_type = dict(itertools.islice(style.items(), 1))["Format"]
-                    format_values = list(
-                        dict(itertools.islice(style.items(), 1, None)).values()
-                    )
-                    lines[line] = "{}: {}".format(format_type, ",".join(format_values))
-            else:
-                main_fonts_ass = get_fonts(ass, font_names_kept, fonts)
-
-            # Replace PlayRes by video dimension
-            for direction, (line, _) in ass_resolution.items():
-                lines[line] = f"{direction}: {ffprobe_stream_output[direction]}"
-
-            # Remove unnecessary styles
-            lines = [
-                el
-                for idx, el in enumerate(lines)
-                if idx not in [idy for idy, style in style_lines_remove]
-            ]
+    return font_names
 
-            # Overwrite ASS
-            with open(ass[1], "w", encoding=read_file_content["encoding"]) as f:
-                f.write("\n".join(item for item in lines))
-
-            logger.info(f"Subtitles written to `{ass[1]}`.")
-
-            # For replacement of all styles with single font, clean-up the attachments directory prior to copying
-            if font_option == "all":
-                for path in Path(
-                    file_attachments_output_folder_for_current_file_path
-                ).glob("**/*"):
-                    if not path.is_file():
-                        continue
-                    path.unlink()
-            elif font_option == "custom":
-                # The font that was originally used and extracted from the input file can be removed from attachments
-                font_files_to_be_deleted = [
-                    font
-                    for font in fonts
-                    if font["font_family"] in max_occurring_font_collection
-                ]
-                for font_entry_to_be_deleted in font_files_to_be_deleted:
-                    font_filepath_to_be_deleted = font_entry_to_be_deleted.get(
-                        "file_path"
-                    )
-                    if not font_filepath_to_be_deleted.exists():
-                        continue
-                    font_filepath_to_be_deleted.unlink()
 
-            # If preset font was used, copy it
-            if main_font_preset is not None:
+def inline_font_references(document: SubtitleDocument, dialogue_lines: list) -> dict:
+    """
+    Collect the fonts of the `\\fn` override tags in the dialogue, in a single pass over the dialogue texts.
+
+    Parameters:
+        document (SubtitleDocument): The subtitle document.
+        dialogue_lines (list): The parsed dialogue lines, see `get_dialogue_lines`.
+
+    Returns:
+        dict: The names of the styles using the font per font name, in order of first use.
+    """
+
+    references: dict = {}
+    for _, dialogue in dialogue_lines:
+        text = dialogue["Text"]
+        if dialogue["Format"] == b"Comment" or ASS_FONT_OVERRIDE_TAG not in text:
+            continue
+
+        for font_name in inline_font_names(text):
+            references.setdefault(font_name, set()).add(dialogue["Style"].lstrip(b"*"))
+
+    # Only the distinct names are decoded
+    return {
+        document.decode(font_name): {
+            document.decode(style_name) for style_name in style_names
+        }
+        for font_name, style_names in references.items()
+    }
+
+
+def parse_subtitle(ass_track_path: Path) -> dict:
+    """
+    Read and parse the extracted subtitle file.
+
+    Parameters:
+        ass_track_path (Path): The path to the extracted subtitle file.
+
+    Returns:
+        dict: The subtitle document, resolution lines, format lines, (kept/removed) style lines, the hash of the
+        Styles section, dialogue lines, dialogue style name occurrences and the fonts of the `\\fn` override tags.
+    """
+
+    # Read subtitle file contents
+    with span("read"):
+        document = SubtitleDocument.from_file(ass_track_path)
+    lines = document.lines
+
+    # Get Resolution/Format/Styles/Dialogues indices
+    ass_resolution = {
+        "PlayResX": get_lines_per_type(lines, [b"PlayResX: "])[0],
+        "PlayResY": get_lines_per_type(lines, [b"PlayResY: "])[0],
+    }
+    format_lines = get_format_lines(lines)
+    with span("style lines"):
+        style_lines = get_style_lines(
+            lines, format_lines["style"][1], document.line_encoding
+        )
+    with span("dialogue lines"):
+        dialogue_lines = get_dialogue_lines(lines, format_lines["dialogue"][1])
+    with span("inline fonts"):
+        inline_fonts = inline_font_references(document, dialogue_lines)
+
+    # Style names from dialogue; only the distinct names are decoded
+    style_names_dialogue_all = Counter(el[-1]["Style"] for el in dialogue_lines)
+    style_names_dialogue = {
+        document.decode(style_name) for style_name in style_names_dialogue_all
+    }
+
+    # Find the dialogue styles which exist and which are not in Styles
+    style_lines_kept = [
+        el for el in style_lines if el[-1]["Name"] in style_names_dialogue
+    ]
+    style_lines_remove = [
+        el for el in style_lines if el[-1]["Name"] not in style_names_dialogue
+    ]
+
+    return {
+        "document": document,
+        "resolution": ass_resolution,
+        "format_lines": format_lines,
+        "style_lines_kept": style_lines_kept,
+        "style_lines_remove": style_lines_remove,
+        "style_digest": style_section_digest(
+            lines, [format_lines["style"][0], *[line for line, _ in style_lines]]
+        ),
+        "dialogue_lines": dialogue_lines,
+        "style_names_dialogue_all": style_names_dialogue_all,
+        "inline_fonts": inline_fonts,
+    }
+
+
+def codepoints_by_font(subtitle: dict) -> dict:
+    """
+    Collect the code points of the dialogue text per font, from the style fonts and `\\fn` overrides.
+
+    Override blocks are not part of the text; a line with `\\fn` overrides counts for its style font and every
+    override font.
+
+    Parameters:
+        subtitle (dict): The parsed subtitle, see `parse_subtitle`.
+
+    Returns:
+        dict: The set of code points per (lowercase) font name.
+    """
+
+    document = subtitle["document"]
+    font_by_style = {
+        document.encode(style["Name"]): style["Fontname"].lower()
+        for _, style in subtitle["style_lines_kept"]
+    }
+
+    codepoints: dict = {}
+    for _, dialogue in subtitle["dialogue_lines"]:
+        if dialogue["Format"] == b"Comment":
+            continue
+
+        text = document.decode(dialogue["Text"])
+        line_codepoints = {
+            ord(char)
+            for char in ASS_TEXT_ESCAPE_REGEX.sub(
+                " ", ASS_OVERRIDE_BLOCK_REGEX.sub("", text)
+            )
+        }
+
+        font_names = {
+            document.decode(font_name).lower()
+            for font_name in inline_font_names(dialogue["Text"])
+        }
+        style_font = font_by_style.get(dialogue["Style"].lstrip(b"*"))
+        if style_font is not None:
+            font_names.add(style_font)
+
+        for font_name in font_names:
+            codepoints.setdefault(font_name, set()).update(line_codepoints)
+
+    return codepoints
+
+
+def codepoints_by_style(subtitle: dict, style_names: list) -> set:
+    """
+    Collect the code points of the dialogue text of the given styles, which is rendered in the style font.
+
+    Text after a `\\fn` override is rendered in another font, so it is not included.
+
+    Parameters:
+        subtitle (dict): The parsed subtitle, see `parse_subtitle`.
+        style_names (list): The style names.
+
+    Returns:
+        set: The code points, without control characters.
+    """
+
+    document = subtitle["document"]
+    encoded_style_names = {document.encode(style_name) for style_name in style_names}
+
+    codepoints: set = set()
+    for _, dialogue in subtitle["dialogue_lines"]:
+        if (
+            dialogue["Format"] == b"Comment"
+            or dialogue["Style"].lstrip(b"*") not in encoded_style_names
+        ):
+            continue
+
+        text = dialogue["Text"]
+        font_override_index = text.find(ASS_FONT_OVERRIDE_TAG)
+        if font_override_index != -1:
+            text = text[: max(0, text.rfind(b"{", 0, font_override_index))]
+
+        codepoints.update(
+            ord(char)
+            for char in ASS_TEXT_ESCAPE_REGEX.sub(
+                " ", ASS_OVERRIDE_BLOCK_REGEX.sub("", document.decode(text))
+            )
+        )
+
+    return {codepoint for codepoint in codepoints if codepoint >= 0x20}
+
+
+def substituted_style_names(subtitle: dict, font_rule: FontRule) -> list:
+    """
+    Get the names of the styles whose font is substituted by the preset font.
+
+    Parameters:
+        subtitle (dict): The parsed subtitle, see `parse_subtitle`.
+        font_rule (FontRule): The font substitution rule of the preset.
+
+    Returns:
+        list: The style names; for automatic detection, the most occurring style in the dialogue.
+    """
+
+    if font_rule.substitute == "all":
+        return [style["Name"] for _, style in subtitle["style_lines_kept"]]
+
+    if font_rule.styles.patterns:
+        # Styles matching the user-defined style patterns
+        return [
+            style["Name"]
+            for _, style in subtitle["style_lines_kept"]
+            if style["Name"] in font_rule.styles
+        ]
+
+    # Get most occurring style name
+    style_names_dialogue_all = subtitle["style_names_dialogue_all"]
+
+    return [
+        subtitle["document"].decode(
+            max(style_names_dialogue_all, key=style_names_dialogue_all.__getitem__)
+        )
+    ]
+
+
+def report_uncovered_characters(
+    subtitle: dict, font: dict, style_names: list, source: str
+) -> bool:
+    """
+    Report the characters of the dialogue of the given styles which have no glyph in the font, from the coverage in the
+    font index, or otherwise read from the font file.
+
+    Parameters:
+        subtitle (dict): The parsed subtitle, see `parse_subtitle`.
+        font (dict): The font, see `FontFinder.font_info_by_file`.
+        style_names (list): The names of the styles using the font.
+        source (str): The subtitle, used for messages.
+
+    Returns:
+        bool: Whether characters are not covered.
+    """
+
+    if not style_names:
+        return False
+
+    coverage = font_coverage(font)
+    if coverage is None:
+        return False
+
+    uncovered = sorted(
+        uncovered_codepoints(coverage, codepoints_by_style(subtitle, style_names))
+    )
+    if not uncovered:
+        return False
+
+    characters = ", ".join(
+        f"`{chr(codepoint)}` (U+{codepoint:04X})"
+        for codepoint in uncovered[:UNCOVERED_CHARACTERS_LIMIT]
+    )
+    if len(uncovered) > UNCOVERED_CHARACTERS_LIMIT:
+        characters += f" and {len(uncovered) - UNCOVERED_CHARACTERS_LIMIT} more"
+    logger.warning(
+        f"The font `{font['font_name']}` has no glyph for {len(uncovered)} character(s) of style(s) "
+        f"{', '.join(f'`{style_name}`' for style_name in style_names)} in `{source}`: {characters}."
+    )
+
+    return True
+
+
+def subset_output_attachments(outputs: list, font_subsetter: FontSubsetter) -> None:
+    """
+    Subset the attachments of the written subtitles to the code points they use.
+
+    Parameters:
+        outputs (list): The paths of the written subtitle files; the attachments are in the `attachments` folder next to
+        them.
+        font_subsetter (FontSubsetter): The font subsetter.
+
+    Returns:
+        None
+    """
+
+    codepoints_by_folder: dict = {}
+    for output in outputs:
+        folder_codepoints = codepoints_by_folder.setdefault(
+            Path(output).parent.joinpath("attachments"), {}
+        )
+        for font_name, codepoints in codepoints_by_font(parse_subtitle(output)).items():
+            folder_codepoints.setdefault(font_name, set()).update(codepoints)
+
+    for attachments_folder, codepoints in codepoints_by_folder.items():
+        if attachments_folder.is_dir():
+            font_subsetter.subset_attachments(attachments_folder, codepoints)
+
+
+def probe_video_dimensions(
+    input_file: Path, probe_cache: ProbeCache | None = None
+) -> dict:
+    """
+    Get the video dimensions of the input file as `PlayResX`/`PlayResY`.
+
+    Parameters:
+        input_file (Path): The input file.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+
+    Returns:
+        dict: The video dimensions.
+    """
+
+    if probe_cache is not None:
+        video_dimensions = probe_cache.get(input_file, PROBE_DIMENSIONS)
+        if video_dimensions is not None:
+            return video_dimensions
+
+    ffprobe_select_streams_command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v",
+        "-show_entries",
+        "stream={}".format(",".join(["width", "height"])),
+        "-of",
+        "json",
+        str(input_file),
+    ]
+
+    process = ProcessCommand(logger)
+    ffprobe_select_streams_output = process.run(
+        "FFprobe", ffprobe_select_streams_command
+    )
+
+    ffprobe_stream_output = json.loads(ffprobe_select_streams_output.stdout)["streams"][
+        0
+    ]
+    ffprobe_stream_output["PlayResX"] = ffprobe_stream_output.pop("width")
+    ffprobe_stream_output["PlayResY"] = ffprobe_stream_output.pop("height")
+    if probe_cache is not None:
+        probe_cache.put(input_file, PROBE_DIMENSIONS, ffprobe_stream_output)
+
+    return ffprobe_stream_output
+
+
+def materialize_attachments(
+    fonts: list, attachments_folder: Path, font_store: FontStore
+) -> list:
+    """
+    Materialize the extracted fonts into a separate attachments folder.
+
+    Parameters:
+        fonts (list): The extracted fonts.
+        attachments_folder (Path): The attachments folder to put the fonts in.
+        font_store (FontStore): The font store of the output directory.
+
+    Returns:
+        list: The fonts with their file path pointing to the materialized fonts.
+    """
+
+    attachments_folder.mkdir(parents=True, exist_ok=True)
+
+    materialized_fonts = []
+    for font in fonts:
+        font_file_path = attachments_folder.joinpath(font["file_path"].name)
+        font_store.materialize(font["file_path"], font_file_path)
+        materialized_fonts.append({**font, "file_path": font_file_path})
+
+    return materialized_fonts
+
+
+def restyle_subtitle(
+    subtitle: dict,
+    preset: PresetPlan,
+    video_dimensions: dict,
+    ass: list,
+    fonts: list,
+    ass_output_path: Path,
+    attachments_folder: Path,
+    font_store: FontStore,
+    style_cache: StyleCache | None = None,
+) -> None:
+    """
+    Restyle a parsed subtitle with a preset, and write the subtitle and its attachments.
+
+    The parsed subtitle is not modified, so it can be restyled with multiple presets.
+
+    Parameters:
+        subtitle (dict): The parsed subtitle, see `parse_subtitle`.
+        preset (PresetPlan): The compiled preset.
+        video_dimensions (dict): The video dimensions, see `probe_video_dimensions`.
+        ass (list): The extracted subtitle info and available fonts, see `extract_subtitles_and_fonts`.
+        fonts (list): The fonts in the attachments folder.
+        ass_output_path (Path): The path to write the restyled subtitle to.
+        attachments_folder (Path): The folder to write the attachments to.
+        font_store (FontStore): The font store from which the attachments are materialized.
+        style_cache (StyleCache | None, optional): The restyled style lines and font lookups of previous subtitles. The
+        default is None.
+
+    Returns:
+        None
+    """
+
+    document = subtitle["document"]
+    ass_resolution = subtitle["resolution"]
+    style_lines_kept = subtitle["style_lines_kept"]
+    style_names_dialogue_all = subtitle["style_names_dialogue_all"]
+
+    # Copy of the line references; changed lines are replaced, the shared lines are never modified
+    lines = list(document.lines)
+
+    # Calculate resample mean between video dimensions and preset
+    ass_resample_mean = resample_mean(
+        [video_dimensions["PlayResX"], video_dimensions["PlayResY"]],
+        [ass_resolution["PlayResX"][-1][0], ass_resolution["PlayResY"][-1][0]],
+    )
+
+    with span("font resolution"):
+        # Style font replacement (from ASS styles)
+        font_names_kept = [*{*[el[-1]["Fontname"] for el in style_lines_kept]}]
+
+        # Font preset options (validated when the preset was loaded)
+        font_rule = preset.font
+        font_option = None
+        if font_rule is not None:
+            font_option = font_rule.substitute
+            font_name = font_rule.name
+
+        main_fonts_ass = []
+        main_font_preset = None
+        max_occurring_font_collection = {}
+        if font_option is not None:
+            # Preset font availability
+            fonts_filesystem = (
+                find_available_fonts(ass[2], [font_name])
+                if style_cache is None
+                else style_cache.find_fonts(ass[2], [font_name])
+            )
+            fonts_embed = find_available_fonts(fonts, [font_name])
+
+            main_font_preset = check_available_fonts(
+                fonts_filesystem, fonts_embed, font_name
+            )
+
+        if font_option == "all":
+            # Replacement of every existing style
+            max_occurring_font_collection = {
+                style["Name"]: style["Fontname"] for _, style in style_lines_kept
+            }
+        elif font_rule is not None and font_option == "custom":
+            main_fonts_ass = get_fonts(ass, font_names_kept, fonts, style_cache)
+            max_occurring_style_names = substituted_style_names(subtitle, font_rule)
+
+            # Get corresponding font for styles to replace
+            max_occurring_font_collection = {
+                style["Name"]: style["Fontname"]
+                for _, style in style_lines_kept
+                if style["Name"] in max_occurring_style_names
+            }
+        else:
+            main_fonts_ass = get_fonts(ass, font_names_kept, fonts, style_cache)
+
+        # Missing glyphs of the substituted styles
+        if main_font_preset is not None:
+            report_uncovered_characters(
+                subtitle,
+                main_font_preset,
+                list(max_occurring_font_collection),
+                str(ass[0]),
+            )
+
+        # Fonts of the override tags in the dialogue are attached as well, whatever the preset substitutes
+        inline_fonts_ass = get_inline_fonts(
+            ass, subtitle["inline_fonts"], fonts, style_cache
+        )
+        inline_font_paths = {font["file_path"] for font in inline_fonts_ass}
+
+    with span("resample"):
+        # Resample ASS to video dimensions and user preset, and replace the font (e.g. in main/top/italic) by the
+        # preset font, in a single pass over the styles; episodes sharing the Styles section share the results
+        style_key = StyleCache.key(
+            subtitle["style_digest"],
+            (ass_resolution["PlayResX"][-1][0], ass_resolution["PlayResY"][-1][0]),
+            (video_dimensions["PlayResX"], video_dimensions["PlayResY"]),
+            preset.digest,
+        )
+        for line, style in style_lines_kept:
+            substitute_font_name = (
+                main_font_preset["font_name"]
+                if main_font_preset is not None
+                and style["Name"] in max_occurring_font_collection
+                else None
+            )
+            restyle = functools.partial(
+                restyle_style_line,
+                style,
+                preset.style_columns_for(style["Name"]),
+                ass_resample_mean,
+                substitute_font_name,
+                document.line_encoding,
+            )
+            restyled_line = (
+                restyle()
+                if style_cache is None
+                else style_cache.style_line(
+                    style_key, document.lines[line], substitute_font_name, restyle
+                )
+            )
+
+            # Change original line to resampled line
+            if restyled_line is not None:
+                lines[line] = restyled_line
+
+        # Resample dialogue margins; untouched lines are kept as-is
+        dialogue_columns_by_style = {
+            style_name: preset.dialogue_columns_for(document.decode(style_name))
+            for style_name in style_names_dialogue_all
+        }
+        for line, dialogue in subtitle["dialogue_lines"]:
+            resampled = resample_values(
+                dialogue,
+                dialogue_columns_by_style[dialogue["Style"]],
+                ass_resample_mean,
+            )
+            if resampled is not None:
+                lines[line] = join_line_values(resampled, document.line_encoding)
+
+        # Replace PlayRes by video dimension
+        for direction, (line, _) in ass_resolution.items():
+            lines[line] = f"{direction}: {video_dimensions[direction]}".encode("ascii")
+
+    # Remove unnecessary styles
+    style_line_indices_remove = {idy for idy, style in subtitle["style_lines_remove"]}
+    lines = [el for idx, el in enumerate(lines) if idx not in style_line_indices_remove]
+
+    with span("write"):
+        # Write ASS
+        document.write(ass_output_path, lines)
+
+    logger.info(f"Subtitles written to `{ass_output_path}`.")
+
+    with span("copy fonts"):
+        # For replacement of all styles with single font, clean-up the attachments directory prior to copying
+        if font_option == "all":
+            for path in Path(attachments_folder).glob("**/*"):
+                if not path.is_file() or path in inline_font_paths:
+                    continue
+                path.unlink()
+        elif font_option == "custom":
+            # The font that was originally used and extracted from the input file can be removed from attachments
+            font_files_to_be_deleted = [
+                font
+                for font in fonts
+                if font["font_family"] in max_occurring_font_collection
+            ]
+            for font_entry_to_be_deleted in font_files_to_be_deleted:
+                font_filepath_to_be_deleted = font_entry_to_be_deleted.get("file_path")
                 if (
-                    main_font_preset["file_path"].parent
-                    == file_attachments_output_folder_for_current_file_path
+                    not font_filepath_to_be_deleted.exists()
+                    or font_filepath_to_be_deleted in inline_font_paths
                 ):
                     continue
+                font_filepath_to_be_deleted.unlink()
 
-                shutil.copy(
-                    main_font_preset["file_path"],
-                    file_attachments_output_folder_for_current_file_path.joinpath(
-                        main_font_preset["file_name"]
-                    ),
-                )
+        # If preset font was used, copy it (unless it is already an attachment)
+        if (
+            main_font_preset is not None
+            and main_font_preset["file_path"].parent != attachments_folder
+        ):
+            font_store.materialize(
+                main_font_preset["file_path"],
+                attachments_folder.joinpath(main_font_preset["file_name"]),
+            )
 
-            # Get entire family for replacement font making sure it has other variants (e.g. bold/italics/etc)
-            if font_option == "all" or font_option == "custom":
-                main_fonts_ass = [
+        # Get entire family for replacement font making sure it has other variants (e.g. bold/italics/etc)
+        if main_font_preset is not None:
+            main_fonts_ass = (
+                [
                     font
                     for font in ass[2]
                     if font["font_family"] == main_font_preset.get("font_family")
                 ]
+                if style_cache is None
+                else style_cache.family(ass[2], main_font_preset.get("font_family"))
+            )
 
-            # Copy other fonts into attachment folder
-            for font in main_fonts_ass:
-                if (
-                    font["file_path"].parent
-                    == file_attachments_output_folder_for_current_file_path
-                ):
-                    continue
+        # Copy other fonts into attachment folder
+        copied_font_paths = set()
+        for font in [*main_fonts_ass, *inline_fonts_ass]:
+            if (
+                font["file_path"].parent == attachments_folder
+                or font["file_path"] in copied_font_paths
+            ):
+                continue
+            copied_font_paths.add(font["file_path"])
+
+            font_store.materialize(
+                font["file_path"],
+                attachments_folder.joinpath(font["file_name"]),
+            )
 
-                shutil.copy(
-                    font["file_path"],
-                    file_attachments_output_folder_for_current_file_path.joinpath(
-                        font["file_name"]
-                    ),
-                )
+    logger.info(f"Attachments written to `{attachments_folder}`.")
 
-            logger.info(
-                f"Attachments written to `{file_attachments_output_folder_for_current_file_path}`."
+
+def file_signature(file_path: Path) -> dict:
+    stat = os.stat(file_path)
+
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def journal_extraction(subtitles: list, fonts: list) -> dict:
+    """
+    Serialize the extracted subtitles and fonts for the journal.
+
+    Parameters:
+        subtitles (list): The extracted subtitles, see `extract_subtitles_and_fonts`.
+        fonts (list): The extracted fonts.
+
+    Returns:
+        dict: The extracted subtitle files with their size and modification time, and the extracted fonts.
+    """
+
+    return {
+        "subtitles": [
+            {"save_file": ass[0], "path": str(ass[1]), **file_signature(ass[1])}
+            for ass in subtitles
+        ],
+        "fonts": [{**font, "file_path": str(font["file_path"])} for font in fonts],
+    }
+
+
+def resume_extraction(resume_state: dict, font_finder: FontFinder) -> tuple | None:
+    """
+    Restore the extracted subtitles and fonts of an interrupted run, instead of extracting them again.
+
+    Parameters:
+        resume_state (dict): The journaled state of the input file, see `Journal.state`.
+        font_finder (FontFinder): The font finder shared between files.
+
+    Returns:
+        tuple | None: The subtitles and fonts as returned by `extract_subtitles_and_fonts`, or None if the extracted
+        files were changed or removed since they were journaled.
+    """
+
+    extracted = resume_state["extracted"]
+    if extracted is None:
+        return None
+
+    restyled = resume_state["restyled"]
+    for extracted_subtitle in extracted["subtitles"]:
+        path = Path(extracted_subtitle["path"])
+        if not path.is_file():
+            return None
+
+        # Not restyled yet, so the file must still be exactly as extracted
+        if extracted_subtitle["save_file"] not in restyled and file_signature(path) != {
+            "size": extracted_subtitle["size"],
+            "mtime_ns": extracted_subtitle["mtime_ns"],
+        }:
+            return None
+
+    fonts = [
+        {**font, "file_path": Path(font["file_path"])} for font in extracted["fonts"]
+    ]
+
+    # Fonts are only removed from the attachments by restyling
+    if not restyled and not all(font["file_path"].is_file() for font in fonts):
+        return None
+
+    subtitles = [
+        [
+            extracted_subtitle["save_file"],
+            Path(extracted_subtitle["path"]),
+            font_finder.fonts,
+        ]
+        for extracted_subtitle in extracted["subtitles"]
+    ]
+
+    return subtitles, fonts
+
+
+def process_file(
+    input_file: Path,
+    output_folder: Path,
+    presets: list,
+    stream_select: str | int | None,
+    stream_policy: StreamPolicy | None,
+    fan_out: bool,
+    font_finder: FontFinder,
+    resume_state: dict | None = None,
+    record_stage: Callable[..., None] | None = None,
+    font_store: FontStore | None = None,
+    probe_cache: ProbeCache | None = None,
+    style_cache: StyleCache | None = None,
+) -> list:
+    """
+    Extract, restyle and write the subtitles and attachments of a single input file.
+
+    Parameters:
+        input_file (Path): The input file.
+        output_folder (Path): The output directory.
+        presets (list): The compiled presets; only the first is used unless fanning out.
+        stream_select (str | int | None): The subtitle stream selection.
+        stream_policy (StreamPolicy | None): The stream selection policy.
+        fan_out (bool): Whether to apply every preset, writing to a subdirectory per preset.
+        font_finder (FontFinder): The font finder shared between files.
+        resume_state (dict | None, optional): The journaled state of an interrupted run, to resume from. The default
+        is None.
+        record_stage (Callable | None, optional): Called with the stage and its data when a stage is completed, e.g.
+        to journal it. The default is None.
+        font_store (FontStore | None, optional): The font store to share between files. The default is None, which
+        uses the font store in the output directory.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+        style_cache (StyleCache | None, optional): The restyled style lines and font lookups shared between files. The
+        default is None.
+
+    Returns:
+        list: The paths of the written subtitle files.
+    """
+
+    attachments_folder = output_folder.joinpath("attachments")
+    attachments_folder.mkdir(parents=True, exist_ok=True)
+
+    if font_store is None:
+        font_store = FontStore(output_folder.joinpath(FONT_STORE_FOLDER_NAME))
+
+    extraction = None
+    if resume_state is not None:
+        extraction = resume_extraction(resume_state, font_finder)
+
+    restyled_tracks = []
+    if extraction is not None:
+        logger.info(f"Resuming `{input_file}` from the extracted subtitles and fonts.")
+        subtitles, fonts = extraction
+        restyled_tracks = resume_state["restyled"] if resume_state else []
+        if record_stage is not None:
+            record_stage(STAGE_RESUMED)
+    else:
+        # Extract subtitles and fonts
+        subtitles, fonts = extract_subtitles_and_fonts(
+            input_file,
+            attachments_folder,
+            stream_select,
+            font_finder,
+            stream_policy,
+            probe_cache,
+        )
+        if subtitles and record_stage is not None:
+            record_stage(STAGE_EXTRACTED, journal_extraction(subtitles, fonts))
+
+    if not subtitles:
+        return []
+
+    # Probe video once, shared by all tracks and presets
+    video_dimensions = probe_video_dimensions(input_file, probe_cache)
+
+    outputs = []
+    for ass in subtitles:
+        restyled_outputs = (
+            [ass[1]]
+            if not fan_out
+            else [
+                output_folder.joinpath(current_preset.path.stem, ass[0])
+                for current_preset in presets
+            ]
+        )
+        if ass[0] in restyled_tracks and all(
+            restyled_output.is_file() for restyled_output in restyled_outputs
+        ):
+            outputs.extend(restyled_outputs)
+            continue
+
+        # Parse subtitle once, shared by all presets
+        with span("parse"):
+            subtitle = parse_subtitle(ass[1])
+
+        if not fan_out:
+            restyle_subtitle(
+                subtitle,
+                presets[0],
+                video_dimensions,
+                ass,
+                fonts,
+                ass[1],
+                attachments_folder,
+                font_store,
+                style_cache,
             )
+            outputs.append(ass[1])
+            if record_stage is not None:
+                record_stage(STAGE_RESTYLED, {"track": ass[0]})
+            continue
+
+        # Apply every preset to the same extraction, writing to a subdirectory per preset
+        for current_preset in presets:
+            preset_output_folder = output_folder.joinpath(current_preset.path.stem)
+            preset_attachments_folder = preset_output_folder.joinpath("attachments")
+            restyle_subtitle(
+                subtitle,
+                current_preset,
+                video_dimensions,
+                ass,
+                materialize_attachments(fonts, preset_attachments_folder, font_store),
+                preset_output_folder.joinpath(ass[0]),
+                preset_attachments_folder,
+                font_store,
+                style_cache,
+            )
+            outputs.append(preset_output_folder.joinpath(ass[0]))
+
+        if record_stage is not None:
+            record_stage(STAGE_RESTYLED, {"track": ass[0]})
+
+    return outputs
+
+
+def build_remux_command(
+    input_file: Path,
+    identify: dict,
+    restyled_tracks: dict,
+    attachments: list,
+    output_file: Path,
+) -> list:
+    """
+    Build the MKVmerge command which copies the input file, with the restyled subtitle tracks and attachments swapped in.
+
+    Parameters:
+        input_file (Path): The input file.
+        identify (dict): The MKVmerge identification output of the input file.
+        restyled_tracks (dict): The paths of the restyled subtitle files per track ID.
+        attachments (list): The paths of the fonts to attach.
+        output_file (Path): The path to write the output file to.
+
+    Returns:
+        list: The MKVmerge command.
+    """
+
+    command = ["mkvmerge", "--output", str(output_file), "--no-attachments"]
+    if restyled_tracks:
+        command += [
+            "--subtitle-tracks",
+            "!" + ",".join(str(track_id) for track_id in restyled_tracks),
+        ]
+    command.append(str(input_file))
+
+    tracks_by_id = {track["id"]: track for track in identify["tracks"]}
+    file_ids = {}
+    for file_id, (track_id, restyled_file) in enumerate(
+        restyled_tracks.items(), start=1
+    ):
+        file_ids[track_id] = file_id
+
+        # Keep the language, name and flags of the original track
+        properties = tracks_by_id[track_id]["properties"]
+        language = properties.get("language_ietf") or properties.get("language")
+        if language:
+            command += ["--language", f"0:{language}"]
+        if properties.get("track_name"):
+            command += ["--track-name", f"0:{properties['track_name']}"]
+        for flag_property, flag_option in REMUX_TRACK_FLAGS.items():
+            if flag_property in properties:
+                command += [
+                    flag_option,
+                    f"0:{'yes' if properties[flag_property] else 'no'}",
+                ]
+        command.append(str(restyled_file))
+
+    for attachment in attachments:
+        try:
+            mime_type = FontFinder.mimetype_by_extension(attachment.suffix)
+        except KeyError:
+            mime_type = "application/octet-stream"
+
+        command += [
+            "--attachment-mime-type",
+            mime_type,
+            "--attachment-name",
+            attachment.name,
+            "--attach-file",
+            str(attachment),
+        ]
+
+    # Restyled tracks take the place of the original tracks
+    command += [
+        "--track-order",
+        ",".join(
+            (
+                f"{file_ids[track['id']]}:0"
+                if track["id"] in file_ids
+                else f"0:{track['id']}"
+            )
+            for track in identify["tracks"]
+        ),
+    ]
+
+    return command
+
+
+def publish_outputs(
+    outputs: list, scratch_folder: Path, output_folder: Path, font_store: FontStore
+) -> list:
+    """
+    Publish the restyled subtitles and their attachments from the scratch directory to the output directory.
+
+    Subtitles are written atomically, by renaming a complete temporary file, and attachments are materialized from the
+    font store.
+
+    Parameters:
+        outputs (list): The paths of the restyled subtitle files in the scratch directory.
+        scratch_folder (Path): The scratch directory of the input file.
+        output_folder (Path): The output directory.
+        font_store (FontStore): The font store of the output directory.
+
+    Returns:
+        list: The paths of the published subtitle files.
+    """
+
+    published_outputs = []
+    attachments_folders = {}
+    for output in outputs:
+        relative_folder = Path(output).parent.relative_to(scratch_folder)
+        destination = output_folder.joinpath(relative_folder, Path(output).name)
+        publish_file(Path(output), destination)
+        logger.info(f"Subtitles published to `{destination}`.")
+
+        published_outputs.append(destination)
+        attachments_folders[Path(output).parent.joinpath("attachments")] = (
+            output_folder.joinpath(relative_folder, "attachments")
+        )
+
+    for attachments_folder, destination_folder in attachments_folders.items():
+        if not attachments_folder.is_dir():
+            continue
+
+        destination_folder.mkdir(parents=True, exist_ok=True)
+        for font_file in sorted(attachments_folder.iterdir()):
+            if font_file.is_file():
+                font_store.materialize(
+                    font_file, destination_folder.joinpath(font_file.name)
+                )
+
+        logger.info(f"Attachments published to `{destination_folder}`.")
+
+    return published_outputs
+
+
+def remux_outputs(
+    input_file: Path,
+    outputs: list,
+    scratch_folder: Path,
+    output_folder: Path,
+    probe_cache: ProbeCache | None = None,
+) -> list:
+    """
+    Remux the restyled subtitles and their attachments with the input file, into a single output file per output
+    directory (one per preset when fanning out).
+
+    The output files are written to a temporary file next to them and renamed when complete; the temporary file is
+    removed if remuxing fails.
+
+    Parameters:
+        input_file (Path): The input file.
+        outputs (list): The paths of the restyled subtitle files in the scratch directory.
+        scratch_folder (Path): The scratch directory of the input file.
+        output_folder (Path): The output directory.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+
+    Returns:
+        list: The paths of the written output files.
+    """
+
+    identify = mkvmerge_identify(input_file, probe_cache)
+    track_ids = {
+        prepare_track_info(
+            input_file,
+            track["id"],
+            track["properties"]["codec_id"],
+            track["properties"]["language"],
+        ): track["id"]
+        for track in identify["tracks"]
+        if track["type"] == "subtitles"
+    }
+
+    outputs_by_folder: dict = {}
+    for output in outputs:
+        outputs_by_folder.setdefault(Path(output).parent, []).append(Path(output))
+
+    remuxed_files = []
+    for folder, folder_outputs in outputs_by_folder.items():
+        output_file = output_folder.joinpath(
+            folder.relative_to(scratch_folder), f"{input_file.stem}.mkv"
+        )
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        attachments_folder = folder.joinpath("attachments")
+        attachments = (
+            sorted(path for path in attachments_folder.iterdir() if path.is_file())
+            if attachments_folder.is_dir()
+            else []
+        )
+
+        process = ProcessCommand(logger)
+        with atomic_write(output_file) as temporary_file:
+            process.run(
+                "MKVmerge remux",
+                build_remux_command(
+                    input_file,
+                    identify,
+                    {track_ids[output.name]: output for output in folder_outputs},
+                    attachments,
+                    temporary_file,
+                ),
+                success_codes=(0, 1),
+            )
+        logger.info(f"Remuxed output written to `{output_file}`.")
+
+        remuxed_files.append(output_file)
+
+    return remuxed_files
+
+
+def preflight_presets(presets: list, font_finder: FontFinder) -> list:
+    """
+    Resolve the substitute font of every preset against the available fonts, before any file is extracted.
+
+    Parameters:
+        presets (list): The compiled presets.
+        font_finder (FontFinder): The font finder shared between files.
+
+    Returns:
+        list: The errors, as tuples of the preset and the exception.
+    """
+
+    errors = []
+    for preset in {preset.path: preset for preset in presets}.values():
+        if preset.font is None:
+            continue
+
+        font_name = preset.font.name
+        if find_available_fonts(font_finder.fonts, [font_name])[font_name]:
+            continue
+
+        # All attachments are replaced by the preset font, so it can not be an embedded font
+        if preset.font.substitute == "all":
+            errors.append((preset, FontNotFoundError(font_name)))
+            continue
+
+        logger.warning(
+            f"The font `{font_name}` of preset `{preset.path}` was not found on the filesystem; it has to be "
+            f"embedded in every input file."
+        )
+
+    return errors
+
+
+def check_input_file(
+    input_file: Path,
+    stream_select: str | int | None,
+    stream_policy: StreamPolicy | None,
+    probe_cache: ProbeCache | None = None,
+) -> list:
+    """
+    Probe an input file for suitable subtitle tracks, without extracting anything or asking for input.
+
+    Parameters:
+        input_file (Path): The input file.
+        stream_select (str | int | None): The subtitle stream selection.
+        stream_policy (StreamPolicy | None): The stream selection policy.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+
+    Returns:
+        list: The selected subtitle tracks; empty if the file would be skipped.
+    """
+
+    # Without stream and policy, the first track is used unless the user is asked to select one
+    if stream_select is None and stream_policy is None:
+        stream_policy = StreamPolicy()
+
+    selected_subs, _ = select_restyle_tracks(
+        input_file, stream_select, stream_policy, probe_cache
+    )
+
+    return selected_subs
+
+
+def check_font_coverage(
+    input_file: Path,
+    selected_subs: list,
+    presets: list,
+    font_finder: FontFinder,
+    scratch_root: Path,
+) -> bool:
+    """
+    Extract the selected subtitle tracks, and report the characters of the substituted styles which the preset fonts
+    have no glyph for.
+
+    Only the coverage of fonts on the filesystem is checked; fonts which have to be embedded in the input file are not
+    extracted.
+
+    Parameters:
+        input_file (Path): The input file.
+        selected_subs (list): The selected subtitle tracks, see `select_restyle_tracks`.
+        presets (list): The compiled presets with a font substitution.
+        font_finder (FontFinder): The font finder.
+        scratch_root (Path): The scratch directory to extract the subtitle tracks to.
+
+    Returns:
+        bool: Whether characters are not covered.
+    """
+
+    scratch_folder = scratch_root.joinpath(
+        f"{input_file.stem}-check-"
+        + hashlib.sha1(str(input_file).encode("utf-8")).hexdigest()[:8]
+    )
+    scratch_folder.mkdir(parents=True, exist_ok=True)
+
+    uncovered = False
+    try:
+        for ass_track_path in extract_subtitle_tracks(
+            input_file, selected_subs, scratch_folder
+        ):
+            subtitle = parse_subtitle(ass_track_path)
+            kept_style_names = {
+                style["Name"] for _, style in subtitle["style_lines_kept"]
+            }
+            for preset in presets:
+                font = find_available_fonts(font_finder.fonts, [preset.font.name])[
+                    preset.font.name
+                ]
+                if font is False:
+                    continue
+
+                style_names = [
+                    style_name
+                    for style_name in substituted_style_names(subtitle, preset.font)
+                    if style_name in kept_style_names
+                ]
+                if report_uncovered_characters(
+                    subtitle, font, style_names, ass_track_path.name
+                ):
+                    uncovered = True
+    finally:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+    return uncovered
+
+
+def check_batches(
+    combined_result: list,
+    stream_policy: StreamPolicy | None,
+    probe_cache: ProbeCache | None = None,
+    scratch_root: Path | None = None,
+    font_index: Path | None = None,
+) -> int:
+    """
+    Validate the presets and probe every input file, without writing anything but the probe cache.
+
+    If a preset substitutes a font and a scratch directory is given, the selected subtitle tracks are extracted to it
+    to report the characters the preset font has no glyph for.
+
+    Parameters:
+        combined_result (list): The batches, see `combine_arguments_by_batch`.
+        stream_policy (StreamPolicy | None): The stream selection policy.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+        scratch_root (Path | None, optional): The scratch directory for the font coverage check. The default is None,
+        which skips the check.
+        font_index (Path | None, optional): The font index to use instead of finding the fonts. The default is None.
+
+    Returns:
+        int: The amount of errors.
+    """
+
+    presets = [preset for item in combined_result for preset in item.get("preset")]
+    errors = 0
+    font_finder = None
+    if any(preset.font is not None for preset in presets):
+        font_finder = FontFinder(index_path=font_index)
+        for preset, error in preflight_presets(presets, font_finder):
+            logger.error(f"Preset `{preset.path}`: {error}")
+            errors += 1
+
+    checked_files = 0
+    skipped_files = 0
+    uncovered_files = 0
+    for item in combined_result:
+        for input_file in item.get("input").get("resolved"):
+            checked_files += 1
+            try:
+                selected_subs = check_input_file(
+                    input_file, item.get("stream"), stream_policy, probe_cache
+                )
+            except Exception as error:
+                logger.error(f"Input file `{input_file}`: {error}")
+                errors += 1
+                continue
+
+            if not selected_subs:
+                skipped_files += 1
+                continue
+
+            logger.info(
+                f"Input file `{input_file}`: restyling stream(s) "
+                f"{', '.join(str(sub['index']) for sub in selected_subs)}."
+            )
+
+            font_presets = [
+                preset for preset in item.get("preset") if preset.font is not None
+            ]
+            if font_finder is None or scratch_root is None or not font_presets:
+                continue
+
+            try:
+                if check_font_coverage(
+                    input_file, selected_subs, font_presets, font_finder, scratch_root
+                ):
+                    uncovered_files += 1
+            except Exception as error:
+                logger.error(f"Input file `{input_file}`: {error}")
+                errors += 1
+
+    if font_finder is not None:
+        font_finder.close()
+
+    logger.info(
+        f"Checked {checked_files} file(s): {skipped_files} would be skipped, {uncovered_files} with characters "
+        f"without glyph in the preset font, {errors} error(s)."
+    )
+
+    return errors
+
+
+def restyle_input_file(
+    input_file: Path,
+    output_folder: Path,
+    presets: list,
+    stream_select: str | int | None,
+    stream_policy: StreamPolicy | None,
+    fan_out: bool,
+    manifest: Manifest,
+    journal: Journal,
+    digest: str,
+    force: bool,
+    hash_inputs: bool,
+    stage_tracker: StageTracker,
+    font_finder_factory: Callable[[], FontFinder],
+    font_store: FontStore,
+    font_subsetter: FontSubsetter | None,
+    remux: bool,
+    scratch_root: Path,
+    probe_cache: ProbeCache | None = None,
+    style_cache: StyleCache | None = None,
+) -> str:
+    """
+    Restyle a single input file of a batch, unless its outputs are up to date.
+
+    Parameters:
+        input_file (Path): The input file.
+        output_folder (Path): The output directory.
+        presets (list): The compiled presets.
+        stream_select (str | int | None): The subtitle stream selection.
+        stream_policy (StreamPolicy | None): The stream selection policy.
+        fan_out (bool): Whether to apply every preset.
+        manifest (Manifest): The manifest of the output directory.
+        journal (Journal): The journal of the output directory.
+        digest (str): The options hash.
+        force (bool): Whether to process the input file even if its outputs are up to date.
+        hash_inputs (bool): Whether to include a fast content hash in the fingerprint.
+        stage_tracker (StageTracker): Tracks the stage the input file is in.
+        font_finder_factory (Callable): Returns the font finder shared between files.
+        font_store (FontStore): The font store of the output directory.
+        font_subsetter (FontSubsetter | None): Subsets the attachments to the used code points, if given.
+        remux (bool): Whether to remux the restyled subtitles and attachments with the input file.
+        scratch_root (Path): The scratch directory for intermediate files.
+        probe_cache (ProbeCache | None, optional): The cache of probe results of previous runs. The default is None.
+        style_cache (StyleCache | None, optional): The restyled style lines and font lookups shared between files. The
+        default is None.
+
+    Returns:
+        str: The outcome; `processed`, `up_to_date` if the outputs are up to date, or `no_subtitles` if there is no
+        subtitle stream to restyle. Input files without subtitle stream are not recorded, so they are checked again by
+        later runs, e.g. with another stream selection.
+    """
+
+    input_file = replace_conflicting_characters_in_filename(input_file)
+
+    # Skip before spawning any process if the outputs are up to date
+    with span("fingerprint"):
+        fingerprint = fingerprint_file(input_file, hash_inputs)
+    if not force and manifest.is_up_to_date(input_file, fingerprint, digest):
+        logger.info(f"Skipping `{input_file}`, outputs are up to date.")
+        return OUTCOME_UP_TO_DATE
+
+    # Completed or partially processed by an interrupted run
+    resume_state = None if force else journal.state(input_file, fingerprint, digest)
+    if (
+        resume_state is not None
+        and resume_state["stage"] == STAGE_COMPLETED
+        and resume_state["outputs"]
+        and all(Path(output).exists() for output in resume_state["outputs"])
+    ):
+        logger.info(f"Skipping `{input_file}`, completed by an interrupted run.")
+        manifest.record(input_file, fingerprint, digest, resume_state["outputs"])
+        return OUTCOME_UP_TO_DATE
+
+    font_finder = font_finder_factory()
+
+    stage_tracker.start(STAGE_EXTRACT)
+    stage_tracker.record_stage = functools.partial(
+        journal.append, input_file, fingerprint, digest
+    )
+    # The extracted and restyled files are intermediate files in a scratch directory, which is the same for every run
+    # so an interrupted run can be resumed
+    scratch_folder = scratch_root.joinpath(
+        f"{input_file.stem}-"
+        + hashlib.sha1(f"{input_file}:{output_folder}".encode("utf-8")).hexdigest()[:8]
+    )
+    outputs = process_file(
+        input_file,
+        scratch_folder,
+        presets,
+        stream_select,
+        stream_policy,
+        fan_out,
+        font_finder,
+        resume_state,
+        stage_tracker,
+        font_store,
+        probe_cache,
+        style_cache,
+    )
+
+    if not outputs:
+        shutil.rmtree(scratch_folder, ignore_errors=True)
+
+        return OUTCOME_NO_SUBTITLES
+
+    if remux:
+        if font_subsetter is not None:
+            with span("subset"):
+                subset_output_attachments(outputs, font_subsetter)
+            font_subsetter.forget(scratch_folder)
+
+        stage_tracker.start(STAGE_REMUX)
+        with span("remux"):
+            outputs = remux_outputs(
+                input_file, outputs, scratch_folder, output_folder, probe_cache
+            )
+    else:
+        stage_tracker.start(STAGE_PUBLISH)
+        with span("publish"):
+            outputs = publish_outputs(
+                outputs, scratch_folder, output_folder, font_store
+            )
+
+        # Subset in the output directory, as its attachments are shared with the other files
+        if font_subsetter is not None:
+            with span("subset"):
+                subset_output_attachments(outputs, font_subsetter)
+
+    shutil.rmtree(scratch_folder, ignore_errors=True)
+
+    stage_tracker.start(STAGE_FINALIZE)
+    with span("finalize"):
+        journal.append(
+            input_file,
+            fingerprint,
+            digest,
+            STAGE_COMPLETED,
+            {"outputs": [str(output) for output in outputs]},
+        )
+        manifest.record(input_file, fingerprint, digest, outputs)
+
+    return OUTCOME_PROCESSED
+
+
+@logger.catch
+@click.command(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    epilog="Build a font index with `mkvrestyle index build`. Repository: https://github.com/ToshY/mkvrestyle",
+)
+@click.option(
+    "--input-path",
+    "-i",
+    type=click.Path(exists=True, dir_okay=True, file_okay=True, resolve_path=True),
+    required=False,
+    multiple=True,
+    is_eager=True,
+    callback=InputPathChecker(),
+    show_default=True,
+    default=["./input"],
+    help="Path to input file or directory",
+)
+@click.option(
+    "--output-path",
+    "-o",
+    type=click.Path(dir_okay=True, file_okay=True, resolve_path=True),
+    required=False,
+    multiple=True,
+    callback=OutputPathChecker(),
+    show_default=True,
+    default=["./output"],
+    help="Path to output file or directory",
+)
+@click.option(
+    "--preset",
+    "-p",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    multiple=True,
+    callback=PresetPathChecker(),
+    show_default=True,
+    default=["./preset/default.json"],
+    help="Path to JSON file with ASS video preset options",
+)
+@click.option(
+    "--stream",
+    "-s",
+    type=ClickUnionType([click.INT, click.STRING]),
+    required=False,
+    multiple=True,
+    callback=OptionalValueChecker(),
+    show_default=True,
+    default=[None],
+    help="Stream ID or ISO 639-3 language code of the subtitle track; comma-separated for multiple tracks, or `all` "
+    "for every ASS track",
+)
+@click.option(
+    "--stream-policy",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    callback=StreamPolicyPathChecker(),
+    default=None,
+    help="Path to JSON file with the subtitle stream selection policy, used when no stream is given or it is missing",
+)
+@click.option(
+    "--fan-out",
+    is_flag=True,
+    is_eager=True,
+    default=False,
+    help="Apply every preset to every input, writing the output per preset to a subdirectory named after the preset",
+)
+@click.option(
+    "--force",
+    "-f",
+    is_flag=True,
+    default=False,
+    help="Process every input, including inputs whose outputs are up to date",
+)
+@click.option(
+    "--hash-inputs",
+    is_flag=True,
+    default=False,
+    help="Include a fast content hash of the input files to detect changes, besides size, modification time and inode",
+)
+@click.option(
+    "--subset-fonts",
+    is_flag=True,
+    default=False,
+    help="Subset the attached fonts to the characters used in the subtitles",
+)
+@click.option(
+    "--remux",
+    is_flag=True,
+    is_eager=True,
+    default=False,
+    help="Remux the restyled subtitles and attachments with the input file into an MKV file in the output directory, "
+    "instead of writing them separately",
+)
+@click.option(
+    "--scratch-path",
+    type=click.Path(dir_okay=True, file_okay=False, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to write intermediate files to; defaults to tmpfs (/dev/shm) if it has enough free space, otherwise "
+    "the temporary directory of the system",
+)
+@click.option(
+    "--probe-cache",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to the cache of the MKVmerge identification and video dimensions of the input files, reused by later "
+    "runs for unchanged files; defaults to `probe-cache.json` in `$XDG_CACHE_HOME/mkvrestyle`",
+)
+@click.option(
+    "--probe-cache-size",
+    type=click.IntRange(min=0),
+    required=False,
+    show_default=True,
+    default=PROBE_CACHE_MAX_ENTRIES,
+    help="Maximum amount of input files in the probe cache, evicting the least recently used; 0 disables the cache",
+)
+@click.option(
+    "--font-index",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to a font index built with `mkvrestyle index build`, used instead of finding the fonts at the start of "
+    "the run",
+)
+@click.option(
+    "--check",
+    is_flag=True,
+    default=False,
+    help="Validate the presets and probe the input files for a suitable subtitle stream, without writing anything; if "
+    "a preset substitutes a font, the subtitle streams are extracted to the scratch directory to report characters "
+    "without glyph in the preset font",
+)
+@click.option(
+    "--keep-going",
+    "-k",
+    is_flag=True,
+    default=False,
+    help="Continue with the remaining files if a file fails, and write a JSON report of the failures",
+)
+@click.option(
+    "--failure-report",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to write the JSON report of the failures to, with `--keep-going`; defaults to "
+    f"`{FAILURE_REPORT_FILE_NAME}` in the (first) output directory",
+)
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to write a Chrome trace of the time spent per stage and process to, and print the totals per stage at "
+    "the end of the run",
+)
+@click.option(
+    "--memprofile",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to write a JSON report of the peak memory and top allocation sites per stage and input file to, and "
+    "print the peaks per stage at the end of the run; slows down the run considerably",
+)
+@click.option(
+    "--metrics",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    default=None,
+    help="Path to write metrics of the run to in the Prometheus text format, e.g. for the textfile collector of the "
+    "node exporter",
+)
+@click.option(
+    "--metrics-interval",
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+    default=60,
+    help="Minimum amount of seconds between writes of the metrics during the run",
+)
+def cli(
+    input_path,
+    output_path,
+    preset,
+    stream,
+    stream_policy,
+    fan_out,
+    force,
+    hash_inputs,
+    subset_fonts,
+    remux,
+    scratch_path,
+    probe_cache,
+    probe_cache_size,
+    font_index,
+    check,
+    keep_going,
+    failure_report,
+    profile,
+    memprofile,
+    metrics,
+    metrics_interval,
+):
+    if memprofile is not None:
+        memory_profiler = MemoryProfiler()
+        add_recorder(memory_profiler)
+
+        def write_memory_profile() -> None:
+            memory_profiler.write(Path(memprofile))
+            table_print_memory_profile(memory_profiler.summary())
+            logger.info(f"Memory profile written to `{memprofile}`.")
+
+        # Also written if the run fails
+        click.get_current_context().call_on_close(write_memory_profile)
+
+    if profile is not None:
+        profiler = enable_profiling()
+
+        def write_profile() -> None:
+            profiler.write(Path(profile))
+            table_print_profile(profiler.summary())
+            logger.info(f"Profile written to `{profile}`.")
+
+        # Also written if the run fails
+        click.get_current_context().call_on_close(write_profile)
+
+    combined_result = combine_arguments_by_batch(
+        input_path, output_path, preset, stream
+    )
+
+    input_probe_cache = None
+    if probe_cache_size > 0:
+        probe_cache_path = (
+            Path(probe_cache)
+            if probe_cache is not None
+            else get_cache_folder().joinpath(PROBE_CACHE_FILE_NAME)
+        )
+        try:
+            probe_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as error:
+            # E.g. running as a user without home directory; the files are probed every run
+            logger.warning(
+                f"Probe cache disabled, as `{probe_cache_path.parent}` could not be created: {error}."
+            )
+        else:
+            input_probe_cache = ProbeCache(probe_cache_path, probe_cache_size)
+
+            # Also written if the run fails
+            click.get_current_context().call_on_close(input_probe_cache.save)
+
+    scratch_root = get_scratch_folder(
+        Path(scratch_path) if scratch_path is not None else None
+    )
+
+    def remove_scratch_root() -> None:
+        # Kept if it holds the intermediate files of a failed or interrupted file
+        with contextlib.suppress(OSError):
+            scratch_root.rmdir()
+
+    click.get_current_context().call_on_close(remove_scratch_root)
+
+    if check:
+        if check_batches(
+            combined_result,
+            stream_policy,
+            input_probe_cache,
+            scratch_root,
+            Path(font_index) if font_index is not None else None,
+        ):
+            sys.exit(1)
+
+        return
+
+    # Available fonts are resolved once for the whole run, when the first file is processed
+    font_finder = None
+    tool_version = get_tool_version()
+
+    def font_finder_factory() -> FontFinder:
+        nonlocal font_finder
+        if font_finder is None:
+            with span("font scan"):
+                font_finder = FontFinder(
+                    index_path=Path(font_index) if font_index is not None else None
+                )
+            click.get_current_context().call_on_close(font_finder.close)
+
+        return font_finder
+
+    # Preflight; fail before any file is extracted if a preset font is not available
+    presets = [preset for item in combined_result for preset in item.get("preset")]
+    if any(preset.font is not None for preset in presets):
+        font_finder = font_finder_factory()
+        with span("preflight"):
+            errors = preflight_presets(presets, font_finder)
+        if errors:
+            raise errors[0][1]
+
+    logger.info(f"Intermediate files are written to `{scratch_root}`.")
+
+    # Episodes of a season mostly share their Styles section
+    style_cache = StyleCache()
+
+    report = FailureReport()
+    run_metrics = None
+    if metrics is not None:
+        run_metrics = Metrics(Path(metrics), metrics_interval, tool_version, report)
+        add_recorder(run_metrics)
+        click.get_current_context().call_on_close(run_metrics.write)
+
+    for item in combined_result:
+        current_stream = item.get("stream")
+        current_presets = item.get("preset")
+        current_output = item.get("output").get("resolved")
+        current_input_files = item.get("input").get("resolved")
+
+        current_output_folder = current_output.with_suffix("")
+        manifest = Manifest(current_output_folder, tool_version)
+        journal = Journal(current_output_folder)
+        font_store = FontStore(current_output_folder.joinpath(FONT_STORE_FOLDER_NAME))
+        font_subsetter = FontSubsetter(font_store) if subset_fonts else None
+        if run_metrics is not None:
+            run_metrics.add_font_store(font_store)
+        current_options_digest = options_digest(
+            [current_preset.digest for current_preset in current_presets],
+            current_stream,
+            repr(stream_policy),
+            fan_out,
+            subset_fonts,
+            remux,
+        )
+
+        batch_failures = len(report.failures)
+        try:
+            for current_file_path in current_input_files:
+                if run_metrics is not None:
+                    run_metrics.write_periodically()
+
+                started = time.perf_counter()
+                stage_tracker = StageTracker()
+                try:
+                    with span("file", input=current_file_path):
+                        outcome = restyle_input_file(
+                            current_file_path,
+                            current_output_folder,
+                            current_presets,
+                            current_stream,
+                            stream_policy,
+                            fan_out,
+                            manifest,
+                            journal,
+                            current_options_digest,
+                            force,
+                            hash_inputs,
+                            stage_tracker,
+                            font_finder_factory,
+                            font_store,
+                            font_subsetter,
+                            remux,
+                            scratch_root,
+                            input_probe_cache,
+                            style_cache,
+                        )
+                except Exception as error:
+                    report.add(
+                        current_file_path,
+                        stage_tracker.stage,
+                        error,
+                        time.perf_counter() - started,
+                    )
+                    if not keep_going:
+                        raise
+
+                    logger.error(
+                        f"Failed to process `{current_file_path}` in stage `{stage_tracker.stage}`: {error}"
+                    )
+                    continue
+
+                if outcome == OUTCOME_PROCESSED:
+                    report.processed += 1
+                elif outcome == OUTCOME_UP_TO_DATE:
+                    report.skipped += 1
+                else:
+                    report.no_subtitles += 1
+
+            # The manifest covers every file of the batch, so the journal is no longer needed unless a file failed
+            manifest.save()
+            if len(report.failures) == batch_failures:
+                journal.clear()
+        finally:
+            manifest.save()
+            journal.close()
+            if font_subsetter is not None:
+                font_subsetter.save()
+
+    logger.info(
+        f"Processed {report.processed} file(s), skipped {report.skipped} up-to-date file(s) and "
+        f"{report.no_subtitles} file(s) without subtitle stream to restyle."
+    )
+
+    if keep_going:
+        if failure_report is None:
+            failure_report = (
+                combined_result[0]
+                .get("output")
+                .get("resolved")
+                .with_suffix("")
+                .joinpath(FAILURE_REPORT_FILE_NAME)
+            )
+        report.write(Path(failure_report))
+        if report.failures:
+            logger.error(
+                f"Failed to process {len(report.failures)} file(s), see `{failure_report}`."
+            )
+            sys.exit(1)
+
+
+@click.group(
+    context_settings={"help_option_names": ["-h", "--help"]},
+    epilog="Repository: https://github.com/ToshY/mkvrestyle",
+)
+def index():
+    """Manage the font index, a compact file of the available fonts shared between runs and containers."""
+
+
+@index.command("build", context_settings={"help_option_names": ["-h", "--help"]})
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True),
+    required=False,
+    show_default=True,
+    default="./font-index.bin",
+    help="Path to write the font index to",
+)
+@logger.catch
+def index_build(output):
+    """Find the available fonts and write them to a font index, to use with `--font-index`."""
+
+    with span("font scan"):
+        font_finder = FontFinder(with_coverage=True)
+
+    write_font_index(font_finder.fonts, Path(output))
+    logger.info(
+        f"Font index of {len(font_finder.fonts)} font(s) written to `{output}`."
+    )
+
+
+def main():
+    """Entry point; dispatches `mkvrestyle index ...` to the font index commands and anything else to `cli`."""
+
+    if sys.argv[1:2] == ["index"]:
+        index(sys.argv[2:], prog_name="mkvrestyle index")
+    else:
+        cli()
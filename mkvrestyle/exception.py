@@ -186,3 +186,109 @@ class SubtitleCodecError(Exception):
 
     def __str__(self):
         return self.message
+
+
+class InvalidPresetError(Exception):
+    """
+    Exception raised when the preset contains an invalid option.
+
+    This exception is raised when the preset contains an invalid option.
+
+    Attributes:
+        message (str): The error message.
+
+    """
+
+    ERROR_MESSAGE = "Invalid preset option `{option}` provided: {reason}."
+
+    def __init__(self, option, reason):
+        self.message = self.ERROR_MESSAGE.format(option=option, reason=reason)
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+
+class SubtitleStreamNotFoundError(Exception):
+    """
+    Exception raised when no subtitle stream matches the stream selection.
+
+    This exception is raised when no subtitle stream matches the stream selection.
+
+    Attributes:
+        message (str): The error message.
+
+    """
+
+    ERROR_MESSAGE = "No subtitle stream matching `{stream}` was found for input file `{input_file}`."
+
+    def __init__(self, stream, input_file):
+        self.message = self.ERROR_MESSAGE.format(stream=stream, input_file=input_file)
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+
+class InvalidStreamPolicyError(Exception):
+    """
+    Exception raised when the stream selection policy contains an invalid option.
+
+    This exception is raised when the stream selection policy contains an invalid option.
+
+    Attributes:
+        message (str): The error message.
+
+    """
+
+    ERROR_MESSAGE = "Invalid stream policy option `{option}` provided: {reason}."
+
+    def __init__(self, option, reason):
+        self.message = self.ERROR_MESSAGE.format(option=option, reason=reason)
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+
+class InvalidFontIndexError(Exception):
+    """
+    Exception raised when a font index can not be read.
+
+    This exception is raised when the font index is not a font index, or was written by an incompatible version.
+
+    Attributes:
+        message (str): The error message.
+
+    """
+
+    ERROR_MESSAGE = "Invalid font index `{path}` provided: {reason}."
+
+    def __init__(self, path, reason):
+        self.message = self.ERROR_MESSAGE.format(path=path, reason=reason)
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+
+class ScratchFolderError(Exception):
+    """
+    Exception raised when the scratch directory can not be used safely.
+
+    This exception is raised when the scratch directory is not a directory, is a symbolic link or is owned by another
+    user.
+
+    Attributes:
+        message (str): The error message.
+
+    """
+
+    ERROR_MESSAGE = "Scratch directory `{path}` can not be used: {reason}."
+
+    def __init__(self, path, reason):
+        self.message = self.ERROR_MESSAGE.format(path=path, reason=reason)
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
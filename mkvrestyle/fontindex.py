@@ -0,0 +1,337 @@
+import mmap
+import struct
+import sys
+import zlib
+from collections.abc import Sequence
+from pathlib import Path
+
+from mkvrestyle.exception import InvalidFontIndexError
+from mkvrestyle.helper import atomic_write
+
+FONT_INDEX_MAGIC = b"MKVRFIDX"
+FONT_INDEX_VERSION = 1
+
+# Magic, version, amount of fonts, slots per lookup table, and the offsets of the records, the lookup tables by font
+# name and font family, the coverage and the string table
+FONT_INDEX_HEADER = struct.Struct("<8s9I")
+
+# Offset and length in the string table of the file path, file name, font name, font family and font style, and the
+# offset and length of the coverage (in boundaries)
+FONT_INDEX_RECORD = struct.Struct("<12I")
+FONT_INDEX_STRING_FIELDS = (
+    "file_path",
+    "file_name",
+    "font_name",
+    "font_family",
+    "font_style",
+)
+
+FONT_INDEX_SLOT = struct.Struct("<I")
+
+
+def lookup_hash(key: str) -> int:
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def build_lookup_table(keys: list) -> list:
+    """
+    Build an open addressing (linear probing) hash table of record indices.
+
+    Records with the same key are inserted in order, so a lookup finds them in order.
+
+    Parameters:
+        keys (list): The key per record.
+
+    Returns:
+        list: The record index + 1 per slot; 0 for an empty slot. The amount of slots is a power of two, at least
+        twice the amount of records.
+    """
+
+    slot_count = 1
+    while slot_count < 2 * max(1, len(keys)):
+        slot_count *= 2
+
+    slots = [0] * slot_count
+    for record_index, key in enumerate(keys):
+        slot = lookup_hash(key) & (slot_count - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = record_index + 1
+
+    return slots
+
+
+def write_font_index(fonts: list, output_file: Path) -> None:
+    """
+    Write a font index, which is memory-mapped by `FontIndex`, atomically.
+
+    Parameters:
+        fonts (list): The fonts, see `FontFinder.fonts`.
+        output_file (Path): The path to the index file.
+
+    Returns:
+        None
+    """
+
+    strings = bytearray()
+    string_offsets: dict = {}
+
+    def add_string(value: str) -> tuple:
+        encoded = value.encode("utf-8")
+        if encoded not in string_offsets:
+            string_offsets[encoded] = len(strings)
+            strings.extend(encoded)
+
+        return string_offsets[encoded], len(encoded)
+
+    records = bytearray()
+    coverage: list = []
+    for font in fonts:
+        fields: list = []
+        for key in FONT_INDEX_STRING_FIELDS:
+            fields.extend(add_string(str(font[key])))
+        fields.extend((len(coverage), len(font.get("coverage", []))))
+        coverage.extend(font.get("coverage", []))
+        records.extend(FONT_INDEX_RECORD.pack(*fields))
+
+    name_slots = build_lookup_table([font["font_name"].lower() for font in fonts])
+    family_slots = build_lookup_table([font["font_family"] for font in fonts])
+
+    records_offset = FONT_INDEX_HEADER.size
+    name_table_offset = records_offset + len(records)
+    family_table_offset = name_table_offset + len(name_slots) * FONT_INDEX_SLOT.size
+    coverage_offset = family_table_offset + len(family_slots) * FONT_INDEX_SLOT.size
+    strings_offset = coverage_offset + len(coverage) * FONT_INDEX_SLOT.size
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(output_file) as temporary_path:
+        with temporary_path.open("wb") as file:
+            file.write(
+                FONT_INDEX_HEADER.pack(
+                    FONT_INDEX_MAGIC,
+                    FONT_INDEX_VERSION,
+                    len(fonts),
+                    len(name_slots),
+                    len(family_slots),
+                    records_offset,
+                    name_table_offset,
+                    family_table_offset,
+                    coverage_offset,
+                    strings_offset,
+                )
+            )
+            file.write(records)
+            for table in (name_slots, family_slots, coverage):
+                file.write(struct.pack(f"<{len(table)}I", *table))
+            file.write(strings)
+
+
+class FontIndex(Sequence):
+    """
+    Read-only font index, memory-mapped so processes using the same index share its pages.
+
+    The index is a sequence of the same font entries as `FontFinder.fonts`, which are created when first accessed. The
+    fonts can be looked up by name and family through hash tables, without creating the other entries. The mapping is
+    released by `close`, or when used as a context manager, after which the entries can no longer be used.
+
+    Attributes:
+        path (Path): The path to the index file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, mode="rb") as file:
+            try:
+                self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise InvalidFontIndexError(str(path), "empty file")
+
+        self._fonts: dict = {}
+        try:
+            self._check_header()
+        except InvalidFontIndexError:
+            self.close()
+            raise
+
+    def _check_header(self) -> None:
+        if len(self._buffer) < FONT_INDEX_HEADER.size:
+            raise InvalidFontIndexError(str(self.path), "truncated header")
+
+        (
+            magic,
+            version,
+            self._count,
+            self._name_slot_count,
+            self._family_slot_count,
+            self._records_offset,
+            self._name_table_offset,
+            self._family_table_offset,
+            self._coverage_offset,
+            self._strings_offset,
+        ) = FONT_INDEX_HEADER.unpack_from(self._buffer)
+        if magic != FONT_INDEX_MAGIC or version != FONT_INDEX_VERSION:
+            raise InvalidFontIndexError(str(self.path), "unsupported format or version")
+
+        # The slot counts are used as mask, so they are powers of two
+        for slot_count in (self._name_slot_count, self._family_slot_count):
+            if slot_count == 0 or slot_count & (slot_count - 1):
+                raise InvalidFontIndexError(str(self.path), "invalid lookup table")
+
+        # The sections are written in order, up to the string table at the end
+        sections = (
+            (self._records_offset, self._count * FONT_INDEX_RECORD.size),
+            (self._name_table_offset, self._name_slot_count * FONT_INDEX_SLOT.size),
+            (
+                self._family_table_offset,
+                self._family_slot_count * FONT_INDEX_SLOT.size,
+            ),
+            (self._coverage_offset, self._strings_offset - self._coverage_offset),
+        )
+        end = FONT_INDEX_HEADER.size
+        for offset, length in sections:
+            if offset < end or length < 0:
+                raise InvalidFontIndexError(str(self.path), "truncated")
+            end = offset + length
+        if end > self._strings_offset or self._strings_offset > len(self._buffer):
+            raise InvalidFontIndexError(str(self.path), "truncated")
+
+    def close(self) -> None:
+        """
+        Release the mapping of the index.
+
+        Returns:
+            None
+        """
+
+        # The coverage of the entries shares the mapping, which can only be closed once it is released
+        for font in self._fonts.values():
+            if isinstance(font["coverage"], memoryview):
+                font["coverage"].release()
+        self._fonts.clear()
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[record] for record in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+
+        return self._font(index)
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        if start + length > len(self._buffer):
+            raise InvalidFontIndexError(str(self.path), "truncated")
+
+        return self._buffer[start : start + length].decode("utf-8")
+
+    def _record(self, index: int) -> tuple:
+        return FONT_INDEX_RECORD.unpack_from(
+            self._buffer, self._records_offset + index * FONT_INDEX_RECORD.size
+        )
+
+    def _record_string(self, index: int, key: str) -> str:
+        field = FONT_INDEX_STRING_FIELDS.index(key)
+        record = self._record(index)
+
+        return self._string(record[2 * field], record[2 * field + 1])
+
+    def _coverage(self, offset: int, length: int):
+        start = self._coverage_offset + offset * FONT_INDEX_SLOT.size
+        end = start + length * FONT_INDEX_SLOT.size
+        if end > self._strings_offset:
+            raise InvalidFontIndexError(str(self.path), "truncated")
+
+        # Shared with the mapping where the byte order allows it
+        if sys.byteorder == "little":
+            return memoryview(self._buffer)[start:end].cast("I")
+
+        return list(struct.unpack_from(f"<{length}I", self._buffer, start))
+
+    def _font(self, index: int) -> dict:
+        font = self._fonts.get(index)
+        if font is not None:
+            return font
+
+        record = self._record(index)
+        font = {
+            key: self._string(record[2 * field], record[2 * field + 1])
+            for field, key in enumerate(FONT_INDEX_STRING_FIELDS)
+        }
+        font["file_path"] = Path(font["file_path"])
+        font["coverage"] = self._coverage(record[10], record[11])
+        self._fonts[index] = font
+
+        return font
+
+    def _lookup(
+        self, table_offset: int, slot_count: int, key: str, record_key: str, match
+    ) -> list:
+        indices: list = []
+        slot = lookup_hash(key) & (slot_count - 1)
+        while True:
+            (value,) = FONT_INDEX_SLOT.unpack_from(
+                self._buffer, table_offset + slot * FONT_INDEX_SLOT.size
+            )
+            if value == 0:
+                return indices
+
+            if match(self._record_string(value - 1, record_key)):
+                indices.append(value - 1)
+            slot = (slot + 1) & (slot_count - 1)
+
+    def find(self, font_name: str) -> dict | None:
+        """
+        Find a font by its name, case-insensitive.
+
+        Parameters:
+            font_name (str): The font name.
+
+        Returns:
+            dict | None: The first font with the name, or None if there is none.
+        """
+
+        key = font_name.lower()
+        indices = self._lookup(
+            self._name_table_offset,
+            self._name_slot_count,
+            key,
+            "font_name",
+            lambda value: value.lower() == key,
+        )
+
+        return self._font(indices[0]) if indices else None
+
+    def family(self, font_family: str) -> list:
+        """
+        Find the fonts of a font family, e.g. its bold and italic variants.
+
+        Parameters:
+            font_family (str): The font family.
+
+        Returns:
+            list: The fonts of the family.
+        """
+
+        return [
+            self._font(index)
+            for index in self._lookup(
+                self._family_table_offset,
+                self._family_slot_count,
+                font_family,
+                "font_family",
+                lambda value: value == font_family,
+            )
+        ]
@@ -1,12 +1,88 @@
+import bisect
 from pathlib import Path
 from contextlib import redirect_stderr
 from fontTools.ttLib import TTFont  # type: ignore
+from mkvrestyle.fontindex import FontIndex
 import os  # noqa: E402
 
 os.environ["MPLCONFIGDIR"] = "/tmp"
 from matplotlib import font_manager  # noqa: E402
 
 
+def coverage_ranges(codepoints) -> list:
+    """
+    Compact representation of a set of code points, e.g. the characters a font has glyphs for.
+
+    Parameters
+    ----------
+    codepoints : Iterable[int]
+        The code points.
+
+    Returns
+    -------
+    list
+        The sorted boundaries of the half-open ranges of consecutive code points, i.e. `[start, end, start, end, ...]`.
+
+    """
+    boundaries: list = []
+    for codepoint in sorted(codepoints):
+        if boundaries and boundaries[-1] == codepoint:
+            boundaries[-1] = codepoint + 1
+        else:
+            boundaries.extend((codepoint, codepoint + 1))
+
+    return boundaries
+
+
+def font_coverage(font: dict):
+    """
+    Get the coverage of a font, reading it from the font file the first time if it is not in the font index.
+
+    Parameters
+    ----------
+    font : dict
+        The font, see `FontFinder.fonts`.
+
+    Returns
+    -------
+    list | None
+        The coverage, see `coverage_ranges`, or None if the font file can not be read.
+
+    """
+    if "coverage" not in font:
+        try:
+            font["coverage"] = FontFinder.coverage_by_file(font["file_path"])
+        except Exception:
+            font["coverage"] = None
+
+    return font["coverage"]
+
+
+def uncovered_codepoints(coverage: list, codepoints) -> set:
+    """
+    Find the code points outside of a coverage.
+
+    Parameters
+    ----------
+    coverage : list
+        The coverage, see `coverage_ranges`.
+    codepoints : Iterable[int]
+        The code points to check.
+
+    Returns
+    -------
+    set
+        The code points which are not covered.
+
+    """
+    # A code point is covered if it is after an odd amount of boundaries, i.e. after the start of a range
+    return {
+        codepoint
+        for codepoint in codepoints
+        if bisect.bisect_right(coverage, codepoint) % 2 == 0
+    }
+
+
 class FontFinder:
     """
     The FontFinder; finding unique fonts on the current platform.
@@ -20,7 +96,13 @@ class FontFinder:
 
     lang_ids = [0, 1033, 1041]
 
-    def __init__(self, exclude_extension: list = [".ttc"], rebuild: bool = False):
+    def __init__(
+        self,
+        exclude_extension: list = [".ttc"],
+        rebuild: bool = False,
+        index_path: Path | None = None,
+        with_coverage: bool = False,
+    ):
         """
         Constructor.
 
@@ -30,6 +112,11 @@ class FontFinder:
             Extension to exclude for getting font info. The default is ['.ttc'].
         rebuild : bool, optional
             Rebuilding font cache. The default is False.
+        index_path : Path | None, optional
+            The font index to memory-map instead of finding the fonts, see `mkvrestyle.fontindex`. The default is None.
+        with_coverage : bool, optional
+            Read the coverage of every font, e.g. to build a font index; otherwise it is read when needed, see
+            `font_coverage`. The default is False.
 
         Returns
         -------
@@ -37,10 +124,27 @@ class FontFinder:
 
         """
         self.excl = exclude_extension
+        self.with_coverage = with_coverage
+        if index_path is not None:
+            self.fonts: list | FontIndex = FontIndex(index_path)
+            return
+
         if rebuild:
             self._rebuild_font_cache()
         self.fonts = self._get_available_fonts()
 
+    def close(self) -> None:
+        """
+        Release the font index, if the fonts are read from one.
+
+        Returns
+        -------
+        None.
+
+        """
+        if isinstance(self.fonts, FontIndex):
+            self.fonts.close()
+
     def check_font_installed(self, user_font: str, dict_key: str = "name") -> list:
         """
         Check if the user defined font is installed.
@@ -107,7 +211,7 @@ class FontFinder:
         -------
         list
             Contains font entries as dictionaries with keys 'file_path', 'file_name',
-            'font_name', 'font_family', 'font_style.
+            'font_name', 'font_family', 'font_style' and, if `with_coverage`, 'coverage'.
 
         """
         initial_fonts = []
@@ -122,7 +226,7 @@ class FontFinder:
             initial_fonts.append(
                 {
                     **{"file_path": file_path, "file_name": file_name},
-                    **self.font_info_by_file(file_path),
+                    **self.font_info_by_file(file_path, self.with_coverage),
                 }
             )
 
@@ -131,7 +235,8 @@ class FontFinder:
 
         return self.fonts
 
-    def font_info_by_file(self, file_path: Path) -> dict:
+    @classmethod
+    def font_info_by_file(cls, file_path: Path, with_coverage: bool = False) -> dict:
         """
         Get font info by file.
 
@@ -139,25 +244,24 @@ class FontFinder:
         ----------
         file_path : pt
             The font file specified as Path object.
+        with_coverage : bool, optional
+            Also read the code points with a glyph, which is considerably slower. The default is False.
 
         Returns
         -------
         dict
-            Contains keys 'font_name', 'font_family' and 'font_style' for the specified font file.
+            Contains keys 'font_name', 'font_family', 'font_style' and, if `with_coverage`, 'coverage' (the code
+            points with a glyph, see `coverage_ranges`) for the specified font file.
 
         """
 
-        try:
-            font = TTFont(str(file_path), fontNumber=-1, ignoreDecompileErrors=True)
-        except Exception:
-            font = TTFont(str(file_path), fontNumber=0, ignoreDecompileErrors=True)
-
+        font = cls._open_font(file_path)
         with redirect_stderr(None):
             names = font["name"].names
 
         details = {}
         for name in names:
-            if name.langID in self.lang_ids:
+            if name.langID in cls.lang_ids:
                 try:
                     details[name.nameID] = name.toUnicode()
                 except UnicodeDecodeError:
@@ -165,14 +269,51 @@ class FontFinder:
                 continue
 
         if details:
-            return {
+            font_info = {
                 "font_name": details[4],
                 "font_family": details[1],
                 "font_style": details[2],
             }
+            if with_coverage:
+                font_info["coverage"] = cls.coverage_by_file(file_path, font)
+
+            return font_info
 
         return details
 
+    @staticmethod
+    def _open_font(file_path: Path) -> TTFont:
+        try:
+            return TTFont(str(file_path), fontNumber=-1, ignoreDecompileErrors=True)
+        except Exception:
+            return TTFont(str(file_path), fontNumber=0, ignoreDecompileErrors=True)
+
+    @classmethod
+    def coverage_by_file(cls, file_path: Path, font: TTFont | None = None) -> list:
+        """
+        Get the code points with a glyph of a font file.
+
+        Parameters
+        ----------
+        file_path : Path
+            The font file.
+        font : TTFont | None, optional
+            The opened font file. The default is None, which opens it.
+
+        Returns
+        -------
+        list
+            The coverage, see `coverage_ranges`.
+
+        """
+        if font is None:
+            font = cls._open_font(file_path)
+
+        with redirect_stderr(None):
+            cmap = font.getBestCmap() if "cmap" in font else None
+
+        return coverage_ranges(cmap or {})
+
     @staticmethod
     def _fonts_on_system() -> list:
         """
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+
+from mkvrestyle.helper import atomic_write
+
+FONT_STORE_FOLDER_NAME = ".mkvrestyle-fonts"
+
+# ioctl request to share the data blocks of a file on copy-on-write filesystems, e.g. Btrfs and XFS (see ioctl_ficlone)
+FICLONE = 0x40049409
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def clone_file(source: Path, destination: Path) -> None:
+    """
+    Copy a file by reflink if the filesystem supports it, otherwise with `copy_file_range` or a regular copy.
+
+    Parameters:
+        source (Path): The file to copy.
+        destination (Path): The path of the copy.
+
+    Returns:
+        None
+    """
+
+    with open(source, mode="rb") as source_file, open(
+        destination, mode="wb"
+    ) as destination_file:
+        try:
+            import fcntl
+
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+            return
+        except (ImportError, OSError):
+            pass
+
+        try:
+            remaining = os.fstat(source_file.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(
+                    source_file.fileno(), destination_file.fileno(), remaining
+                )
+                if copied == 0:
+                    break
+                remaining -= copied
+
+            if remaining == 0:
+                return
+        except (AttributeError, OSError):
+            pass
+
+        source_file.seek(0)
+        destination_file.seek(0)
+        destination_file.truncate()
+        shutil.copyfileobj(source_file, destination_file)
+
+
+def link_or_clone_file(source: Path, destination: Path) -> bool:
+    """
+    Hardlink a file, or copy it with `clone_file` if hardlinking is not possible (e.g. across filesystems).
+
+    Parameters:
+        source (Path): The file to link.
+        destination (Path): The path of the link.
+
+    Returns:
+        bool: Whether the file was hardlinked, or copied.
+    """
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        clone_file(source, destination)
+        return False
+
+    return True
+
+
+def publish_file(source: Path, destination: Path) -> None:
+    """
+    Copy a file to its destination atomically, by copying it to a temporary file next to it and renaming it.
+
+    Parameters:
+        source (Path): The file to publish.
+        destination (Path): The final path.
+
+    Returns:
+        None
+    """
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(destination) as temporary_path:
+        clone_file(source, temporary_path)
+
+
+class FontStore:
+    """
+    Content-addressed store of font files (hash → file) for an output directory.
+
+    Every unique font is copied into the store once, and attachments are materialized from the store by hardlink,
+    falling back to reflink, `copy_file_range` or a regular copy. Attachments which already hold the same content are
+    left as-is.
+
+    Attributes:
+        folder (Path): The store directory.
+        stats (Counter): The fonts found in the store (`hits`) or added to it (`misses`), and the bytes copied.
+    """
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.stats: Counter = Counter(hits=0, misses=0, copied_bytes=0)
+        self._digests: dict = {}
+
+    def digest(self, file_path: Path) -> str:
+        """
+        Get the SHA-256 hash of a file, memoized by path, size, modification time and inode.
+
+        Parameters:
+            file_path (Path): The path to the file.
+
+        Returns:
+            str: The hash.
+        """
+
+        stat = os.stat(file_path)
+        key = (str(file_path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        digest = self._digests.get(key)
+        if digest is None:
+            file_hash = hashlib.sha256()
+            with open(file_path, mode="rb") as file:
+                while chunk := file.read(HASH_CHUNK_SIZE):
+                    file_hash.update(chunk)
+            digest = self._digests[key] = file_hash.hexdigest()
+
+        return digest
+
+    def add(self, file_path: Path) -> Path:
+        """
+        Add a font file to the store, unless the store already holds the same content.
+
+        Parameters:
+            file_path (Path): The path to the font file.
+
+        Returns:
+            Path: The path of the font in the store.
+        """
+
+        store_path = self.folder.joinpath(
+            f"{self.digest(file_path)}{file_path.suffix.lower()}"
+        )
+        if store_path.is_file():
+            self.stats["hits"] += 1
+            return store_path
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with atomic_write(store_path) as temporary_path:
+            clone_file(file_path, temporary_path)
+        self.stats["misses"] += 1
+        self.stats["copied_bytes"] += store_path.stat().st_size
+
+        return store_path
+
+    def materialize(self, file_path: Path, destination: Path) -> None:
+        """
+        Put a font file at the destination, from the store.
+
+        Parameters:
+            file_path (Path): The path to the font file.
+            destination (Path): The path of the attachment.
+
+        Returns:
+            None
+        """
+
+        self.link(self.add(file_path), destination)
+
+    def link(self, store_path: Path, destination: Path) -> None:
+        """
+        Link a file in the store to the destination, unless the destination already holds the same content.
+
+        Parameters:
+            store_path (Path): The path of the file in the store.
+            destination (Path): The path of the attachment.
+
+        Returns:
+            None
+        """
+
+        if destination.is_file() and (
+            os.path.samefile(store_path, destination)
+            or (
+                destination.stat().st_size == store_path.stat().st_size
+                and self.digest(destination) == self.digest(store_path)
+            )
+        ):
+            return
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(destination) as temporary_path:
+            if not link_or_clone_file(store_path, temporary_path):
+                self.stats["copied_bytes"] += store_path.stat().st_size
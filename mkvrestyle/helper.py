@@ -1,73 +1,97 @@
 import collections
-import fnmatch
+import contextlib
+import importlib.metadata
 import json
+import os
 import re
+import shutil
+import stat
+import tempfile
 from pathlib import Path
+from typing import Iterator
 
-from mkvrestyle.exception import SubtitleCodecError
+from mkvrestyle.exception import ScratchFolderError, SubtitleCodecError
 
+# Memory-backed scratch location, used by default if it has enough free space
+SCRATCH_TMPFS_PATH = Path("/dev/shm")
+SCRATCH_TMPFS_MIN_FREE_SPACE = 1024 * 1024 * 1024
+SCRATCH_FOLDER_NAME = "mkvrestyle"
+CACHE_FOLDER_NAME = "mkvrestyle"
 
-def files_in_dir(path: Path, file_types=["*.mkv"]):
+
+def iterate_files_in_dir(
+    path: Path, file_extensions=frozenset([".mkv"]), excluded_folders=frozenset()
+) -> Iterator[Path]:
     """
-    Returns a list of files in the given directory that match the specified file types.
+    Lazily yields the files in the given directory (recursively) that have one of the specified file extensions.
+
+    Directories are scanned one at a time, so files are yielded as they are found while memory use is bounded by the
+    largest directory instead of the whole tree.
 
     Parameters:
         path (Path): The path to the directory.
-        file_types (List[str], optional): A list of file types to match. Defaults to ["*.mkv"].
+        file_extensions (frozenset[str], optional): The lowercase file extensions to match. Defaults to {".mkv"}.
+        excluded_folders (Collection[Path], optional): The subdirectories to skip, e.g. output directories inside the
+        input directory. It is checked when a directory is reached, so it can be extended while iterating. Defaults to
+        none.
 
     Returns:
-        List[Path]: A list of paths to the files in the directory that match the specified file types.
+        Iterator[Path]: The paths to the files in the directory that have one of the specified file extensions.
     """
 
-    file_list = [
-        f
-        for f in path.rglob("*")
-        if any(
-            fnmatch.fnmatch(f.name.lower(), pattern.lower()) for pattern in file_types
-        )
-    ]
+    directories = [str(path)]
+    while directories:
+        directory = directories.pop()
+        if directory != str(path) and Path(directory) in excluded_folders:
+            continue
 
-    return file_list
+        # Read the directory entries up front, so files renamed while processing are not yielded twice
+        with os.scandir(directory) as scandir_iterator:
+            entries = list(scandir_iterator)
 
+        subdirectories = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif (
+                os.path.splitext(entry.name)[1].lower() in file_extensions
+                and entry.is_file()
+            ):
+                yield Path(entry.path)
 
-def read_json(path: Path) -> dict:
+        directories.extend(reversed(subdirectories))
+
+
+def files_in_dir(path: Path, file_extensions=frozenset([".mkv"])) -> list[Path]:
     """
-    Reads a JSON file from the given path and returns its contents as a dictionary.
+    Returns a list of files in the given directory (recursively) that have one of the specified file extensions.
 
     Parameters:
-        path (Path): The path to the JSON file.
+        path (Path): The path to the directory.
+        file_extensions (frozenset[str], optional): The lowercase file extensions to match. Defaults to {".mkv"}.
 
     Returns:
-        dict: The contents of the JSON file as a dictionary.
+        List[Path]: A list of paths to the files in the directory that have one of the specified file extensions.
     """
 
-    with path.open("r") as file:
-        data = json.load(file)
-
-    return data
+    return list(iterate_files_in_dir(path, file_extensions))
 
 
-def read_file(
-    input_file: str, split_lines: bool = True, custom_encoding: str = "latin-1"
-) -> dict:
+def read_json(path: Path) -> dict:
     """
-    Read a file and return its content as a list.
+    Reads a JSON file from the given path and returns its contents as a dictionary.
 
     Parameters:
-        input_file (str): The path to the file to read.
-        split_lines (bool, optional): Whether to split the content into lines. Defaults to True.
-        custom_encoding (str, optional): The encoding to use. Defaults to "latin-1".
+        path (Path): The path to the JSON file.
 
     Returns:
-        list: The content of the file as a list.
+        dict: The contents of the JSON file as a dictionary.
     """
 
-    input_file_read = open(str(input_file), mode="r", encoding=custom_encoding).read()
-
-    if split_lines:
-        return {"content": input_file_read.splitlines(), "encoding": custom_encoding}
+    with path.open("r") as file:
+        data = json.load(file)
 
-    return {"content": input_file_read, "encoding": custom_encoding}
+    return data
 
 
 def find_in_dict(input_list: list, key: str, value: str):
@@ -129,6 +153,9 @@ def replace_conflicting_characters_in_filename(file_path: Path) -> Path:
     """
 
     new_filename = re.sub(r"[\"']", "", file_path.name)
+    if new_filename == file_path.name:
+        return file_path
+
     new_file_path = file_path.with_name(new_filename)
     file_path.rename(new_file_path)
 
@@ -172,3 +199,105 @@ def get_subtitle_extension_from_codec_id(codec_id: str) -> str:
             return "usf"
         case _:
             raise SubtitleCodecError(codec_id)
+
+
+def get_tool_version() -> str:
+    """
+    Get the installed version of the tool.
+
+    Returns:
+        str: The version, or "unknown" if the package is not installed.
+    """
+
+    try:
+        return importlib.metadata.version("mkvrestyle")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def get_scratch_folder(scratch_path: Path | None = None) -> Path:
+    """
+    Get the scratch directory for intermediate files, creating it if needed.
+
+    The scratch directory is private to the current user, as the scratch location is usually world-writable; it has
+    the same path in every run, so an interrupted run can be resumed.
+
+    Parameters:
+        scratch_path (Path | None, optional): The scratch location. The default is None, which uses tmpfs if it has
+        enough free space, or otherwise the temporary directory of the system.
+
+    Returns:
+        Path: The scratch directory.
+
+    Raises:
+        ScratchFolderError: If the scratch directory is not a directory, a symbolic link, or owned by another user.
+    """
+
+    if scratch_path is None:
+        scratch_path = Path(tempfile.gettempdir())
+        if (
+            SCRATCH_TMPFS_PATH.is_dir()
+            and os.access(SCRATCH_TMPFS_PATH, os.W_OK)
+            and shutil.disk_usage(SCRATCH_TMPFS_PATH).free
+            >= SCRATCH_TMPFS_MIN_FREE_SPACE
+        ):
+            scratch_path = SCRATCH_TMPFS_PATH
+
+    scratch_folder = scratch_path.joinpath(f"{SCRATCH_FOLDER_NAME}-{os.getuid()}")
+    scratch_path.mkdir(parents=True, exist_ok=True)
+    with contextlib.suppress(FileExistsError):
+        scratch_folder.mkdir(mode=0o700)
+
+    # Created beforehand by another user, or replaced by a symbolic link
+    folder_stat = os.lstat(scratch_folder)
+    if stat.S_ISLNK(folder_stat.st_mode):
+        raise ScratchFolderError(scratch_folder, "a symbolic link")
+    if not stat.S_ISDIR(folder_stat.st_mode):
+        raise ScratchFolderError(scratch_folder, "not a directory")
+    if folder_stat.st_uid != os.getuid():
+        raise ScratchFolderError(scratch_folder, "owned by another user")
+    if stat.S_IMODE(folder_stat.st_mode) != 0o700:
+        scratch_folder.chmod(0o700)
+
+    return scratch_folder
+
+
+def get_cache_folder() -> Path:
+    """
+    Get the directory for caches which persist between runs.
+
+    Returns:
+        Path: The directory in `$XDG_CACHE_HOME`, or `~/.cache` if it is not set.
+    """
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return Path(cache_home).joinpath(CACHE_FOLDER_NAME)
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path) -> Iterator[Path]:
+    """
+    Write a file atomically, by writing a temporary file next to it and renaming it when complete.
+
+    The temporary file is hidden and unique per process, and it is removed if writing fails, so the final path never
+    holds a partially written file.
+
+    Parameters:
+        path (Path): The final path.
+
+    Returns:
+        Iterator[Path]: The path of the temporary file to write to.
+    """
+
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary_path.unlink(missing_ok=True)
+    try:
+        yield temporary_path
+        os.replace(temporary_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            temporary_path.unlink()
+        raise
@@ -0,0 +1,152 @@
+import json
+import os
+from pathlib import Path
+from typing import TextIO
+
+JOURNAL_FILE_NAME = ".mkvrestyle-journal.jsonl"
+
+STAGE_EXTRACTED = "extracted"
+STAGE_RESUMED = "resumed"
+STAGE_RESTYLED = "restyled"
+STAGE_COMPLETED = "completed"
+
+
+class Journal:
+    """
+    Append-only record of the stage each input file reached, used to resume an interrupted run.
+
+    Every record is flushed and fsync'd before processing continues, so the journal survives a crash at any point. The
+    journal is removed once the run completed and the manifest has been written.
+
+    Attributes:
+        path (Path): The path to the journal file.
+        states (dict): The state per input file path, see `state`.
+    """
+
+    def __init__(self, output_folder: Path):
+        self.path = output_folder.joinpath(JOURNAL_FILE_NAME)
+        self.states: dict = {}
+        self._file: TextIO | None = None
+
+        if self.path.is_file():
+            self._load()
+
+    def _load(self) -> None:
+        with self.path.open("rb") as file:
+            lines = file.read().splitlines(keepends=True)
+
+        # Incomplete last record of a crashed run; removed, so the next record is not appended to it
+        if lines and not lines[-1].endswith(b"\n"):
+            torn_line = lines.pop()
+            with self.path.open("r+b") as file:
+                file.truncate(file.seek(0, os.SEEK_END) - len(torn_line))
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+
+            state = self.states.get(record["input"])
+            if (
+                state is None
+                or state["fingerprint"] != record["fingerprint"]
+                or state["options"] != record["options"]
+            ):
+                state = {
+                    "fingerprint": record["fingerprint"],
+                    "options": record["options"],
+                    "stage": None,
+                    "extracted": None,
+                    "restyled": [],
+                    "outputs": [],
+                }
+                self.states[record["input"]] = state
+
+            state["stage"] = record["stage"]
+            if record["stage"] == STAGE_EXTRACTED:
+                state["extracted"] = record["data"]
+                state["restyled"] = []
+            elif record["stage"] == STAGE_RESTYLED:
+                state["restyled"].append(record["data"]["track"])
+            elif record["stage"] == STAGE_COMPLETED:
+                state["outputs"] = record["data"]["outputs"]
+
+    def state(self, input_file: Path, fingerprint: dict, digest: str) -> dict | None:
+        """
+        Get the journaled state of an input file from a previous run.
+
+        Parameters:
+            input_file (Path): The input file.
+            fingerprint (dict): The current fingerprint of the input file.
+            digest (str): The current options hash.
+
+        Returns:
+            dict | None: The last `stage`, the `extracted` data, the `restyled` tracks and the `outputs` (if completed),
+            or None if the input was not journaled with the same fingerprint and options.
+        """
+
+        state = self.states.get(str(input_file))
+        if (
+            state is None
+            or state["fingerprint"] != fingerprint
+            or state["options"] != digest
+        ):
+            return None
+
+        return state
+
+    def append(
+        self,
+        input_file: Path,
+        fingerprint: dict,
+        digest: str,
+        stage: str,
+        data: dict | None = None,
+    ) -> None:
+        """
+        Durably record the stage an input file reached.
+
+        Parameters:
+            input_file (Path): The input file.
+            fingerprint (dict): The fingerprint of the input file.
+            digest (str): The options hash.
+            stage (str): The stage, e.g. `extracted`, `restyled` or `completed`.
+            data (dict | None, optional): The data needed to resume from this stage. The default is None.
+
+        Returns:
+            None
+        """
+
+        file = self._file
+        if file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            file = self._file = self.path.open("a")
+
+        record = {
+            "input": str(input_file),
+            "fingerprint": fingerprint,
+            "options": digest,
+            "stage": stage,
+            "data": data or {},
+        }
+        file.write(json.dumps(record) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def clear(self) -> None:
+        """
+        Remove the journal, e.g. after the run completed and the manifest has been written.
+
+        Returns:
+            None
+        """
+
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.states = {}
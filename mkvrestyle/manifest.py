@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from mkvrestyle.helper import atomic_write
+
+MANIFEST_FILE_NAME = ".mkvrestyle-manifest.json"
+MANIFEST_VERSION = 1
+
+# Amount of bytes hashed at the start, middle and end of an input file for the fast hash
+SAMPLE_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sample_hash(file_path: Path, size: int) -> str:
+    """
+    Fast hash of a file, based on its size and samples at the start, middle and end of the file.
+
+    Parameters:
+        file_path (Path): The path to the file.
+        size (int): The size of the file.
+
+    Returns:
+        str: The BLAKE2b hash.
+    """
+
+    digest = hashlib.blake2b(str(size).encode("ascii"), digest_size=16)
+    with open(file_path, mode="rb") as file:
+        for offset in sorted(
+            {
+                0,
+                max(0, size // 2 - SAMPLE_HASH_CHUNK_SIZE // 2),
+                max(0, size - SAMPLE_HASH_CHUNK_SIZE),
+            }
+        ):
+            file.seek(offset)
+            digest.update(file.read(SAMPLE_HASH_CHUNK_SIZE))
+
+    return digest.hexdigest()
+
+
+def fingerprint_file(file_path: Path, with_hash: bool = False) -> dict:
+    """
+    Fingerprint of an input file, used to detect changes between runs.
+
+    Parameters:
+        file_path (Path): The path to the file.
+        with_hash (bool, optional): Whether to include a fast hash of the file content. The default is False.
+
+    Returns:
+        dict: The size, modification time, inode and (optionally) hash of the file.
+    """
+
+    stat = os.stat(file_path)
+    fingerprint: dict = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "inode": stat.st_ino,
+    }
+    if with_hash:
+        fingerprint["hash"] = sample_hash(file_path, stat.st_size)
+
+    return fingerprint
+
+
+def options_digest(*options) -> str:
+    """
+    Hash of the options which affect the output for an input file, e.g. the preset hashes and stream selection.
+
+    Parameters:
+        *options: JSON-serializable options.
+
+    Returns:
+        str: The SHA-256 hash.
+    """
+
+    return hashlib.sha256(
+        json.dumps(options, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class Manifest:
+    """
+    Record of the processed input files in an output directory, used to skip inputs whose outputs are up to date.
+
+    Attributes:
+        path (Path): The path to the manifest file.
+        tool_version (str): The current version of the tool.
+        entries (dict): The entries per input file path.
+    """
+
+    def __init__(self, output_folder: Path, tool_version: str):
+        self.path = output_folder.joinpath(MANIFEST_FILE_NAME)
+        self.tool_version = tool_version
+        self.entries: dict = {}
+        self._changed = False
+
+        if self.path.is_file():
+            try:
+                with self.path.open("r") as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError):
+                manifest = {}
+
+            if manifest.get("version") == MANIFEST_VERSION:
+                self.entries = manifest.get("entries", {})
+
+    def is_up_to_date(self, input_file: Path, fingerprint: dict, digest: str) -> bool:
+        """
+        Check if the outputs of an input file are up to date.
+
+        Parameters:
+            input_file (Path): The input file.
+            fingerprint (dict): The current fingerprint of the input file.
+            digest (str): The current options hash.
+
+        Returns:
+            bool: Whether the fingerprint, options and tool version match, and all recorded outputs still exist.
+        """
+
+        entry = self.entries.get(str(input_file))
+        if entry is None:
+            return False
+
+        return (
+            entry.get("fingerprint") == fingerprint
+            and entry.get("options") == digest
+            and entry.get("tool_version") == self.tool_version
+            and all(Path(output).exists() for output in entry.get("outputs", []))
+        )
+
+    def record(
+        self, input_file: Path, fingerprint: dict, digest: str, outputs: list
+    ) -> None:
+        """
+        Record a processed input file; an input file without outputs is not recorded, so it is processed again.
+
+        Parameters:
+            input_file (Path): The input file.
+            fingerprint (dict): The fingerprint of the input file.
+            digest (str): The options hash.
+            outputs (list): The paths of the written outputs.
+
+        Returns:
+            None
+        """
+
+        if not outputs:
+            return
+
+        self.entries[str(input_file)] = {
+            "fingerprint": fingerprint,
+            "options": digest,
+            "tool_version": self.tool_version,
+            "outputs": [str(output) for output in outputs],
+        }
+        self._changed = True
+
+    def save(self) -> None:
+        """
+        Write the manifest atomically, if it changed.
+
+        Returns:
+            None
+        """
+
+        if not self._changed:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as temporary_path:
+            with temporary_path.open("w") as file:
+                json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, file)
+        self._changed = False
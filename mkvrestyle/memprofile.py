@@ -0,0 +1,235 @@
+import json
+import resource
+import tracemalloc
+from pathlib import Path
+
+from loguru import logger  # noqa
+
+from mkvrestyle import profiling
+from mkvrestyle.helper import atomic_write
+from mkvrestyle.profiling import Recorder
+
+PROC_STATUS_PATH = "/proc/self/status"
+PROC_CLEAR_REFS_PATH = "/proc/self/clear_refs"
+
+# Written to `clear_refs` to reset the peak RSS (`VmHWM`) to the current RSS
+CLEAR_REFS_RESET_PEAK_RSS = "5"
+
+MEMORY_TOP_SITES = 5
+
+# Allocations of the profilers themselves are not reported
+MEMORY_IGNORED_FILES = (tracemalloc.__file__, __file__, profiling.__file__)
+
+
+def peak_rss() -> int:
+    """
+    Get the peak resident set size of this process since it was last reset, see `reset_peak_rss`.
+
+    Returns:
+        int: The peak RSS in bytes.
+    """
+
+    try:
+        with open(PROC_STATUS_PATH, mode="r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    # Kilobytes on Linux; never reset
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak resident set size of this process to its current RSS.
+
+    Returns:
+        bool: Whether the peak RSS could be reset (Linux 4.0+).
+    """
+
+    try:
+        with open(PROC_CLEAR_REFS_PATH, mode="w") as file:
+            file.write(CLEAR_REFS_RESET_PEAK_RSS)
+    except OSError:
+        return False
+
+    return True
+
+
+def allocation_sizes() -> dict:
+    """
+    Get the size of the traced memory blocks per allocation site (file and line).
+
+    Returns:
+        dict: The size in bytes per allocation site.
+    """
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, filename) for filename in MEMORY_IGNORED_FILES]
+    )
+
+    # Built in this module, so the sizes kept by the profiler are not traced as allocations of the stages
+    return {
+        f"{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}": statistic.size
+        for statistic in snapshot.statistics("lineno")
+    }
+
+
+def retained_sizes(sizes_end: dict, sizes_start: dict) -> dict:
+    return {
+        site: size - sizes_start.get(site, 0)
+        for site, size in sizes_end.items()
+        if size > sizes_start.get(site, 0)
+    }
+
+
+def top_allocations(sizes: dict, amount: int = MEMORY_TOP_SITES) -> list:
+    return [
+        {"site": site, "size": size}
+        for site, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True)[
+            :amount
+        ]
+    ]
+
+
+class MemoryProfiler(Recorder):
+    """
+    Records the peak RSS, the peak traced Python memory and the top allocation sites per span and per input file.
+
+    The peaks of a span include its nested spans. The allocation sites are the sites of the memory which was allocated
+    during a span and still held at its end. Tracing Python allocations slows down the run considerably.
+
+    Attributes:
+        stages (dict): The count, peak RSS, peak traced memory and retained bytes per allocation site per span name.
+        files (list): The peak RSS, peak traced memory and top allocation sites per input file.
+        rss_resettable (bool): Whether the peak RSS is measured per span, or is the peak RSS of the run so far.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict = {}
+        self.files: list = []
+        tracemalloc.start()
+        self.rss_resettable = reset_peak_rss()
+        self._frames = [self._frame()]
+
+    @staticmethod
+    def _frame() -> dict:
+        return {"rss": 0, "traced": 0, "sizes": None, "traced_start": 0}
+
+    def _fold_peaks(self, rss: int, traced: int) -> None:
+        frame = self._frames[-1]
+        frame["rss"] = max(frame["rss"], rss)
+        frame["traced"] = max(frame["traced"], traced)
+
+    def _reset_peaks(self) -> None:
+        if self.rss_resettable:
+            reset_peak_rss()
+        tracemalloc.reset_peak()
+
+    def start(self, name: str, category: str) -> None:
+        # The peaks so far belong to the parent span
+        self._fold_peaks(peak_rss(), tracemalloc.get_traced_memory()[1])
+
+        frame = self._frame()
+        frame["sizes"] = allocation_sizes()
+        self._reset_peaks()
+        frame["traced_start"] = tracemalloc.get_traced_memory()[0]
+        self._frames.append(frame)
+
+    def add(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        end: int,
+        cpu: float,
+        read: int,
+        written: int,
+        args: dict,
+    ) -> None:
+        self._fold_peaks(peak_rss(), tracemalloc.get_traced_memory()[1])
+        frame = self._frames.pop()
+        sizes = retained_sizes(allocation_sizes(), frame["sizes"])
+        self._reset_peaks()
+
+        # The peaks of a span are also peaks of its parent
+        self._fold_peaks(frame["rss"], frame["traced"])
+
+        peak_traced = frame["traced"] - frame["traced_start"]
+        stage = self.stages.setdefault(
+            name,
+            {"count": 0, "peak_rss": 0, "peak_traced": 0, "sizes": {}},
+        )
+        stage["count"] += 1
+        stage["peak_rss"] = max(stage["peak_rss"], frame["rss"])
+        stage["peak_traced"] = max(stage["peak_traced"], peak_traced)
+        stage["sizes"] = {
+            site: stage["sizes"].get(site, 0) + sizes.get(site, 0)
+            for site in stage["sizes"].keys() | sizes.keys()
+        }
+
+        if name == "file":
+            self.files.append(
+                {
+                    "input": str(args.get("input")),
+                    "peak_rss": frame["rss"],
+                    "peak_traced": peak_traced,
+                    "top_allocations": top_allocations(sizes),
+                }
+            )
+            logger.info(
+                f"Peak memory of `{args.get('input')}`: {frame['rss'] / 1024 ** 2:.1f} MiB RSS, "
+                f"{peak_traced / 1024 ** 2:.1f} MiB traced."
+            )
+
+    def summary(self) -> dict:
+        """
+        Get the peaks of the run, per span name (largest peak RSS first) and per input file.
+
+        Returns:
+            dict: The peak RSS of the run and its subprocesses, and the peaks and top allocation sites per span name
+            and per input file.
+        """
+
+        # Kilobytes on Linux
+        run_usage = resource.getrusage(resource.RUSAGE_SELF)
+        subprocess_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        return {
+            "peak_rss": run_usage.ru_maxrss * 1024,
+            "subprocess_peak_rss": subprocess_usage.ru_maxrss * 1024,
+            "rss_per_stage": self.rss_resettable,
+            "stages": [
+                {
+                    "name": name,
+                    "count": stage["count"],
+                    "peak_rss": stage["peak_rss"],
+                    "peak_traced": stage["peak_traced"],
+                    "top_allocations": top_allocations(stage["sizes"]),
+                }
+                for name, stage in sorted(
+                    self.stages.items(),
+                    key=lambda item: item[1]["peak_rss"],
+                    reverse=True,
+                )
+            ],
+            "files": self.files,
+        }
+
+    def write(self, output_file: Path) -> None:
+        """
+        Write the summary as JSON, atomically.
+
+        Parameters:
+            output_file (Path): The path to the report file.
+
+        Returns:
+            None
+        """
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(output_file) as temporary_path:
+            with temporary_path.open("w") as file:
+                json.dump(self.summary(), file, indent=4)
@@ -0,0 +1,274 @@
+import time
+from pathlib import Path
+
+from mkvrestyle.fontstore import FontStore
+from mkvrestyle.helper import atomic_write
+from mkvrestyle.profiling import Recorder
+from mkvrestyle.report import FailureReport
+
+METRICS_PREFIX = "mkvrestyle"
+
+# Histogram buckets in seconds, from a single parse up to a remux of a large file
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+
+    return (
+        "{"
+        + ",".join(
+            f'{key}="{escape_label_value(str(value))}"' for key, value in labels.items()
+        )
+        + "}"
+    )
+
+
+def format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Cumulative histogram of durations, per label set.
+
+    Attributes:
+        buckets (tuple): The upper bounds of the buckets, in seconds.
+        series (dict): The bucket counts, sum and count per label set.
+    """
+
+    def __init__(self, buckets: tuple = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.series: dict = {}
+
+    def observe(self, label_value: str, value: float) -> None:
+        series = self.series.setdefault(
+            label_value, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        )
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["buckets"][index] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def samples(self, label_name: str) -> list:
+        """
+        Get the samples of the buckets, sum and count per label set, without the metric name.
+
+        Parameters:
+            label_name (str): The name of the label, e.g. `stage`.
+
+        Returns:
+            list: The samples.
+        """
+
+        samples = []
+        for label_value, series in sorted(self.series.items()):
+            labels = {label_name: label_value}
+            for bound, count in zip(self.buckets, series["buckets"]):
+                samples.append(
+                    f"_bucket{format_labels({**labels, 'le': format_value(bound)})} {count}"
+                )
+            samples.append(
+                f"_bucket{format_labels({**labels, 'le': '+Inf'})} {series['count']}"
+            )
+            samples.append(f"_sum{format_labels(labels)} {format_value(series['sum'])}")
+            samples.append(f"_count{format_labels(labels)} {series['count']}")
+
+        return samples
+
+
+class Metrics(Recorder):
+    """
+    Counters and histograms of a run, written in the Prometheus text format, e.g. for the textfile collector of the
+    node exporter.
+
+    The stage and process durations are recorded from the spans (see `mkvrestyle.profiling.span`), the file outcomes
+    from the failure report and the font cache usage from the font stores.
+
+    Attributes:
+        path (Path): The path to the metrics file.
+        interval (float): The minimum amount of seconds between writes during the run.
+        version (str): The mkvrestyle version, exported as label of `mkvrestyle_info`.
+        report (FailureReport): The processed, skipped and failed files.
+        font_stores (list): The font stores of the batches.
+    """
+
+    def __init__(
+        self, path: Path, interval: float, version: str, report: FailureReport
+    ):
+        self.path = path
+        self.interval = interval
+        self.version = version
+        self.report = report
+        self.font_stores: list = []
+        self._stage_durations = Histogram()
+        self._process_durations = Histogram()
+        self._extracted_bytes = 0
+        self._started = time.time()
+        self._written = time.monotonic()
+
+    def add(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        end: int,
+        cpu: float,
+        read: int,
+        written: int,
+        args: dict,
+    ) -> None:
+        duration = (end - start) / 1e9
+        if category == "process":
+            tool = args.get("tool", name)
+            self._process_durations.observe(tool, duration)
+            if tool == "mkvextract":
+                self._extracted_bytes += written
+        else:
+            self._stage_durations.observe(name, duration)
+
+    def add_font_store(self, font_store: FontStore) -> None:
+        self.font_stores.append(font_store)
+
+    def render(self) -> str:
+        """
+        Get the metrics in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+
+        font_hits = sum(font_store.stats["hits"] for font_store in self.font_stores)
+        font_misses = sum(font_store.stats["misses"] for font_store in self.font_stores)
+        copied_bytes = sum(
+            font_store.stats["copied_bytes"] for font_store in self.font_stores
+        )
+
+        metrics = [
+            (
+                "info",
+                "gauge",
+                "The mkvrestyle version.",
+                [f"{format_labels({'version': self.version})} 1"],
+            ),
+            (
+                "run_start_timestamp_seconds",
+                "gauge",
+                "Start time of the run.",
+                [f" {format_value(self._started)}"],
+            ),
+            (
+                "last_update_timestamp_seconds",
+                "gauge",
+                "Time the metrics were written.",
+                [f" {format_value(time.time())}"],
+            ),
+            (
+                "files_total",
+                "counter",
+                "Input files by outcome.",
+                [
+                    f"{format_labels({'outcome': 'processed'})} {self.report.processed}",
+                    f"{format_labels({'outcome': 'skipped'})} {self.report.skipped}",
+                    f"{format_labels({'outcome': 'no_subtitles'})} {self.report.no_subtitles}",
+                    f"{format_labels({'outcome': 'failed'})} {len(self.report.failures)}",
+                ],
+            ),
+            (
+                "stage_duration_seconds",
+                "histogram",
+                "Duration of the stages.",
+                self._stage_durations.samples("stage"),
+            ),
+            (
+                "process_duration_seconds",
+                "histogram",
+                "Duration of the subprocesses, by tool.",
+                self._process_durations.samples("tool"),
+            ),
+            (
+                "extracted_bytes_total",
+                "counter",
+                "Bytes written by MKVextract.",
+                [f" {self._extracted_bytes}"],
+            ),
+            (
+                "copied_bytes_total",
+                "counter",
+                "Bytes of fonts copied into the font store, or into attachments where hardlinking is not possible.",
+                [f" {copied_bytes}"],
+            ),
+            (
+                "font_cache_requests_total",
+                "counter",
+                "Fonts found in the font store (hit) or added to it (miss).",
+                [
+                    f"{format_labels({'result': 'hit'})} {font_hits}",
+                    f"{format_labels({'result': 'miss'})} {font_misses}",
+                ],
+            ),
+            (
+                "font_cache_hit_ratio",
+                "gauge",
+                "Ratio of fonts found in the font store.",
+                [
+                    f" {format_value(font_hits / (font_hits + font_misses) if font_hits + font_misses else 0.0)}"
+                ],
+            ),
+        ]
+
+        lines = []
+        for name, metric_type, description, samples in metrics:
+            metric_name = f"{METRICS_PREFIX}_{name}"
+            lines.append(f"# HELP {metric_name} {description}")
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+            lines.extend(f"{metric_name}{sample}" for sample in samples)
+
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """
+        Write the metrics atomically, so the collector never reads a partially written file.
+
+        Returns:
+            None
+        """
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as temporary_path:
+            with temporary_path.open("w") as file:
+                file.write(self.render())
+        self._written = time.monotonic()
+
+    def write_periodically(self) -> None:
+        """
+        Write the metrics if the interval elapsed since they were last written.
+
+        Returns:
+            None
+        """
+
+        if time.monotonic() - self._written >= self.interval:
+            self.write()
@@ -0,0 +1,379 @@
+import fnmatch
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from mkvrestyle.exception import (
+    InvalidFontNameError,
+    InvalidFontSubstituteOptionError,
+    InvalidPresetError,
+)
+from mkvrestyle.helper import read_json
+
+STYLE_RESAMPLE_KEYS = [
+    "Fontsize",
+    "ScaleX",
+    "ScaleY",
+    "Spacing",
+    "Outline",
+    "Shadow",
+    "MarginL",
+    "MarginR",
+    "MarginV",
+]
+DIALOGUE_RESAMPLE_KEYS = ["MarginL", "MarginR", "MarginV"]
+
+# Scaling is relative, so it is not resampled to the video dimensions
+RELATIVE_RESAMPLE_KEYS = ["ScaleX", "ScaleY"]
+
+FONT_SUBSTITUTE_OPTIONS = ["all", "custom"]
+
+# Style name patterns starting with this character are regular expressions, otherwise globs
+REGEX_PATTERN_PREFIX = "^"
+GLOB_PATTERN_CHARACTERS = ("*", "?", "[")
+
+# Style names starting with this character are matched exactly, e.g. names containing glob characters
+EXACT_PATTERN_PREFIX = "="
+
+
+class StyleMatcher:
+    """
+    Resolves style names to the first matching pattern, in the order the patterns were given.
+
+    Exact names are looked up directly, while glob and regex patterns are compiled once and tried in order. Resolved
+    names are memoized, so repeated lookups take constant time.
+
+    Attributes:
+        patterns (tuple[str, ...]): The style name patterns.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = tuple(patterns)
+        self._exact: dict[str, int] = {}
+        self._cache: dict[str, int | None] = {}
+
+        # Compiled separately, as group references and inline flags of a pattern are not valid in a combined pattern
+        self._regexes: list[tuple[int, re.Pattern]] = []
+        for index, pattern in enumerate(self.patterns):
+            if pattern.startswith(EXACT_PATTERN_PREFIX):
+                self._exact.setdefault(pattern[len(EXACT_PATTERN_PREFIX) :], index)
+            elif pattern.startswith(REGEX_PATTERN_PREFIX):
+                try:
+                    self._regexes.append((index, re.compile(pattern)))
+                except re.error as error:
+                    raise InvalidPresetError(pattern, f"invalid regex ({error})")
+            elif any(char in pattern for char in GLOB_PATTERN_CHARACTERS):
+                self._regexes.append((index, re.compile(fnmatch.translate(pattern))))
+            else:
+                self._exact.setdefault(pattern, index)
+
+    def match(self, name: str) -> int | None:
+        """
+        Get the index of the first pattern matching the style name.
+
+        Parameters:
+            name (str): The style name.
+
+        Returns:
+            int | None: The index of the matching pattern, or None if no pattern matches.
+        """
+
+        if name in self._cache:
+            return self._cache[name]
+
+        index = self._exact.get(name)
+        for regex_index, regex in self._regexes:
+            if index is not None and regex_index > index:
+                break
+            if regex.match(name):
+                index = regex_index
+                break
+
+        self._cache[name] = index
+
+        return index
+
+    def __contains__(self, name: str) -> bool:
+        return self.match(name) is not None
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    """
+    Compiled preset option for a single style/dialogue column.
+
+    Attributes:
+        key (str): The column name, e.g. `Fontsize`.
+        resample (bool): Whether the value is resampled to the video dimensions.
+        factor (float | None): The preset factor; None if the preset does not change the column.
+        ndigits (int): The amount of digits to round to.
+        cast_int (bool): Whether the result is cast to an integer.
+    """
+
+    key: str
+    resample: bool
+    factor: float | None = None
+    ndigits: int = 0
+    cast_int: bool = False
+
+    def apply(self, value, resample_mean: float):
+        """
+        Apply the resampling and preset factor to a column value.
+
+        Parameters:
+            value (str | bytes): The original column value.
+            resample_mean (float): The resample factor between the video and subtitle dimensions.
+
+        Returns:
+            The new column value, or the original value if it is zero.
+        """
+
+        number = float(value)
+        if number == 0:
+            return value
+
+        if self.resample:
+            number = round(number * resample_mean, 2)
+            value = number
+
+        if self.factor is None:
+            return value
+
+        resampled_value = round(number * self.factor, self.ndigits)
+        if self.cast_int:
+            return str(int(resampled_value))
+
+        return str(resampled_value)
+
+
+@dataclass(frozen=True)
+class FontRule:
+    """
+    Compiled `FontName` preset option.
+
+    Attributes:
+        name (str): The name of the substitute font.
+        substitute (str): The substitution option, either `all` or `custom`.
+        styles (StyleMatcher): The style name patterns to substitute for `custom`; empty for automatic detection.
+    """
+
+    name: str
+    substitute: str
+    styles: StyleMatcher = field(default_factory=lambda: StyleMatcher([]))
+
+
+@dataclass(frozen=True)
+class StyleRule:
+    """
+    Compiled preset options for styles matching a pattern.
+
+    Attributes:
+        pattern (str): The style name pattern.
+        style_columns (tuple[ColumnRule, ...]): The rules for the `Style` columns.
+        dialogue_columns (tuple[ColumnRule, ...]): The rules for the `Dialogue` columns.
+    """
+
+    pattern: str
+    style_columns: tuple[ColumnRule, ...]
+    dialogue_columns: tuple[ColumnRule, ...]
+
+
+@dataclass(frozen=True)
+class PresetPlan:
+    """
+    Immutable transformation plan compiled from a preset file.
+
+    Attributes:
+        path (Path): The path of the preset file.
+        style_columns (tuple[ColumnRule, ...]): The rules for the `Style` columns.
+        dialogue_columns (tuple[ColumnRule, ...]): The rules for the `Dialogue` columns.
+        font (FontRule | None): The font substitution rule, if any.
+        style_rules (tuple[StyleRule, ...]): The per-style rules, in order of precedence.
+        style_matcher (StyleMatcher): The matcher resolving style names to the per-style rules.
+        digest (str): The SHA-256 hash of the preset options.
+    """
+
+    path: Path
+    style_columns: tuple[ColumnRule, ...]
+    dialogue_columns: tuple[ColumnRule, ...]
+    font: FontRule | None = None
+    style_rules: tuple[StyleRule, ...] = ()
+    style_matcher: StyleMatcher = field(default_factory=lambda: StyleMatcher([]))
+    digest: str = ""
+
+    def style_rule_for(self, style_name: str) -> StyleRule | None:
+        index = self.style_matcher.match(style_name)
+        if index is None:
+            return None
+
+        return self.style_rules[index]
+
+    def style_columns_for(self, style_name: str) -> tuple[ColumnRule, ...]:
+        style_rule = self.style_rule_for(style_name)
+        if style_rule is None:
+            return self.style_columns
+
+        return style_rule.style_columns
+
+    def dialogue_columns_for(self, style_name: str) -> tuple[ColumnRule, ...]:
+        style_rule = self.style_rule_for(style_name)
+        if style_rule is None:
+            return self.dialogue_columns
+
+        return style_rule.dialogue_columns
+
+
+def compile_column_rule(preset: dict, key: str, resample: bool) -> ColumnRule:
+    option = preset.get(key)
+    if not option:
+        return ColumnRule(key=key, resample=resample)
+
+    if not isinstance(option, dict):
+        raise InvalidPresetError(key, "expected an object with `factor` and `round`")
+
+    factor = option.get("factor")
+    if isinstance(factor, bool) or not isinstance(factor, (int, float)):
+        raise InvalidPresetError(f"{key}.factor", "expected a number")
+
+    ndigits = option.get("round")
+    if isinstance(ndigits, bool) or not isinstance(ndigits, int) or ndigits < 0:
+        raise InvalidPresetError(f"{key}.round", "expected a non-negative integer")
+
+    return ColumnRule(
+        key=key,
+        resample=resample,
+        factor=float(factor),
+        ndigits=ndigits,
+        cast_int=ndigits == 0,
+    )
+
+
+def compile_font_rule(preset: dict) -> FontRule | None:
+    font_settings = preset.get("FontName", None)
+    if font_settings is None:
+        return None
+
+    font_option = font_settings.get("substitute", None)
+    if font_option is None or font_option not in FONT_SUBSTITUTE_OPTIONS:
+        raise InvalidFontSubstituteOptionError(font_option)
+
+    font_name = font_settings.get("name", None)
+    if not isinstance(font_name, str) or (not (font_name and font_name.strip())):
+        raise InvalidFontNameError(font_name)
+
+    styles = font_settings.get("style", [])
+    if not isinstance(styles, list) or not all(
+        isinstance(style, str) for style in styles
+    ):
+        raise InvalidPresetError("FontName.style", "expected a list of style names")
+
+    return FontRule(name=font_name, substitute=font_option, styles=StyleMatcher(styles))
+
+
+def compile_style_rules(
+    preset: dict,
+    style_columns: tuple[ColumnRule, ...],
+    dialogue_columns: tuple[ColumnRule, ...],
+) -> tuple[StyleRule, ...]:
+    """
+    Compile the per-style rules; options which are not given for a pattern fall back to the global options.
+    """
+
+    styles = preset.get("Styles", {})
+    if not isinstance(styles, dict):
+        raise InvalidPresetError(
+            "Styles", "expected an object keyed by style name pattern"
+        )
+
+    style_rules = []
+    for pattern, options in styles.items():
+        if not isinstance(options, dict):
+            raise InvalidPresetError(f"Styles.{pattern}", "expected an object")
+
+        unknown_keys = [key for key in options if key not in STYLE_RESAMPLE_KEYS]
+        if unknown_keys:
+            raise InvalidPresetError(
+                f"Styles.{pattern}.{unknown_keys[0]}", "unknown option"
+            )
+
+        style_rules.append(
+            StyleRule(
+                pattern=pattern,
+                style_columns=tuple(
+                    (
+                        compile_column_rule(options, column.key, column.resample)
+                        if column.key in options
+                        else column
+                    )
+                    for column in style_columns
+                ),
+                dialogue_columns=tuple(
+                    (
+                        compile_column_rule(options, column.key, column.resample)
+                        if column.key in options
+                        else column
+                    )
+                    for column in dialogue_columns
+                ),
+            )
+        )
+
+    return tuple(style_rules)
+
+
+def compile_preset(preset: dict, path: Path) -> PresetPlan:
+    """
+    Validate a preset and compile it into a transformation plan.
+
+    Parameters:
+        preset (dict): The preset as read from the JSON file.
+        path (Path): The path of the preset file.
+
+    Returns:
+        PresetPlan: The compiled plan.
+
+    Raises:
+        InvalidPresetError: If a resample option or style pattern is invalid.
+        InvalidFontSubstituteOptionError: If the `FontName.substitute` option is invalid.
+        InvalidFontNameError: If the `FontName.name` option is invalid.
+    """
+
+    if not isinstance(preset, dict):
+        raise InvalidPresetError(str(path), "expected a JSON object")
+
+    style_columns = tuple(
+        compile_column_rule(preset, key, key not in RELATIVE_RESAMPLE_KEYS)
+        for key in STYLE_RESAMPLE_KEYS
+    )
+    dialogue_columns = tuple(
+        compile_column_rule(preset, key, True) for key in DIALOGUE_RESAMPLE_KEYS
+    )
+    style_rules = compile_style_rules(preset, style_columns, dialogue_columns)
+
+    return PresetPlan(
+        path=path,
+        style_columns=style_columns,
+        dialogue_columns=dialogue_columns,
+        font=compile_font_rule(preset),
+        style_rules=style_rules,
+        style_matcher=StyleMatcher([style_rule.pattern for style_rule in style_rules]),
+        digest=hashlib.sha256(
+            json.dumps(preset, sort_keys=True).encode("utf-8")
+        ).hexdigest(),
+    )
+
+
+def load_preset(path: Path) -> PresetPlan:
+    """
+    Read and compile a preset file.
+
+    Parameters:
+        path (Path): The path to the JSON preset file.
+
+    Returns:
+        PresetPlan: The compiled plan.
+    """
+
+    return compile_preset(read_json(path), path)
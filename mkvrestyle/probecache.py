@@ -0,0 +1,144 @@
+import json
+import os
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+from mkvrestyle.helper import atomic_write
+
+PROBE_CACHE_FILE_NAME = "probe-cache.json"
+PROBE_CACHE_VERSION = 1
+PROBE_CACHE_MAX_ENTRIES = 2000
+
+PROBE_IDENTIFY = "identify"
+PROBE_DIMENSIONS = "dimensions"
+
+
+def probe_key(input_file: Path) -> str:
+    """
+    Key of an input file in the probe cache; a changed, replaced or moved-across-devices file gets a new key.
+
+    Parameters:
+        input_file (Path): The input file.
+
+    Returns:
+        str: The device, inode, size and modification time of the file.
+    """
+
+    stat = os.stat(input_file)
+
+    return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class ProbeCache:
+    """
+    Persistent cache of the MKVmerge identification and the video dimensions per input file, so repeated runs over
+    unchanged files do not probe them again.
+
+    The entries are kept in least recently used order; the least recently used entries are evicted once the cache
+    holds more than the maximum amount of entries.
+
+    Attributes:
+        path (Path): The path to the cache file.
+        max_entries (int): The maximum amount of input files in the cache.
+        entries (OrderedDict): The probe results per input file key, least recently used first.
+        stats (Counter): The amount of `hits` and `misses`.
+    """
+
+    def __init__(self, path: Path, max_entries: int = PROBE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.stats: Counter = Counter()
+        self._changed = False
+
+        try:
+            with self.path.open("r") as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            cache = {}
+        except (OSError, ValueError) as error:
+            logger.warning(f"Probe cache `{self.path}` could not be read: {error}.")
+            cache = {}
+
+        if isinstance(cache, dict) and cache.get("version") == PROBE_CACHE_VERSION:
+            self.entries = OrderedDict(cache.get("entries", {}))
+
+        # The maximum may be lower than in a previous run
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self._changed = True
+
+    def get(self, input_file: Path, probe: str) -> dict | None:
+        """
+        Get a cached probe result of an input file.
+
+        Parameters:
+            input_file (Path): The input file.
+            probe (str): The probe, `identify` or `dimensions`.
+
+        Returns:
+            dict | None: The probe result, or None if it is not cached.
+        """
+
+        key = probe_key(input_file)
+        result = self.entries.get(key, {}).get(probe)
+        if result is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self._changed = True
+        self.stats["hits"] += 1
+
+        return result
+
+    def put(self, input_file: Path, probe: str, result: dict) -> None:
+        """
+        Cache a probe result of an input file, evicting the least recently used entries if the cache is full.
+
+        Parameters:
+            input_file (Path): The input file.
+            probe (str): The probe, `identify` or `dimensions`.
+            result (dict): The probe result.
+
+        Returns:
+            None
+        """
+
+        key = probe_key(input_file)
+        self.entries.setdefault(key, {})[probe] = result
+        self.entries.move_to_end(key)
+        self._changed = True
+        self._evict()
+
+    def save(self) -> None:
+        """
+        Write the cache atomically, if it changed; a cache which cannot be written is only warned about, as the
+        results are probed again by the next run.
+
+        Returns:
+            None
+        """
+
+        if not self._changed:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(self.path) as temporary_path:
+                with temporary_path.open("w") as file:
+                    # JSON objects keep their order, and so the usage order of the entries
+                    json.dump(
+                        {"version": PROBE_CACHE_VERSION, "entries": self.entries},
+                        file,
+                    )
+        except OSError as error:
+            logger.warning(f"Probe cache `{self.path}` could not be written: {error}.")
+            return
+
+        self._changed = False
@@ -1,6 +1,7 @@
 import subprocess as sp
 
 from mkvrestyle.exception import MKVmergeError, ProcessError
+from mkvrestyle.profiling import span
 
 
 class ProcessCommand:
@@ -21,13 +22,14 @@ class ProcessCommand:
             "custom": ProcessError,
         }
 
-    def run(self, process, command):
+    def run(self, process, command, success_codes=(0,)):
         """
         Runs the specified process with the given command.
 
         Args:
             process (str): The name of the process being executed.
             command (List[str]): The command to be executed.
+            success_codes (Tuple[int]): The exit codes considered successful, e.g. (0, 1) for MKVmerge warnings.
 
         Returns:
             CompletedProcess: The result of the command execution.
@@ -41,9 +43,10 @@ class ProcessCommand:
             f"The following {process} command will be executed: {' '.join(command)}"
         )
 
-        response = sp.run(command, stdout=sp.PIPE, stderr=sp.PIPE)
+        with span(process, "process", tool=command[0], command=" ".join(command)):
+            response = sp.run(command, stdout=sp.PIPE, stderr=sp.PIPE)
         return_code = response.returncode
-        if return_code == 0:
+        if return_code in success_codes:
             self.logger.info(f"{process} completed.")
 
             return response
@@ -0,0 +1,271 @@
+import contextlib
+from abc import ABC, abstractmethod
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from mkvrestyle.helper import atomic_write
+
+PROC_IO_PATH = "/proc/self/io"
+
+# Shared no-op span, so spans cost a single check while no recorder is enabled
+DISABLED_SPAN = contextlib.nullcontext()
+
+# Receive every span, e.g. the profiler and the metrics
+_recorders: list = []
+
+
+def read_io_counters() -> tuple[int, int]:
+    """
+    Get the bytes read and written by this process and its finished subprocesses, including cached I/O.
+
+    Returns:
+        tuple: The bytes read and written, or zeros if the platform does not expose them.
+    """
+
+    try:
+        with open(PROC_IO_PATH, mode="r") as file:
+            counters = dict(line.split(": ", 1) for line in file.read().splitlines())
+    except OSError:
+        return 0, 0
+
+    return int(counters["rchar"]), int(counters["wchar"])
+
+
+def cpu_time() -> float:
+    """
+    Get the CPU time (user and system) of this process and its finished subprocesses.
+
+    Returns:
+        float: The CPU time in seconds.
+    """
+
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class Recorder(ABC):
+    """
+    Receives every span while it is enabled, see `add_recorder`.
+    """
+
+    def start(self, name: str, category: str) -> None:
+        """
+        Called when a span starts; spans are strictly nested.
+
+        Parameters:
+            name (str): The name of the span.
+            category (str): The category of the span.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def add(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        end: int,
+        cpu: float,
+        read: int,
+        written: int,
+        args: dict,
+    ) -> None:
+        """
+        Called when a span ends.
+
+        Parameters:
+            name (str): The name of the span.
+            category (str): The category of the span.
+            start (int): The start of the span, from `time.perf_counter_ns`.
+            end (int): The end of the span, from `time.perf_counter_ns`.
+            cpu (float): The CPU time of the span, in seconds.
+            read (int): The bytes read during the span.
+            written (int): The bytes written during the span.
+            args (dict): The extra details of the span.
+
+        Returns:
+            None
+        """
+
+
+class Profiler(Recorder):
+    """
+    Records spans of the stages and subprocesses of a run, with their wall time, CPU time and bytes read and written.
+
+    The spans are exported as Chrome trace events (viewable in Perfetto or `chrome://tracing`), and aggregated per
+    span name. Nested spans are included in the totals of their parent span.
+
+    Attributes:
+        events (list): The recorded trace events.
+        totals (dict): The count, wall time, CPU time and bytes read and written per span name.
+    """
+
+    def __init__(self) -> None:
+        self.events: list = []
+        self.totals: dict = {}
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def add(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        end: int,
+        cpu: float,
+        read: int,
+        written: int,
+        args: dict,
+    ) -> None:
+        wall = (end - start) / 1e9
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._origin) / 1e3,
+                "dur": (end - start) / 1e3,
+                "pid": self._pid,
+                "tid": threading.get_native_id(),
+                "args": {
+                    **{key: str(value) for key, value in args.items()},
+                    "cpu_s": round(cpu, 6),
+                    "read_bytes": read,
+                    "written_bytes": written,
+                },
+            }
+        )
+
+        total = self.totals.setdefault(
+            name,
+            {"count": 0, "wall": 0.0, "cpu": 0.0, "read": 0, "written": 0},
+        )
+        total["count"] += 1
+        total["wall"] += wall
+        total["cpu"] += cpu
+        total["read"] += read
+        total["written"] += written
+
+    def summary(self) -> list:
+        """
+        Get the totals per span name, slowest first.
+
+        Returns:
+            list: The name, count, wall time, CPU time and bytes read and written per span name.
+        """
+
+        return [
+            {"name": name, **total}
+            for name, total in sorted(
+                self.totals.items(), key=lambda item: item[1]["wall"], reverse=True
+            )
+        ]
+
+    def write(self, output_file: Path) -> None:
+        """
+        Write the trace events as Chrome trace JSON, atomically.
+
+        Parameters:
+            output_file (Path): The path to the trace file.
+
+        Returns:
+            None
+        """
+
+        trace = {
+            "traceEvents": [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "args": {"name": "mkvrestyle"},
+                },
+                *self.events,
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(output_file) as temporary_path:
+            with temporary_path.open("w") as file:
+                json.dump(trace, file)
+
+
+def add_recorder(recorder: Recorder) -> None:
+    """
+    Pass every span of the remainder of the run to a recorder.
+
+    Parameters:
+        recorder (Recorder): The recorder.
+
+    Returns:
+        None
+    """
+
+    _recorders.append(recorder)
+
+
+def enable_profiling() -> Profiler:
+    """
+    Start recording spans for the remainder of the run.
+
+    Returns:
+        Profiler: The profiler recording the spans.
+    """
+
+    profiler = Profiler()
+    add_recorder(profiler)
+
+    return profiler
+
+
+@contextlib.contextmanager
+def record_span(name: str, category: str, args: dict):
+    for recorder in _recorders:
+        recorder.start(name, category)
+
+    read_start, written_start = read_io_counters()
+    cpu_start = cpu_time()
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        cpu = cpu_time() - cpu_start
+        read_end, written_end = read_io_counters()
+        for recorder in _recorders:
+            recorder.add(
+                name,
+                category,
+                start,
+                end,
+                cpu,
+                read_end - read_start,
+                written_end - written_start,
+                args,
+            )
+
+
+def span(name: str, category: str = "stage", **args):
+    """
+    Record the wrapped code as a span, with its wall time, CPU time and bytes read and written, if any recorder is
+    enabled.
+
+    Parameters:
+        name (str): The name of the span, e.g. `parse` or `MKVmerge identify`.
+        category (str, optional): The category of the span, e.g. `stage` or `process`. The default is `stage`.
+        **args: Extra details shown with the span, e.g. the input file.
+
+    Returns:
+        ContextManager: The span context, or a no-op context if no recorder is enabled.
+    """
+
+    if not _recorders:
+        return DISABLED_SPAN
+
+    return record_span(name, category, args)
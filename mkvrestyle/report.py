@@ -0,0 +1,127 @@
+import json
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from mkvrestyle.helper import atomic_write
+from mkvrestyle.journal import STAGE_EXTRACTED, STAGE_RESUMED
+
+STAGE_PREPARE = "prepare"
+STAGE_EXTRACT = "extract"
+STAGE_RESTYLE = "restyle"
+STAGE_PUBLISH = "publish"
+STAGE_REMUX = "remux"
+STAGE_FINALIZE = "finalize"
+
+FAILURE_REPORT_FILE_NAME = "mkvrestyle-failures.json"
+
+OUTCOME_PROCESSED = "processed"
+OUTCOME_UP_TO_DATE = "up_to_date"
+OUTCOME_NO_SUBTITLES = "no_subtitles"
+
+
+class StageTracker:
+    """
+    Tracks the stage an input file is in, forwarding every completed stage to a callback, e.g. to journal it.
+
+    Attributes:
+        stage (str): The current stage.
+        record_stage (Callable | None): Called with every completed stage and its data.
+    """
+
+    def __init__(self, record_stage: Callable[..., None] | None = None):
+        self.stage = STAGE_PREPARE
+        self.record_stage = record_stage
+
+    def start(self, stage: str) -> None:
+        self.stage = stage
+
+    def __call__(self, stage: str, data: dict | None = None) -> None:
+        if self.record_stage is not None:
+            self.record_stage(stage, data)
+
+        if stage in (STAGE_EXTRACTED, STAGE_RESUMED):
+            self.stage = STAGE_RESTYLE
+
+
+class FailureReport:
+    """
+    Machine-readable summary of the input files that failed while the remaining files were processed.
+
+    Attributes:
+        failures (list): The failures, with the input file, stage, exception type, message and timing.
+        processed (int): The amount of processed input files.
+        skipped (int): The amount of input files skipped as their outputs are up to date.
+        no_subtitles (int): The amount of input files skipped as they have no subtitle stream to restyle.
+    """
+
+    def __init__(self) -> None:
+        self.failures: list = []
+        self.processed = 0
+        self.skipped = 0
+        self.no_subtitles = 0
+        self._started = time.perf_counter()
+        self._started_at = datetime.now(timezone.utc)
+
+    def add(
+        self, input_file: Path, stage: str, error: Exception, duration: float
+    ) -> None:
+        """
+        Add a failed input file.
+
+        Parameters:
+            input_file (Path): The input file.
+            stage (str): The stage in which the input failed, e.g. `extract` or `restyle`.
+            error (Exception): The raised exception.
+            duration (float): The time spent on the input file, in seconds.
+
+        Returns:
+            None
+        """
+
+        self.failures.append(
+            {
+                "input": str(input_file),
+                "stage": stage,
+                "type": type(error).__name__,
+                "message": str(error),
+                "failed_at": datetime.now(timezone.utc).isoformat(),
+                "duration": round(duration, 3),
+            }
+        )
+
+    def summary(self) -> dict:
+        failures_by_type: dict = {}
+        for failure in self.failures:
+            failures_by_type.setdefault(failure["type"], []).append(failure)
+
+        return {
+            "started_at": self._started_at.isoformat(),
+            "duration": round(time.perf_counter() - self._started, 3),
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "no_subtitles": self.no_subtitles,
+            "failed": len(self.failures),
+            "failed_by_stage": dict(
+                Counter(failure["stage"] for failure in self.failures)
+            ),
+            "failures": failures_by_type,
+        }
+
+    def write(self, output_file: Path) -> None:
+        """
+        Write the summary as JSON, atomically.
+
+        Parameters:
+            output_file (Path): The path to the report file.
+
+        Returns:
+            None
+        """
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(output_file) as temporary_path:
+            with temporary_path.open("w") as file:
+                json.dump(self.summary(), file, indent=4)
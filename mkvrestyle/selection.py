@@ -0,0 +1,167 @@
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from mkvrestyle.exception import InvalidStreamPolicyError
+from mkvrestyle.helper import read_json
+
+FALLBACK_FIRST = "first"
+FALLBACK_SKIP = "skip"
+FALLBACK_ERROR = "error"
+FALLBACK_OPTIONS = [FALLBACK_FIRST, FALLBACK_SKIP, FALLBACK_ERROR]
+
+
+@dataclass(frozen=True)
+class StreamPolicy:
+    """
+    Declarative subtitle stream selection, evaluated from the identify data only.
+
+    Attributes:
+        languages (tuple[str, ...]): Languages in order of priority; empty for any language.
+        prefer_title (re.Pattern | None): Tracks with a matching title are preferred.
+        avoid_title (re.Pattern | None): Tracks with a matching title are avoided.
+        codecs (tuple[str, ...]): Allowed codec IDs; empty for any codec.
+        fallback (str): Action if no track matches; `first` (first allowed track), `skip` (skip the file) or `error`.
+    """
+
+    languages: tuple[str, ...] = ()
+    prefer_title: re.Pattern | None = None
+    avoid_title: re.Pattern | None = None
+    codecs: tuple[str, ...] = ()
+    fallback: str = FALLBACK_FIRST
+
+    def select(self, tracks: list) -> dict | None:
+        """
+        Select the best matching subtitle track.
+
+        Parameters:
+            tracks (list): The subtitle tracks, with keys `index`, `codec`, `language` and `title`.
+
+        Returns:
+            dict | None: The selected track, or None if no track matches.
+        """
+
+        candidates = [
+            track
+            for track in tracks
+            if not self.codecs or track["codec"] in self.codecs
+        ]
+        if self.languages:
+            candidates = [
+                track for track in candidates if track["language"] in self.languages
+            ]
+
+        if not candidates:
+            return None
+
+        return min(candidates, key=self._rank)
+
+    def fallback_track(self, tracks: list) -> dict | None:
+        """
+        Get the track to use if no track matches, according to the fallback action.
+
+        Parameters:
+            tracks (list): The subtitle tracks.
+
+        Returns:
+            dict | None: The first track with an allowed codec for `first`, otherwise None.
+        """
+
+        if self.fallback != FALLBACK_FIRST:
+            return None
+
+        return next(
+            (
+                track
+                for track in tracks
+                if not self.codecs or track["codec"] in self.codecs
+            ),
+            None,
+        )
+
+    def _rank(self, track: dict) -> tuple:
+        language_rank = (
+            self.languages.index(track["language"])
+            if track["language"] in self.languages
+            else len(self.languages)
+        )
+        avoided = (
+            self.avoid_title is not None
+            and self.avoid_title.search(track["title"]) is not None
+        )
+        preferred = (
+            self.prefer_title is not None
+            and self.prefer_title.search(track["title"]) is not None
+        )
+
+        return language_rank, avoided, not preferred, int(track["index"])
+
+
+def compile_title_pattern(policy: dict, key: str) -> re.Pattern | None:
+    pattern = policy.get(key)
+    if pattern is None:
+        return None
+
+    if not isinstance(pattern, str):
+        raise InvalidStreamPolicyError(key, "expected a regular expression")
+
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as error:
+        raise InvalidStreamPolicyError(key, f"invalid regex ({error})")
+
+
+def compile_string_list(policy: dict, key: str) -> tuple[str, ...]:
+    values = policy.get(key, [])
+    if not isinstance(values, list) or not all(
+        isinstance(value, str) for value in values
+    ):
+        raise InvalidStreamPolicyError(key, "expected a list of strings")
+
+    return tuple(values)
+
+
+def compile_stream_policy(policy: dict) -> StreamPolicy:
+    """
+    Validate a stream selection policy and compile it.
+
+    Parameters:
+        policy (dict): The policy as read from the JSON file.
+
+    Returns:
+        StreamPolicy: The compiled policy.
+
+    Raises:
+        InvalidStreamPolicyError: If an option is invalid.
+    """
+
+    if not isinstance(policy, dict):
+        raise InvalidStreamPolicyError("policy", "expected a JSON object")
+
+    fallback = policy.get("fallback", FALLBACK_FIRST)
+    if fallback not in FALLBACK_OPTIONS:
+        raise InvalidStreamPolicyError(
+            "fallback", f"expected one of {', '.join(FALLBACK_OPTIONS)}"
+        )
+
+    return StreamPolicy(
+        languages=compile_string_list(policy, "languages"),
+        prefer_title=compile_title_pattern(policy, "prefer_title"),
+        avoid_title=compile_title_pattern(policy, "avoid_title"),
+        codecs=compile_string_list(policy, "codecs"),
+        fallback=fallback,
+    )
+
+
+def load_stream_policy(path: Path) -> StreamPolicy:
+    """
+    Read and compile a stream selection policy file.
+
+    Parameters:
+        path (Path): The path to the JSON policy file.
+
+    Returns:
+        StreamPolicy: The compiled policy.
+    """
+
+    return compile_stream_policy(read_json(path))
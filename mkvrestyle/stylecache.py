@@ -0,0 +1,175 @@
+import hashlib
+from collections import Counter, OrderedDict
+
+from mkvrestyle.fontindex import FontIndex
+
+# Distinct Styles sections, resolutions and presets; a season mostly shares one
+STYLE_CACHE_MAX_SECTIONS = 64
+STYLE_CACHE_MAX_FONTS = 1024
+
+
+def style_section_digest(lines: list, line_indices: list) -> str:
+    """
+    Hash of the `Format` and `Style` lines of a subtitle, the same for every episode sharing a Styles section.
+
+    Parameters:
+        lines (list): The lines of the subtitle.
+        line_indices (list): The indices of the `Format` and `Style` lines.
+
+    Returns:
+        str: The SHA-1 hash.
+    """
+
+    digest = hashlib.sha1()
+    for line_index in line_indices:
+        digest.update(lines[line_index])
+        digest.update(b"\n")
+
+    return digest.hexdigest()
+
+
+class StyleCache:
+    """
+    Memoizes the restyled style lines and the font lookups of a run, which are the same for every episode of a season.
+
+    The restyled style lines are keyed by the Styles section, the subtitle and video resolution and the preset. The
+    font lookups are keyed by name and family, as the fonts on the filesystem do not change during a run. Every memo is
+    kept in least recently used order, and the least recently used entries are evicted once it is full.
+
+    Attributes:
+        style_lines (OrderedDict): The restyled style line (or None if unchanged) per style line and substitute font,
+        per key.
+        fonts (OrderedDict): The font on the filesystem (or False if not found) per lowercase font name.
+        families (OrderedDict): The fonts on the filesystem per font family.
+        stats (Counter): The amount of `hits` and `misses` of the restyled style lines.
+    """
+
+    def __init__(
+        self,
+        max_sections: int = STYLE_CACHE_MAX_SECTIONS,
+        max_fonts: int = STYLE_CACHE_MAX_FONTS,
+    ) -> None:
+        self.max_sections = max_sections
+        self.max_fonts = max_fonts
+        self.style_lines: OrderedDict = OrderedDict()
+        self.fonts: OrderedDict = OrderedDict()
+        self.families: OrderedDict = OrderedDict()
+        self.stats: Counter = Counter()
+        self._fonts_list: list | FontIndex | None = None
+
+    @staticmethod
+    def key(
+        style_digest: str,
+        subtitle_resolution: tuple,
+        video_resolution: tuple,
+        preset_digest: str,
+    ) -> tuple:
+        return style_digest, subtitle_resolution, video_resolution, preset_digest
+
+    @staticmethod
+    def _remember(memo: OrderedDict, key, value, max_entries: int) -> None:
+        memo[key] = value
+        memo.move_to_end(key)
+        while len(memo) > max_entries:
+            memo.popitem(last=False)
+
+    def style_line(self, key: tuple, style_line: bytes, font_name: str | None, restyle):
+        """
+        Get a restyled style line, restyling it on the first request.
+
+        Parameters:
+            key (tuple): The key of the Styles section, see `key`.
+            style_line (bytes): The original `Style` line.
+            font_name (str | None): The substitute font of the style, if any.
+            restyle (Callable): Returns the restyled style line, or None if the line is unchanged.
+
+        Returns:
+            bytes | None: The restyled style line, or None if the line is unchanged.
+        """
+
+        style_lines = self.style_lines.get(key)
+        if style_lines is None:
+            style_lines = {}
+            self._remember(self.style_lines, key, style_lines, self.max_sections)
+        else:
+            self.style_lines.move_to_end(key)
+
+        if (style_line, font_name) in style_lines:
+            self.stats["hits"] += 1
+            return style_lines[style_line, font_name]
+
+        self.stats["misses"] += 1
+        restyled_line = style_lines[style_line, font_name] = restyle()
+
+        return restyled_line
+
+    def _check_fonts_list(self, fonts_list: list | FontIndex) -> None:
+        # The lookups are only valid for the same fonts
+        if fonts_list is not self._fonts_list:
+            self._fonts_list = fonts_list
+            self.fonts.clear()
+            self.families.clear()
+
+    def find_fonts(self, fonts_list: list | FontIndex, font_names: list) -> dict:
+        """
+        Find fonts on the filesystem by name, see `mkvrestyle.cli.find_available_fonts`.
+
+        Parameters:
+            fonts_list (list | FontIndex): The fonts on the filesystem.
+            font_names (list): The font names.
+
+        Returns:
+            dict: The font (or False if not found) per font name.
+        """
+
+        self._check_fonts_list(fonts_list)
+        found_fonts: dict = {}
+        for font_name in font_names:
+            if font_name.lower() in self.fonts:
+                self.fonts.move_to_end(font_name.lower())
+                found_fonts[font_name.lower()] = self.fonts[font_name.lower()]
+            elif isinstance(fonts_list, FontIndex):
+                found_fonts[font_name.lower()] = fonts_list.find(font_name) or False
+
+        missing_font_names = {
+            font_name.lower()
+            for font_name in font_names
+            if font_name.lower() not in found_fonts
+        }
+        if missing_font_names:
+            for font in fonts_list:
+                font_name = font["font_name"].lower()
+                if font_name in missing_font_names:
+                    found_fonts.setdefault(font_name, font)
+            for font_name in missing_font_names:
+                found_fonts.setdefault(font_name, False)
+
+        for font_name, font in found_fonts.items():
+            self._remember(self.fonts, font_name, font, self.max_fonts)
+
+        return {font_name: found_fonts[font_name.lower()] for font_name in font_names}
+
+    def family(self, fonts_list: list | FontIndex, font_family: str | None) -> list:
+        """
+        Get every font on the filesystem of a font family, e.g. its bold and italic variants.
+
+        Parameters:
+            fonts_list (list | FontIndex): The fonts on the filesystem.
+            font_family (str | None): The font family.
+
+        Returns:
+            list: The fonts of the family.
+        """
+
+        self._check_fonts_list(fonts_list)
+        if font_family in self.families:
+            self.families.move_to_end(font_family)
+            return self.families[font_family]
+
+        if isinstance(fonts_list, FontIndex):
+            fonts = fonts_list.family(font_family) if font_family is not None else []
+        else:
+            fonts = [font for font in fonts_list if font["font_family"] == font_family]
+        self._remember(self.families, font_family, fonts, self.max_fonts)
+
+        return fonts
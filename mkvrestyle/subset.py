@@ -0,0 +1,225 @@
+import hashlib
+import json
+from pathlib import Path
+
+from fontTools import subset  # type: ignore
+from loguru import logger  # noqa
+
+from mkvrestyle.fonts import FontFinder
+from mkvrestyle.fontstore import FontStore
+from mkvrestyle.helper import atomic_write
+
+SUBSET_STATE_FILE_NAME = "subsets.json"
+SUBSET_FONT_EXTENSIONS = frozenset([".ttf", ".otf"])
+
+# Always kept, as renderers use them for line breaks and `\h`
+SUBSET_BASE_CODEPOINTS = frozenset([0x20, 0xA0])
+
+
+def codepoints_digest(codepoints: set) -> str:
+    return hashlib.sha256(
+        ",".join(str(codepoint) for codepoint in sorted(codepoints)).encode("ascii")
+    ).hexdigest()
+
+
+def subset_font(source: Path, destination: Path, codepoints: set) -> None:
+    """
+    Subset a font to the glyphs of the given code points, keeping its names so styles still match it.
+
+    Parameters:
+        source (Path): The font file.
+        destination (Path): The path to write the subset font to.
+        codepoints (set): The code points to keep.
+
+    Returns:
+        None
+    """
+
+    options = subset.Options()
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.name_legacy = True
+    options.layout_features = ["*"]
+    options.notdef_outline = True
+
+    font = subset.load_font(str(source), options)
+    # Keep the original timestamp, so the same input always produces the same bytes
+    font.recalcTimestamp = False
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=sorted(codepoints | SUBSET_BASE_CODEPOINTS))
+    subsetter.subset(font)
+    subset.save_font(font, str(destination), options)
+    font.close()
+
+
+class FontSubsetter:
+    """
+    Subsets the fonts in attachments folders to the code points used by the subtitles.
+
+    The code points used per attachment are accumulated in the font store (`subsets.json`), as an attachments folder can
+    be shared by multiple subtitles, also from previous runs. Every subset is made from the original font in the store,
+    and cached in the store by the hashes of the original font and the code points.
+
+    Attributes:
+        font_store (FontStore): The font store of the output directory.
+        entries (dict): The original font hash, subset hash and code points per attachment path.
+    """
+
+    def __init__(self, font_store: FontStore):
+        self.font_store = font_store
+        self.entries: dict = {}
+        self._font_names: dict = {}
+        self._changed = False
+
+        self._state_path = font_store.folder.joinpath(SUBSET_STATE_FILE_NAME)
+        if self._state_path.is_file():
+            try:
+                with self._state_path.open("r") as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def font_names(self, font_file: Path) -> set:
+        digest = self.font_store.digest(font_file)
+        if digest not in self._font_names:
+            font_info = FontFinder.font_info_by_file(font_file)
+            self._font_names[digest] = {
+                font_info[key].lower()
+                for key in ("font_name", "font_family")
+                if key in font_info
+            }
+
+        return self._font_names[digest]
+
+    def subset(self, source: Path, codepoints: set) -> Path:
+        """
+        Get the subset of a font in the store, making it if it is not cached.
+
+        Parameters:
+            source (Path): The original font in the store.
+            codepoints (set): The code points to keep.
+
+        Returns:
+            Path: The path of the subset font in the store.
+        """
+
+        subset_path = source.with_name(
+            f"{source.stem}-{codepoints_digest(codepoints)[:16]}{source.suffix}"
+        )
+        if subset_path.is_file():
+            return subset_path
+
+        with atomic_write(subset_path) as temporary_path:
+            subset_font(source, temporary_path, codepoints)
+
+        return subset_path
+
+    def subset_attachments(
+        self, attachments_folder: Path, codepoints_by_font: dict
+    ) -> None:
+        """
+        Subset the fonts in the attachments folder which are used by the subtitles.
+
+        Fonts which are not used by any style or `\\fn` override are left as-is.
+
+        Parameters:
+            attachments_folder (Path): The attachments folder.
+            codepoints_by_font (dict): The used code points per (lowercase) font name.
+
+        Returns:
+            None
+        """
+
+        subsets = []
+        for font_file in sorted(attachments_folder.iterdir()):
+            if (
+                font_file.suffix.lower() not in SUBSET_FONT_EXTENSIONS
+                or not font_file.is_file()
+            ):
+                continue
+
+            used_codepoints: set = set()
+            for font_name in self.font_names(font_file):
+                used_codepoints |= codepoints_by_font.get(font_name, set())
+            if not used_codepoints:
+                continue
+
+            key = str(font_file)
+            entry = self.entries.get(key)
+            digest = self.font_store.digest(font_file)
+            if entry is not None and digest == entry["subset"]:
+                # Already subset; subset again from the original font
+                source = self.font_store.folder.joinpath(
+                    f"{entry['source']}{font_file.suffix.lower()}"
+                )
+                if not source.is_file():
+                    continue
+            else:
+                source = self.font_store.add(font_file)
+
+            codepoints = used_codepoints | set(
+                entry["codepoints"] if entry is not None else []
+            )
+            if (
+                entry is not None
+                and digest == entry["subset"]
+                and codepoints == set(entry["codepoints"])
+            ):
+                continue
+
+            try:
+                subset_path = self.subset(source, codepoints)
+            except Exception as error:
+                logger.warning(
+                    f"Could not subset `{font_file.name}`, keeping the full font: {error}"
+                )
+                continue
+
+            self.entries[key] = {
+                "source": self.font_store.digest(source),
+                "subset": self.font_store.digest(subset_path),
+                "codepoints": sorted(codepoints),
+            }
+            self._changed = True
+            subsets.append((subset_path, font_file, len(codepoints)))
+
+        # Record the subsets before linking them, so a subset attachment is never mistaken for an original font
+        self.save()
+        for subset_path, font_file, codepoint_count in subsets:
+            self.font_store.link(subset_path, font_file)
+
+            logger.info(
+                f"Subset `{font_file.name}` to {codepoint_count} code point(s)."
+            )
+
+    def forget(self, folder: Path) -> None:
+        """
+        Forget the accumulated code points of the attachments in a folder, e.g. a removed scratch directory.
+
+        Parameters:
+            folder (Path): The folder.
+
+        Returns:
+            None
+        """
+
+        for key in [key for key in self.entries if Path(key).is_relative_to(folder)]:
+            del self.entries[key]
+            self._changed = True
+
+    def save(self) -> None:
+        """
+        Write the accumulated code points per attachment atomically, if they changed.
+
+        Returns:
+            None
+        """
+
+        if not self._changed:
+            return
+
+        self.font_store.folder.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self._state_path) as temporary_path:
+            with temporary_path.open("w") as file:
+                json.dump(self.entries, file)
+        self._changed = False
@@ -0,0 +1,126 @@
+import codecs
+from pathlib import Path
+
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+
+def detect_encoding(data: bytes) -> tuple[str, bytes]:
+    """
+    Detect the encoding of the raw subtitle content.
+
+    Parameters:
+        data (bytes): The raw file content.
+
+    Returns:
+        tuple: The detected encoding and the byte order mark (empty if not present).
+    """
+
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if data.startswith(bom):
+            return encoding, bom
+
+    # UTF-16 without BOM; the ASS headers are ASCII, so every other byte is a null byte
+    if data[1:2] == b"\x00" and data[0:1] != b"\x00":
+        return "utf-16-le", b""
+    if data[0:1] == b"\x00" and data[1:2] != b"\x00":
+        return "utf-16-be", b""
+
+    if data.isascii():
+        return "utf-8", b""
+
+    try:
+        codecs.utf_8_decode(data, "strict", True)
+    except UnicodeDecodeError:
+        return "latin-1", b""
+
+    return "utf-8", b""
+
+
+class SubtitleDocument:
+    """
+    ASS subtitle content kept as bytes lines.
+
+    Structural parsing and editing (section headers, `Format`/`Style`/`Dialogue` lines) works directly on the
+    ASCII-compatible bytes, while only the fields that need it are decoded. UTF-16 content is transcoded to UTF-8 for
+    processing and back when writing, so unchanged content round-trips byte-exact.
+
+    Attributes:
+        encoding (str): The detected encoding of the original file.
+        bom (bytes): The byte order mark of the original file (empty if not present).
+        newline (bytes): The line separator used in the original file.
+        lines (list[bytes]): The lines of the subtitle, without line separators.
+    """
+
+    def __init__(self, data: bytes):
+        self.encoding, self.bom = detect_encoding(data)
+        content = data[len(self.bom) :]
+        if self.is_wide:
+            content = content.decode(self.encoding).encode("utf-8")
+
+        first_line_end = content.find(b"\n")
+        self.newline = (
+            b"\r\n"
+            if first_line_end > 0 and content[first_line_end - 1] == ord("\r")
+            else b"\n"
+        )
+        self.lines = content.split(self.newline)
+
+    @classmethod
+    def from_file(cls, input_file: Path | str) -> "SubtitleDocument":
+        """
+        Read a subtitle file.
+
+        Parameters:
+            input_file (Path | str): The path to the subtitle file.
+
+        Returns:
+            SubtitleDocument: The subtitle document.
+        """
+
+        with open(str(input_file), mode="rb") as file:
+            return cls(file.read())
+
+    @property
+    def is_wide(self) -> bool:
+        return self.encoding.startswith("utf-16")
+
+    @property
+    def line_encoding(self) -> str:
+        """
+        The ASCII-compatible encoding in which the lines are kept.
+        """
+
+        return "utf-8" if self.is_wide else self.encoding
+
+    def decode(self, value: bytes) -> str:
+        return value.decode(self.line_encoding)
+
+    def encode(self, value: str) -> bytes:
+        return value.encode(self.line_encoding)
+
+    def to_bytes(self, lines: list[bytes] | None = None) -> bytes:
+        content = self.newline.join(self.lines if lines is None else lines)
+        if self.is_wide:
+            content = content.decode("utf-8").encode(self.encoding)
+
+        return self.bom + content
+
+    def write(self, output_file: Path | str, lines: list[bytes] | None = None) -> None:
+        """
+        Write the subtitle document in its original encoding.
+
+        Parameters:
+            output_file (Path | str): The path to the output file.
+            lines (list[bytes] | None, optional): Lines to write instead of the document lines, e.g. a restyled copy.
+            The default is None.
+
+        Returns:
+            None
+        """
+
+        with open(str(output_file), mode="wb") as file:
+            file.write(self.to_bytes(lines))
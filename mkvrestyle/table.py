@@ -1,3 +1,5 @@
+import os
+
 from rich.console import Console
 from rich.table import Table
 
@@ -27,3 +29,93 @@ def table_print_stream_options(tracks: list) -> None:
 
     console = Console()
     console.print(table)
+
+
+def table_print_profile(summary: list) -> None:
+    """
+    Prints a table of the time and I/O spent per stage, see `Profiler.summary`.
+
+    Parameters:
+        summary (List[Dict[str, Any]]): The totals per span name.
+
+    Returns:
+        None
+    """
+
+    table = Table(show_header=True, header_style="bold cyan")
+
+    # Header
+    for column in [
+        "Stage",
+        "Count",
+        "Wall (s)",
+        "CPU (s)",
+        "Read (MiB)",
+        "Written (MiB)",
+    ]:
+        table.add_column(column, justify="left" if column == "Stage" else "right")
+
+    # Rows
+    for total in summary:
+        table.add_row(
+            total["name"],
+            str(total["count"]),
+            f"{total['wall']:.3f}",
+            f"{total['cpu']:.3f}",
+            f"{total['read'] / 1024 ** 2:.2f}",
+            f"{total['written'] / 1024 ** 2:.2f}",
+        )
+
+    console = Console()
+    console.print(table)
+
+
+def table_print_memory_profile(summary: dict) -> None:
+    """
+    Prints a table of the peak memory per stage, see `MemoryProfiler.summary`.
+
+    Parameters:
+        summary (Dict[str, Any]): The peaks of the run, per stage and per input file.
+
+    Returns:
+        None
+    """
+
+    table = Table(
+        show_header=True,
+        header_style="bold cyan",
+        caption=f"Peak RSS {summary['peak_rss'] / 1024 ** 2:.1f} MiB, subprocesses "
+        f"{summary['subprocess_peak_rss'] / 1024 ** 2:.1f} MiB",
+    )
+
+    # Header
+    for column in [
+        "Stage",
+        "Count",
+        "Peak RSS (MiB)",
+        "Peak traced (MiB)",
+        "Top allocation site",
+    ]:
+        table.add_column(
+            column, justify="right" if "MiB" in column or column == "Count" else "left"
+        )
+
+    # Rows
+    for stage in summary["stages"]:
+        top_allocation = (
+            stage["top_allocations"][0] if stage["top_allocations"] else None
+        )
+        table.add_row(
+            stage["name"],
+            str(stage["count"]),
+            f"{stage['peak_rss'] / 1024 ** 2:.1f}",
+            f"{stage['peak_traced'] / 1024 ** 2:.1f}",
+            (
+                f"{os.path.basename(top_allocation['site'])} ({top_allocation['size'] / 1024:.0f} KiB)"
+                if top_allocation
+                else ""
+            ),
+        )
+
+    console = Console()
+    console.print(table)
@@ -38,10 +38,10 @@ setup(
     },
     license="MIT",
     version=VERSION,
-    packages=find_packages(),
+    packages=find_packages(exclude=("benchmarks", "benchmarks.*", "tests", "tests.*")),
     entry_points={
         "console_scripts": [
-            "mkvrestyle=mkvrestyle.cli:cli",
+            "mkvrestyle=mkvrestyle.cli:main",
         ],
     },
     install_requires=parse_requirements("requirements.txt"),
@@ -0,0 +1,39 @@
+import click
+
+from mkvrestyle.args import InputPathChecker, OutputPathChecker
+
+
+def resolve_batches(input_path, output_path):
+    ctx = click.Context(click.Command("mkvrestyle"))
+    ctx.params["input_path"] = InputPathChecker()(ctx, None, [str(input_path)])
+    ctx.params["output_path"] = OutputPathChecker()(ctx, None, [str(output_path)])
+
+    return ctx.params["input_path"][0]["input"]["resolved"]
+
+
+def test_output_folder_inside_input_folder(tmp_path):
+    input_folder = tmp_path.joinpath("input")
+    input_folder.joinpath("season").mkdir(parents=True)
+    input_folder.joinpath("episode1.mkv").write_bytes(b"")
+    input_folder.joinpath("season", "episode2.mkv").write_bytes(b"")
+
+    output_folder = input_folder.joinpath("output")
+    files = resolve_batches(input_folder, output_folder)
+
+    # Written while the input files are discovered, e.g. with `--remux`
+    assert next(files) == input_folder.joinpath("episode1.mkv")
+    output_folder.joinpath("episode1.mkv").write_bytes(b"")
+
+    assert list(files) == [input_folder.joinpath("season", "episode2.mkv")]
+
+
+def test_outputs_of_previous_run_inside_input_folder(tmp_path):
+    input_folder = tmp_path.joinpath("input")
+    output_folder = input_folder.joinpath("output")
+    output_folder.mkdir(parents=True)
+    output_folder.joinpath("episode1.mkv").write_bytes(b"")
+    input_folder.joinpath("episode1.mkv").write_bytes(b"")
+
+    files = resolve_batches(input_folder, output_folder)
+
+    assert list(files) == [input_folder.joinpath("episode1.mkv")]
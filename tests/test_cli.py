@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from benchmarks.bench_orchestration import StandinRun
+from mkvrestyle.manifest import MANIFEST_FILE_NAME
+from mkvrestyle.report import STAGE_EXTRACT
+
+FILES = 4
+
+
+@pytest.fixture
+def standin_run():
+    standin_run = StandinRun(FILES)
+    yield standin_run
+    standin_run.remove()
+
+
+def test_run(standin_run):
+    standin_run.run()
+
+    assert [output.name for output in standin_run.outputs()] == [
+        f"episode{index:02d}_track1_eng.ass" for index in range(FILES)
+    ]
+    assert standin_run.output_folder.joinpath(MANIFEST_FILE_NAME).is_file()
+    assert {call["tool"] for call in standin_run.calls()} == {
+        "mkvmerge",
+        "mkvextract",
+        "ffprobe",
+    }
+
+
+def test_up_to_date_run(standin_run):
+    standin_run.run()
+    outputs = {output: output.stat().st_mtime_ns for output in standin_run.outputs()}
+
+    # Up to date files are skipped before any tool is run
+    standin_run.run()
+
+    assert standin_run.calls() == []
+    assert {
+        output: output.stat().st_mtime_ns for output in standin_run.outputs()
+    } == outputs
+
+    standin_run.run("--force")
+
+    assert standin_run.calls() != []
+
+
+def test_keep_going():
+    standin_run = StandinRun(10, failure_rate={"mkvextract": 0.5})
+    try:
+        failure_report = standin_run.folder.joinpath("failures.json")
+        standin_run.run("--keep-going", "--failure-report", str(failure_report))
+
+        with failure_report.open("r") as file:
+            report = json.load(file)
+        expected_failures = standin_run.expected_failures()
+
+        assert 0 < len(expected_failures) < 10
+        assert report["failed"] == len(expected_failures)
+        assert report["processed"] == 10 - len(expected_failures)
+        assert report["failed_by_stage"] == {STAGE_EXTRACT: len(expected_failures)}
+        assert len(standin_run.outputs()) == 10 - len(expected_failures)
+    finally:
+        standin_run.remove()
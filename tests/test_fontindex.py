@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from mkvrestyle.exception import InvalidFontIndexError
+from mkvrestyle.fontindex import FontIndex, write_font_index
+
+FONTS = [
+    {
+        "file_path": Path("/app/fonts/Arial.ttf"),
+        "file_name": "Arial.ttf",
+        "font_name": "Arial",
+        "font_family": "Arial",
+        "font_style": "Regular",
+        "coverage": [32, 127],
+    },
+    {
+        "file_path": Path("/app/fonts/Arial-Bold.ttf"),
+        "file_name": "Arial-Bold.ttf",
+        "font_name": "Arial Bold",
+        "font_family": "Arial",
+        "font_style": "Bold",
+        "coverage": [32, 127, 160, 256],
+    },
+]
+
+
+@pytest.fixture
+def index_file(tmp_path):
+    index_file = tmp_path.joinpath("font-index.bin")
+    write_font_index(FONTS, index_file)
+
+    return index_file
+
+
+def test_lookup(index_file):
+    with FontIndex(index_file) as font_index:
+        assert len(font_index) == 2
+        assert font_index.find("arial bold")["file_path"] == FONTS[1]["file_path"]
+        assert list(font_index.find("Arial")["coverage"]) == [32, 127]
+        assert font_index.find("Verdana") is None
+        assert [font["font_style"] for font in font_index.family("Arial")] == [
+            "Regular",
+            "Bold",
+        ]
+
+
+def test_truncated(index_file):
+    index_file.write_bytes(index_file.read_bytes()[:60])
+
+    with pytest.raises(InvalidFontIndexError):
+        FontIndex(index_file)
+
+
+def test_close_releases_coverage(index_file):
+    font_index = FontIndex(index_file)
+    coverage = font_index.find("Arial")["coverage"]
+    font_index.close()
+
+    with pytest.raises(ValueError):
+        coverage[0]
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from mkvrestyle.fonts import coverage_ranges, font_coverage, uncovered_codepoints
+
+
+def test_coverage_ranges():
+    coverage = coverage_ranges({65, 66, 67, 0x3042, 97})
+
+    assert coverage == [65, 68, 97, 98, 0x3042, 0x3043]
+    assert uncovered_codepoints(coverage, {64, 65, 67, 68, 0x3042, 0x65E5}) == {
+        64,
+        68,
+        0x65E5,
+    }
+
+
+def test_font_coverage_is_read_once(tmp_path):
+    font = {"file_path": Path(tmp_path, "missing.ttf"), "font_name": "Missing"}
+
+    assert font_coverage(font) is None
+    assert font["coverage"] is None
+
+    font = {"file_path": Path(tmp_path, "missing.ttf"), "coverage": [65, 68]}
+    assert font_coverage(font) == [65, 68]
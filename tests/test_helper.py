@@ -0,0 +1,52 @@
+import os
+import stat
+
+import pytest
+
+from mkvrestyle.exception import ScratchFolderError
+from mkvrestyle.helper import atomic_write, get_scratch_folder
+
+
+def test_scratch_folder_is_private(tmp_path):
+    scratch_folder = get_scratch_folder(tmp_path)
+
+    assert scratch_folder == tmp_path.joinpath(f"mkvrestyle-{os.getuid()}")
+    assert stat.S_IMODE(scratch_folder.stat().st_mode) == 0o700
+
+
+def test_scratch_folder_permissions_are_restricted(tmp_path):
+    tmp_path.joinpath(f"mkvrestyle-{os.getuid()}").mkdir(mode=0o777)
+    scratch_folder = get_scratch_folder(tmp_path)
+
+    assert stat.S_IMODE(scratch_folder.stat().st_mode) == 0o700
+
+
+def test_scratch_folder_symbolic_link(tmp_path):
+    target = tmp_path.joinpath("target")
+    target.mkdir()
+    tmp_path.joinpath(f"mkvrestyle-{os.getuid()}").symlink_to(target)
+
+    with pytest.raises(ScratchFolderError):
+        get_scratch_folder(tmp_path)
+
+
+def test_atomic_write(tmp_path):
+    output_file = tmp_path.joinpath("output.json")
+    with atomic_write(output_file) as temporary_path:
+        temporary_path.write_text("{}")
+        assert not output_file.exists()
+
+    assert output_file.read_text() == "{}"
+    assert list(tmp_path.iterdir()) == [output_file]
+
+
+def test_atomic_write_failure(tmp_path):
+    output_file = tmp_path.joinpath("output.json")
+    output_file.write_text("{}")
+    with pytest.raises(ValueError):
+        with atomic_write(output_file) as temporary_path:
+            temporary_path.write_text("{")
+            raise ValueError
+
+    assert output_file.read_text() == "{}"
+    assert list(tmp_path.iterdir()) == [output_file]
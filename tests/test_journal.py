@@ -0,0 +1,36 @@
+from mkvrestyle.journal import STAGE_COMPLETED, STAGE_EXTRACTED, Journal
+
+FINGERPRINT = {"size": 1, "mtime_ns": 1, "inode": 1}
+
+
+def test_torn_last_line(tmp_path):
+    journal = Journal(tmp_path)
+    journal.append(
+        tmp_path.joinpath("episode1.mkv"), FINGERPRINT, "options", STAGE_EXTRACTED
+    )
+    journal.close()
+
+    # Crashed while writing the next record
+    with journal.path.open("a") as file:
+        file.write('{"input": "episode2.mkv", "finger')
+
+    journal = Journal(tmp_path)
+    journal.append(
+        tmp_path.joinpath("episode2.mkv"),
+        FINGERPRINT,
+        "options",
+        STAGE_COMPLETED,
+        {"outputs": ["episode2.ass"]},
+    )
+    journal.close()
+
+    journal = Journal(tmp_path)
+    assert (
+        journal.state(tmp_path.joinpath("episode1.mkv"), FINGERPRINT, "options")[
+            "stage"
+        ]
+        == STAGE_EXTRACTED
+    )
+    assert journal.state(tmp_path.joinpath("episode2.mkv"), FINGERPRINT, "options")[
+        "outputs"
+    ] == ["episode2.ass"]
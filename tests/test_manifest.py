@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from mkvrestyle.manifest import (
+    MANIFEST_FILE_NAME,
+    Manifest,
+    fingerprint_file,
+    options_digest,
+)
+
+TOOL_VERSION = "1.0.0"
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    input_file = tmp_path.joinpath("input", "episode.mkv")
+    input_file.parent.mkdir()
+    input_file.write_bytes(b"mkv")
+
+    return input_file
+
+
+@pytest.fixture
+def output_folder(tmp_path):
+    output_folder = tmp_path.joinpath("output")
+    output_folder.mkdir()
+    output_folder.joinpath("episode.ass").write_bytes(b"")
+
+    return output_folder
+
+
+def record(output_folder, input_file, digest=None):
+    manifest = Manifest(output_folder, TOOL_VERSION)
+    manifest.record(
+        input_file,
+        fingerprint_file(input_file, with_hash=True),
+        digest or options_digest("preset", None),
+        [output_folder.joinpath("episode.ass")],
+    )
+    manifest.save()
+
+
+def is_up_to_date(output_folder, input_file, digest=None, tool_version=TOOL_VERSION):
+    return Manifest(output_folder, tool_version).is_up_to_date(
+        input_file,
+        fingerprint_file(input_file, with_hash=True),
+        digest or options_digest("preset", None),
+    )
+
+
+def test_up_to_date(output_folder, input_file):
+    assert not is_up_to_date(output_folder, input_file)
+
+    record(output_folder, input_file)
+
+    assert is_up_to_date(output_folder, input_file)
+
+
+def test_options_changed(output_folder, input_file):
+    record(output_folder, input_file)
+
+    assert not is_up_to_date(output_folder, input_file, options_digest("other", None))
+    assert not is_up_to_date(output_folder, input_file, tool_version="2.0.0")
+
+
+def test_input_file_changed(output_folder, input_file):
+    record(output_folder, input_file)
+    stat = input_file.stat()
+
+    # Same size and modification time, so only the content hash differs
+    input_file.write_bytes(b"MKV")
+    os.utime(input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert not is_up_to_date(output_folder, input_file)
+
+
+def test_output_removed(output_folder, input_file):
+    record(output_folder, input_file)
+    output_folder.joinpath("episode.ass").unlink()
+
+    assert not is_up_to_date(output_folder, input_file)
+
+
+def test_input_without_outputs_is_not_recorded(output_folder, input_file):
+    manifest = Manifest(output_folder, TOOL_VERSION)
+    manifest.record(input_file, fingerprint_file(input_file), "digest", [])
+    manifest.save()
+
+    assert not output_folder.joinpath(MANIFEST_FILE_NAME).exists()
+
+
+@pytest.mark.parametrize("content", ['{"version": 0, "entries": {}}', "{", ""])
+def test_unreadable_manifest(output_folder, input_file, content):
+    output_folder.joinpath(MANIFEST_FILE_NAME).write_text(content)
+
+    assert Manifest(output_folder, TOOL_VERSION).entries == {}
+    assert not is_up_to_date(output_folder, input_file)
@@ -0,0 +1,155 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from mkvrestyle.exception import (
+    InvalidFontNameError,
+    InvalidFontSubstituteOptionError,
+    InvalidPresetError,
+)
+from mkvrestyle.preset import ColumnRule, StyleMatcher, compile_preset, load_preset
+
+PRESET_PATH = Path("preset.json")
+
+
+def test_style_matcher_first_pattern_wins():
+    matcher = StyleMatcher(["Default", "^Sign.*", "*Top*", "Sign Top"])
+
+    assert matcher.match("Default") == 0
+    assert matcher.match("Sign Top") == 1
+    assert matcher.match("OP Top") == 2
+    assert matcher.match("Other") is None
+    assert "Sign" in matcher
+
+
+def test_style_matcher_patterns_are_compiled_separately():
+    matcher = StyleMatcher(["^(a)\\1", "^x", "^(?P<name>b)", "^(?P<name>c)"])
+
+    assert matcher.match("aa") == 0
+    assert matcher.match("x") == 1
+    assert matcher.match("c") == 3
+
+
+def test_style_matcher_exact_name_with_glob_characters():
+    matcher = StyleMatcher(["=Default [Alt]"])
+
+    assert matcher.match("Default [Alt]") == 0
+    assert matcher.match("DefaultA") is None
+
+
+def test_style_matcher_invalid_regex():
+    with pytest.raises(InvalidPresetError):
+        StyleMatcher(["^(unclosed"])
+
+
+@pytest.mark.parametrize(
+    "preset, exception",
+    [
+        ([], InvalidPresetError),
+        ({"Fontsize": 1}, InvalidPresetError),
+        ({"Fontsize": {"factor": "1", "round": 0}}, InvalidPresetError),
+        ({"Fontsize": {"factor": True, "round": 0}}, InvalidPresetError),
+        ({"Fontsize": {"factor": 1, "round": -1}}, InvalidPresetError),
+        ({"Fontsize": {"factor": 1, "round": 0.5}}, InvalidPresetError),
+        (
+            {"FontName": {"name": "Font", "substitute": "some"}},
+            InvalidFontSubstituteOptionError,
+        ),
+        ({"FontName": {"name": " ", "substitute": "all"}}, InvalidFontNameError),
+        (
+            {"FontName": {"name": "Font", "substitute": "custom", "style": "Default"}},
+            InvalidPresetError,
+        ),
+        ({"Styles": []}, InvalidPresetError),
+        ({"Styles": {"Default": 1}}, InvalidPresetError),
+        (
+            {"Styles": {"Default": {"Bold": {"factor": 1, "round": 0}}}},
+            InvalidPresetError,
+        ),
+        ({"Styles": {"^(unclosed": {}}}, InvalidPresetError),
+    ],
+)
+def test_compile_preset_validation(preset, exception):
+    with pytest.raises(exception):
+        compile_preset(preset, PRESET_PATH)
+
+
+def test_load_preset_validates_on_load(tmp_path):
+    preset_path = tmp_path.joinpath("preset.json")
+    preset_path.write_text(json.dumps({"Outline": {"factor": 1}}))
+
+    with pytest.raises(InvalidPresetError):
+        load_preset(preset_path)
+
+
+@pytest.mark.parametrize(
+    "rule, value, expected",
+    [
+        # Not changed by the preset, only resampled
+        (ColumnRule(key="Outline", resample=True), "2", 6.0),
+        (ColumnRule(key="ScaleX", resample=False), "100", "100"),
+        (ColumnRule("Fontsize", True, factor=0.95, cast_int=True), "24", "68"),
+        (ColumnRule("Outline", True, factor=0.646, ndigits=2), "2", "3.88"),
+        (ColumnRule("ScaleX", False, factor=1.5, cast_int=True), b"100", "150"),
+        (ColumnRule("MarginV", True, factor=2, cast_int=True), "0", "0"),
+    ],
+)
+def test_column_rule_apply(rule, value, expected):
+    assert rule.apply(value, 3) == expected
+
+
+def test_compile_preset():
+    preset = compile_preset(
+        {
+            "Fontsize": {"factor": 0.95, "round": 0},
+            "MarginV": {"factor": 0.81, "round": 0},
+            "FontName": {"name": "Font", "substitute": "custom", "style": ["Default"]},
+            "Styles": {
+                "^Sign.*": {"Fontsize": {"factor": 1, "round": 1}},
+                "*Top*": {"MarginV": {"factor": 1, "round": 0}},
+            },
+        },
+        PRESET_PATH,
+    )
+
+    columns = {column.key: column for column in preset.style_columns}
+    assert columns["Fontsize"] == ColumnRule("Fontsize", True, 0.95, 0, True)
+    assert columns["ScaleX"] == ColumnRule("ScaleX", False)
+    assert [column.key for column in preset.dialogue_columns] == [
+        "MarginL",
+        "MarginR",
+        "MarginV",
+    ]
+    assert preset.font is not None and "Default" in preset.font.styles
+
+    # The first matching pattern wins, and options which are not given fall back to the top level
+    sign_columns = {
+        column.key: column for column in preset.style_columns_for("SignTop")
+    }
+    assert sign_columns["Fontsize"] == ColumnRule("Fontsize", True, 1.0, 1, False)
+    assert sign_columns["MarginV"] == columns["MarginV"]
+
+    top_columns = {
+        column.key: column for column in preset.dialogue_columns_for("OP Top")
+    }
+    assert top_columns["MarginV"] == ColumnRule("MarginV", True, 1.0, 0, True)
+
+    assert preset.style_columns_for("Default") == preset.style_columns
+    assert preset.dialogue_columns_for("Default") == preset.dialogue_columns
+
+
+def test_compile_preset_digest():
+    options = {
+        "Fontsize": {"factor": 0.95, "round": 0},
+        "Outline": {"factor": 1, "round": 2},
+    }
+
+    digest = compile_preset(options, PRESET_PATH).digest
+    assert compile_preset(dict(reversed(options.items())), PRESET_PATH).digest == digest
+    assert (
+        compile_preset(
+            {**options, "Shadow": {"factor": 0, "round": 0}}, PRESET_PATH
+        ).digest
+        != digest
+    )
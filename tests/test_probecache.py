@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from mkvrestyle.probecache import PROBE_IDENTIFY, ProbeCache
+
+requires_permissions = pytest.mark.skipif(
+    os.geteuid() == 0, reason="file permissions are not enforced for root"
+)
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    input_file = tmp_path.joinpath("episode.mkv")
+    input_file.write_bytes(b"mkv")
+
+    return input_file
+
+
+def test_round_trip(tmp_path, input_file):
+    cache_file = tmp_path.joinpath("cache", "probe-cache.json")
+    probe_cache = ProbeCache(cache_file)
+    probe_cache.put(input_file, PROBE_IDENTIFY, {"tracks": []})
+    probe_cache.save()
+
+    assert ProbeCache(cache_file).get(input_file, PROBE_IDENTIFY) == {"tracks": []}
+
+
+@requires_permissions
+def test_read_only_cache_folder(tmp_path, input_file):
+    cache_folder = tmp_path.joinpath("cache")
+    cache_folder.mkdir()
+    cache_folder.chmod(0o500)
+    try:
+        probe_cache = ProbeCache(cache_folder.joinpath("probe-cache.json"))
+        probe_cache.put(input_file, PROBE_IDENTIFY, {"tracks": []})
+        probe_cache.save()
+
+        assert list(cache_folder.iterdir()) == []
+    finally:
+        cache_folder.chmod(0o700)
+
+
+@requires_permissions
+def test_unreadable_cache_folder(tmp_path, input_file):
+    cache_folder = tmp_path.joinpath("cache")
+    cache_folder.mkdir()
+    cache_folder.chmod(0o000)
+    try:
+        probe_cache = ProbeCache(cache_folder.joinpath("probe-cache.json"))
+
+        assert probe_cache.get(input_file, PROBE_IDENTIFY) is None
+    finally:
+        cache_folder.chmod(0o700)
+
+
+def test_cache_folder_cannot_be_created(tmp_path, input_file):
+    # A file in place of the cache folder fails regardless of permissions
+    tmp_path.joinpath("cache").write_bytes(b"")
+    probe_cache = ProbeCache(tmp_path.joinpath("cache", "probe-cache.json"))
+    probe_cache.put(input_file, PROBE_IDENTIFY, {"tracks": []})
+    probe_cache.save()
+
+    assert probe_cache.get(input_file, PROBE_IDENTIFY) == {"tracks": []}
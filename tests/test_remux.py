@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import click
+import pytest
+
+from mkvrestyle import cli
+from mkvrestyle.args import InputPathChecker, OutputPathChecker
+from mkvrestyle.exception import MKVmergeError
+
+IDENTIFY = {
+    "tracks": [
+        {"id": 0, "type": "video", "properties": {"codec_id": "V_MPEG4/ISO/AVC"}},
+        {
+            "id": 1,
+            "type": "subtitles",
+            "properties": {
+                "codec_id": "S_TEXT/ASS",
+                "language": "jpn",
+                "language_ietf": "ja",
+                "track_name": "Signs",
+                "default_track": True,
+                "forced_track": False,
+            },
+        },
+        {
+            "id": 2,
+            "type": "subtitles",
+            "properties": {"codec_id": "S_TEXT/ASS", "language": "eng"},
+        },
+    ]
+}
+
+
+def test_build_remux_command():
+    command = cli.build_remux_command(
+        Path("input", "episode.mkv"),
+        IDENTIFY,
+        {1: Path("scratch", "episode_track1_jpn.ass")},
+        [Path("scratch", "attachments", "Font.ttf")],
+        Path("output", ".episode.mkv.tmp"),
+    )
+
+    assert command == [
+        "mkvmerge",
+        "--output",
+        str(Path("output", ".episode.mkv.tmp")),
+        "--no-attachments",
+        "--subtitle-tracks",
+        "!1",
+        str(Path("input", "episode.mkv")),
+        "--language",
+        "0:ja",
+        "--track-name",
+        "0:Signs",
+        "--default-track-flag",
+        "0:yes",
+        "--forced-display-flag",
+        "0:no",
+        str(Path("scratch", "episode_track1_jpn.ass")),
+        "--attachment-mime-type",
+        "application/x-truetype-font",
+        "--attachment-name",
+        "Font.ttf",
+        "--attach-file",
+        str(Path("scratch", "attachments", "Font.ttf")),
+        "--track-order",
+        "0:0,1:0,0:2",
+    ]
+
+
+def test_remux_failure_removes_temporary_file(tmp_path, monkeypatch):
+    input_file = tmp_path.joinpath("episode.mkv")
+    input_file.write_bytes(b"mkv")
+    scratch_folder = tmp_path.joinpath("scratch")
+    scratch_folder.mkdir()
+    output = scratch_folder.joinpath("episode_track1_jpn.ass")
+    output.write_bytes(b"")
+    output_folder = tmp_path.joinpath("output")
+
+    def run(self, process, command, success_codes=(0,)):
+        Path(command[2]).write_bytes(b"partial")
+        raise MKVmergeError(message="failed", exit_code=2)
+
+    monkeypatch.setattr(cli, "mkvmerge_identify", lambda *args: IDENTIFY)
+    monkeypatch.setattr(cli.ProcessCommand, "run", run)
+
+    with pytest.raises(MKVmergeError):
+        cli.remux_outputs(input_file, [output], scratch_folder, output_folder)
+
+    assert list(output_folder.iterdir()) == []
+
+
+@pytest.mark.parametrize("remux", [False, True])
+def test_remux_input_file_inside_output_folder(tmp_path, remux):
+    input_file = tmp_path.joinpath("episode.mkv")
+    input_file.write_bytes(b"mkv")
+
+    ctx = click.Context(click.Command("mkvrestyle"))
+    ctx.params["remux"] = remux
+    ctx.params["input_path"] = InputPathChecker()(ctx, None, [str(input_file)])
+
+    if not remux:
+        OutputPathChecker()(ctx, None, [str(tmp_path)])
+        return
+
+    with pytest.raises(click.BadParameter):
+        OutputPathChecker()(ctx, None, [str(tmp_path)])
+    OutputPathChecker()(ctx, None, [str(tmp_path.joinpath("output"))])
@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+from mkvrestyle.exception import FontNotFoundError, MKVmergeError
+from mkvrestyle.journal import STAGE_EXTRACTED
+from mkvrestyle.report import (
+    STAGE_EXTRACT,
+    STAGE_PREPARE,
+    STAGE_RESTYLE,
+    FailureReport,
+    StageTracker,
+)
+
+
+def test_failure_report(tmp_path):
+    report = FailureReport()
+    report.processed = 3
+    report.skipped = 2
+    report.no_subtitles = 1
+    report.add(
+        Path("episode1.mkv"),
+        STAGE_EXTRACT,
+        MKVmergeError(message="failed", exit_code=2),
+        1.23456,
+    )
+    report.add(Path("episode2.mkv"), STAGE_RESTYLE, FontNotFoundError("Font"), 0.5)
+    report.add(Path("episode3.mkv"), STAGE_RESTYLE, FontNotFoundError("Font"), 0.5)
+
+    report_file = tmp_path.joinpath("report", "failures.json")
+    report.write(report_file)
+    summary = json.loads(report_file.read_text())
+
+    assert list(report_file.parent.iterdir()) == [report_file]
+    assert summary["processed"] == 3
+    assert summary["skipped"] == 2
+    assert summary["no_subtitles"] == 1
+    assert summary["failed"] == 3
+    assert summary["failed_by_stage"] == {STAGE_EXTRACT: 1, STAGE_RESTYLE: 2}
+    assert [
+        failure["input"] for failure in summary["failures"]["FontNotFoundError"]
+    ] == [
+        "episode2.mkv",
+        "episode3.mkv",
+    ]
+
+    failure = summary["failures"]["MKVmergeError"][0]
+    assert failure["stage"] == STAGE_EXTRACT
+    assert failure["message"] == str(MKVmergeError(message="failed", exit_code=2))
+    assert failure["duration"] == 1.235
+
+
+def test_empty_failure_report():
+    summary = FailureReport().summary()
+
+    assert summary["failed"] == 0
+    assert summary["failed_by_stage"] == {}
+    assert summary["failures"] == {}
+
+
+def test_stage_tracker():
+    recorded = []
+    stage_tracker = StageTracker(lambda stage, data: recorded.append((stage, data)))
+    assert stage_tracker.stage == STAGE_PREPARE
+
+    stage_tracker.start(STAGE_EXTRACT)
+    stage_tracker(STAGE_EXTRACTED, {"subtitles": []})
+
+    assert stage_tracker.stage == STAGE_RESTYLE
+    assert recorded == [(STAGE_EXTRACTED, {"subtitles": []})]
@@ -0,0 +1,83 @@
+import pytest
+
+from mkvrestyle.cli import fallback_subtitle_track
+from mkvrestyle.exception import InvalidStreamPolicyError, SubtitleStreamNotFoundError
+from mkvrestyle.selection import compile_stream_policy, load_stream_policy
+
+TRACKS = [
+    {"index": 2, "codec": "S_TEXT/UTF8", "language": "eng", "title": "Full"},
+    {"index": 3, "codec": "S_TEXT/ASS", "language": "eng", "title": "Signs & Songs"},
+    {"index": 4, "codec": "S_TEXT/ASS", "language": "eng", "title": "Full"},
+    {"index": 5, "codec": "S_TEXT/ASS", "language": "jpn", "title": "Honorifics"},
+]
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        [],
+        {"fallback": "last"},
+        {"languages": "eng"},
+        {"codecs": ["S_TEXT/ASS", 1]},
+        {"prefer_title": 1},
+        {"avoid_title": "(signs"},
+    ],
+)
+def test_compile_stream_policy_validation(policy):
+    with pytest.raises(InvalidStreamPolicyError):
+        compile_stream_policy(policy)
+
+
+def test_load_stream_policy_validates_on_load(tmp_path):
+    policy_path = tmp_path.joinpath("policy.json")
+    policy_path.write_text('{"fallback": "never"}')
+
+    with pytest.raises(InvalidStreamPolicyError):
+        load_stream_policy(policy_path)
+
+
+def test_select():
+    policy = compile_stream_policy(
+        {
+            "languages": ["jpn", "eng"],
+            "avoid_title": "signs",
+            "codecs": ["S_TEXT/ASS"],
+        }
+    )
+    assert policy.select(TRACKS)["index"] == 5
+
+    # Avoided titles are ranked after the other tracks of the same language
+    policy = compile_stream_policy({"languages": ["eng"], "avoid_title": "signs"})
+    assert policy.select(TRACKS)["index"] == 2
+
+    policy = compile_stream_policy(
+        {"languages": ["eng"], "prefer_title": "SONGS", "codecs": ["S_TEXT/ASS"]}
+    )
+    assert policy.select(TRACKS)["index"] == 3
+
+    assert compile_stream_policy({"languages": ["ger"]}).select(TRACKS) is None
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        ({"languages": ["ger"]}, 2),
+        ({"languages": ["ger"], "codecs": ["S_TEXT/ASS"]}, 3),
+        ({"languages": ["ger"], "codecs": ["S_TEXT/SSA"]}, None),
+        ({"languages": ["ger"], "fallback": "skip"}, None),
+    ],
+)
+def test_fallback(policy, expected):
+    track = fallback_subtitle_track(
+        TRACKS, "ger", compile_stream_policy(policy), "episode.mkv"
+    )
+
+    assert (None if track is None else track["index"]) == expected
+
+
+@pytest.mark.parametrize("policy", [None, {"languages": ["ger"], "fallback": "error"}])
+def test_fallback_error(policy):
+    stream_policy = None if policy is None else compile_stream_policy(policy)
+
+    with pytest.raises(SubtitleStreamNotFoundError):
+        fallback_subtitle_track(TRACKS, "ger", stream_policy, "episode.mkv")
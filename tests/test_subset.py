@@ -0,0 +1,119 @@
+import shutil
+
+import pytest
+from fontTools.ttLib import TTFont  # type: ignore
+
+from benchmarks.generators import generate_font
+from mkvrestyle import subset
+from mkvrestyle.fontstore import FontStore
+from mkvrestyle.subset import SUBSET_BASE_CODEPOINTS, FontSubsetter
+
+
+@pytest.fixture
+def font_file(tmp_path):
+    font_file = tmp_path.joinpath("TestFont.ttf")
+    generate_font(font_file, "Test Font")
+
+    return font_file
+
+
+@pytest.fixture
+def font_store(tmp_path):
+    return FontStore(tmp_path.joinpath("output", ".mkvrestyle-fonts"))
+
+
+@pytest.fixture
+def subset_calls(monkeypatch):
+    calls = []
+
+    def subset_font(source, destination, codepoints):
+        calls.append(codepoints)
+        original_subset_font(source, destination, codepoints)
+
+    original_subset_font = subset.subset_font
+    monkeypatch.setattr(subset, "subset_font", subset_font)
+
+    return calls
+
+
+def attachments_folder(tmp_path, font_file, episode):
+    folder = tmp_path.joinpath("output", episode, "attachments")
+    folder.mkdir(parents=True)
+    shutil.copyfile(font_file, folder.joinpath(font_file.name))
+
+    return folder
+
+
+def cmap(font_file):
+    with TTFont(str(font_file)) as font:
+        return set(font.getBestCmap())
+
+
+def codepoints(text):
+    return {"test font": {ord(char) for char in text}}
+
+
+def test_subset_attachments(tmp_path, font_file, font_store, subset_calls):
+    folder = attachments_folder(tmp_path, font_file, "episode1")
+    subsetter = FontSubsetter(font_store)
+    subsetter.subset_attachments(folder, codepoints("ab"))
+
+    assert cmap(folder.joinpath(font_file.name)) == {ord("a"), ord("b")} | (
+        SUBSET_BASE_CODEPOINTS & cmap(font_file)
+    )
+    assert len(subset_calls) == 1
+
+    # Subset again from the original font, as the attachments folder is shared by the next subtitle
+    FontSubsetter(font_store).subset_attachments(folder, codepoints("c"))
+
+    assert {ord("a"), ord("b"), ord("c")} <= cmap(folder.joinpath(font_file.name))
+    assert subset_calls[-1] == {ord("a"), ord("b"), ord("c")}
+
+    # Up to date
+    FontSubsetter(font_store).subset_attachments(folder, codepoints("a"))
+    assert len(subset_calls) == 2
+
+
+def test_subsets_are_cached_across_episodes(
+    tmp_path, font_file, font_store, subset_calls
+):
+    subsetter = FontSubsetter(font_store)
+    for episode in ("episode1", "episode2"):
+        subsetter.subset_attachments(
+            attachments_folder(tmp_path, font_file, episode), codepoints("ab")
+        )
+
+    assert len(subset_calls) == 1
+    assert (
+        tmp_path.joinpath(
+            "output", "episode1", "attachments", font_file.name
+        ).read_bytes()
+        == tmp_path.joinpath(
+            "output", "episode2", "attachments", font_file.name
+        ).read_bytes()
+    )
+
+    # And across runs
+    FontSubsetter(font_store).subset_attachments(
+        attachments_folder(tmp_path, font_file, "episode3"), codepoints("ba")
+    )
+    assert len(subset_calls) == 1
+
+
+def test_unused_fonts_are_kept(tmp_path, font_file, font_store, subset_calls):
+    folder = attachments_folder(tmp_path, font_file, "episode1")
+    FontSubsetter(font_store).subset_attachments(folder, {"other font": {ord("a")}})
+
+    assert folder.joinpath(font_file.name).read_bytes() == font_file.read_bytes()
+    assert subset_calls == []
+
+
+def test_forget(tmp_path, font_file, font_store):
+    subsetter = FontSubsetter(font_store)
+    subsetter.subset_attachments(
+        attachments_folder(tmp_path, font_file, "episode1"), codepoints("ab")
+    )
+    subsetter.forget(tmp_path.joinpath("output", "episode1"))
+    subsetter.save()
+
+    assert FontSubsetter(font_store).entries == {}
@@ -0,0 +1,116 @@
+import codecs
+import json
+from pathlib import Path
+
+import pytest
+
+from mkvrestyle.cli import parse_subtitle, restyle_subtitle
+from mkvrestyle.fontstore import FontStore
+from mkvrestyle.preset import compile_preset
+from mkvrestyle.subtitle import SubtitleDocument, detect_encoding
+
+DATA_FOLDER = Path(__file__).parent.joinpath("data")
+DEFAULT_PRESET_PATH = Path(__file__).parents[1].joinpath("preset", "default.json")
+
+CONTENT = "[Script Info]\nTitle: Héllo ✓\nPlayResX: 640\n\n[Events]\nDialogue: 日本語"
+
+
+@pytest.mark.parametrize(
+    "data, encoding, bom",
+    [
+        (b"[Script Info]\n", "utf-8", b""),
+        ("Title: Héllo".encode("utf-8"), "utf-8", b""),
+        (codecs.BOM_UTF8 + b"[Script Info]", "utf-8", codecs.BOM_UTF8),
+        (
+            codecs.BOM_UTF16_LE + "[Script]".encode("utf-16-le"),
+            "utf-16-le",
+            codecs.BOM_UTF16_LE,
+        ),
+        (
+            codecs.BOM_UTF16_BE + "[Script]".encode("utf-16-be"),
+            "utf-16-be",
+            codecs.BOM_UTF16_BE,
+        ),
+        ("[Script]".encode("utf-16-le"), "utf-16-le", b""),
+        ("[Script]".encode("utf-16-be"), "utf-16-be", b""),
+        ("Title: Héllo".encode("latin-1"), "latin-1", b""),
+        (b"", "utf-8", b""),
+    ],
+)
+def test_detect_encoding(data, encoding, bom):
+    assert detect_encoding(data) == (encoding, bom)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        CONTENT.encode("utf-8"),
+        CONTENT.replace("\n", "\r\n").encode("utf-8"),
+        (CONTENT + "\n").encode("utf-8"),
+        (CONTENT + "\r\n").replace("\n", "\r\n").encode("utf-8"),
+        codecs.BOM_UTF8 + CONTENT.encode("utf-8"),
+        codecs.BOM_UTF16_LE + CONTENT.replace("\n", "\r\n").encode("utf-16-le"),
+        codecs.BOM_UTF16_BE + CONTENT.encode("utf-16-be"),
+        (CONTENT + "\n").encode("utf-16-le"),
+        CONTENT.replace("✓", "").replace("日本語", "").encode("latin-1"),
+    ],
+)
+def test_round_trip(tmp_path, data):
+    input_file = tmp_path.joinpath("input.ass")
+    input_file.write_bytes(data)
+    output_file = tmp_path.joinpath("output.ass")
+
+    document = SubtitleDocument.from_file(input_file)
+    document.write(output_file)
+
+    assert output_file.read_bytes() == data
+
+
+def test_lines_are_ascii_compatible():
+    document = SubtitleDocument(
+        codecs.BOM_UTF16_LE + CONTENT.replace("\n", "\r\n").encode("utf-16-le")
+    )
+
+    assert document.newline == b"\r\n"
+    assert document.lines[0] == b"[Script Info]"
+    assert document.decode(document.lines[1]) == "Title: Héllo ✓"
+    assert document.to_bytes([b"[Script Info]", document.encode("Title: ✓")]) == (
+        codecs.BOM_UTF16_LE + "[Script Info]\r\nTitle: ✓".encode("utf-16-le")
+    )
+
+
+def test_restyle_subtitle(tmp_path):
+    with DEFAULT_PRESET_PATH.open("r") as file:
+        preset = json.load(file)
+    # Without substituting the font, so the output does not depend on the installed fonts
+    del preset["FontName"]
+
+    ass_track_path = DATA_FOLDER.joinpath("restyle_input.ass")
+    output_file = tmp_path.joinpath("output.ass")
+    # The fonts of the styles are already attachments, so nothing is copied
+    attachments_folder = tmp_path.joinpath("attachments")
+    fonts = [
+        {
+            "file_path": attachments_folder.joinpath(f"{font_name}.ttf"),
+            "file_name": f"{font_name}.ttf",
+            "font_name": font_name,
+            "font_family": font_name,
+        }
+        for font_name in ["DejaVu Sans", "DejaVu Serif"]
+    ]
+
+    restyle_subtitle(
+        parse_subtitle(ass_track_path),
+        compile_preset(preset, DEFAULT_PRESET_PATH),
+        {"PlayResX": 1920, "PlayResY": 1080},
+        ["restyle_input.ass", ass_track_path, []],
+        fonts,
+        output_file,
+        attachments_folder,
+        FontStore(tmp_path.joinpath("store")),
+    )
+
+    assert output_file.read_bytes() == (
+        DATA_FOLDER.joinpath("restyle_expected.ass").read_bytes()
+    )
+    assert not attachments_folder.exists()